@@ -5,5 +5,7 @@ class PointsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.points"
     verbose_name = "點數管理"
-
-
+    
+    def ready(self):
+        """載入 signals"""
+        import apps.points.signals  # noqa
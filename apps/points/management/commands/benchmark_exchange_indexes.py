@@ -0,0 +1,208 @@
+"""
+兌換紀錄索引工作負載基準測試的 Django 管理指令
+
+使用方式：
+    python manage.py benchmark_exchange_indexes
+    python manage.py benchmark_exchange_indexes --exchanges 200000 --stores 20 --iterations 500
+
+建立測試資料後量測：
+- 店家待核銷列表（PENDING、自己的商品、最新在前，含分頁筆數）的查詢延遲 p50 / p95
+- 逐筆建立兌換紀錄的寫入吞吐量（索引越多寫入越慢）
+
+PostgreSQL 上會以舊索引設計（user,status / product,status / exchange_code / status）重跑一次比較。
+所有測試資料與索引變更都在交易中執行，結束後回滾，不會留下任何資料。
+"""
+
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.utils import timezone
+from apps.users.models import RoleChoices
+from apps.products.models import Product
+from apps.points.models import PointExchange, ExchangeStatusChoices
+
+User = get_user_model()
+
+# 0005_pointexchange_index_redesign 之前的索引
+LEGACY_INDEXES = [
+    models.Index(fields=["user", "status"], name="point_excha_user_id_2ebcd9_idx"),
+    models.Index(fields=["product", "status"], name="point_excha_product_504508_idx"),
+    models.Index(fields=["exchange_code"], name="point_excha_exchang_8476b3_idx"),
+    models.Index(fields=["status"], name="point_excha_status_556d60_idx"),
+]
+
+BATCH_SIZE = 5000
+
+
+def percentile(values, percent):
+    """計算百分位數（毫秒）"""
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[percent - 1] * 1000
+
+
+class Command(BaseCommand):
+    help = "量測兌換紀錄索引設計對待核銷列表查詢與寫入的影響"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exchanges", type=int, default=50000, help="兌換紀錄筆數（預設 50000）")
+        parser.add_argument("--stores", type=int, default=10, help="店家數量（預設 10）")
+        parser.add_argument("--products-per-store", type=int, default=20, help="每個店家的商品數（預設 20）")
+        parser.add_argument("--members", type=int, default=200, help="會員數量（預設 200）")
+        parser.add_argument(
+            "--pending-ratio", type=float, default=0.1, help="待核銷紀錄比例（預設 0.1）"
+        )
+        parser.add_argument("--iterations", type=int, default=200, help="查詢次數（預設 200）")
+        parser.add_argument("--inserts", type=int, default=1000, help="寫入筆數（預設 1000）")
+
+    def handle(self, *args, **options):
+        """執行基準測試"""
+        modes = ["current"]
+        if connection.vendor == "postgresql":
+            modes.insert(0, "legacy")
+        else:
+            self.stdout.write(
+                self.style.WARNING(f"目前資料庫為 {connection.vendor}，僅量測現行索引（新舊比較需使用 PostgreSQL）")
+            )
+
+        results = {}
+        for mode in modes:
+            self.stdout.write(self.style.SUCCESS(f"\n[{mode}] 建立測試資料並量測..."))
+            results[mode] = self._run(mode, options)
+            self.stdout.write("  查詢計畫：\n    " + "\n    ".join(results[mode]["plan"].splitlines()))
+
+        self.stdout.write(self.style.SUCCESS("\n結果："))
+        self.stdout.write(f"  {'索引':<10}{'列表 p50 (ms)':>16}{'列表 p95 (ms)':>16}{'寫入 (rows/s)':>16}")
+        for mode, result in results.items():
+            self.stdout.write(
+                f"  {mode:<10}{result['p50']:>16.2f}{result['p95']:>16.2f}{result['insert_rate']:>16.0f}"
+            )
+
+        if "legacy" in results:
+            legacy, current = results["legacy"], results["current"]
+            self.stdout.write(
+                f"\n  列表 p95：{legacy['p95'] / max(current['p95'], 1e-9):.1f} 倍，"
+                f"寫入吞吐量：{current['insert_rate'] / max(legacy['insert_rate'], 1e-9):.2f} 倍"
+            )
+
+    def _run(self, mode, options):
+        """於交易中建立資料並量測，結束後回滾"""
+        with transaction.atomic():
+            if mode == "legacy":
+                self._use_legacy_indexes()
+
+            stores, products, members = self._seed(options)
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {connection.ops.quote_name(PointExchange._meta.db_table)}")
+
+            timings = []
+            for _ in range(options["iterations"]):
+                store = random.choice(stores)
+                started = time.perf_counter()
+                queryset = self._pending_list(store)
+                queryset.count()
+                list(queryset[:20])
+                timings.append(time.perf_counter() - started)
+
+            plan = self._pending_list(stores[0])[:20].explain()
+
+            started = time.perf_counter()
+            for index in range(options["inserts"]):
+                product = random.choice(products)
+                PointExchange.objects.create(
+                    user=random.choice(members),
+                    product=product,
+                    exchange_code=f"BN{index:012d}",
+                    quantity=1,
+                    points_spent=product.required_points,
+                    status=ExchangeStatusChoices.PENDING,
+                )
+            elapsed = time.perf_counter() - started
+
+            transaction.set_rollback(True)
+
+        return {
+            "p50": percentile(timings, 50),
+            "p95": percentile(timings, 95),
+            "insert_rate": options["inserts"] / elapsed if elapsed else 0.0,
+            "plan": plan,
+        }
+
+    def _use_legacy_indexes(self):
+        """將索引換回舊設計（在交易中執行，隨交易回滾）"""
+        with connection.schema_editor() as editor:
+            for index in PointExchange._meta.indexes:
+                editor.remove_index(PointExchange, index)
+            for index in LEGACY_INDEXES:
+                editor.add_index(PointExchange, index)
+
+    def _pending_list(self, store):
+        """店家待核銷列表查詢（與 PointExchangeViewSet 相同）"""
+        return (
+            PointExchange.objects.select_related("user", "product", "product__store")
+            .filter(product__store=store, status=ExchangeStatusChoices.PENDING)
+            .order_by("-created_at")
+        )
+
+    def _seed(self, options):
+        """建立店家、會員、商品與兌換紀錄"""
+        stores = User.objects.bulk_create(
+            [
+                User(username=f"bench_idx_store_{index}", email=f"bench_idx_store_{index}@example.com",
+                     role=RoleChoices.STORE, password="!")
+                for index in range(options["stores"])
+            ]
+        )
+        members = User.objects.bulk_create(
+            [
+                User(username=f"bench_idx_member_{index}", email=f"bench_idx_member_{index}@example.com",
+                     role=RoleChoices.MEMBER, password="!")
+                for index in range(options["members"])
+            ]
+        )
+        products = Product.objects.bulk_create(
+            [
+                Product(store=store, name=f"{store.username} 商品 {index}", required_points=100, stock=1000)
+                for store in stores
+                for index in range(options["products_per_store"])
+            ]
+        )
+
+        # bulk_create 會以 auto_now_add 覆寫 created_at，建立期間暫時停用以分散建立時間
+        created_at_field = PointExchange._meta.get_field("created_at")
+        created_at_field.auto_now_add = False
+        try:
+            now = timezone.now()
+            batch = []
+            for index in range(options["exchanges"]):
+                product = random.choice(products)
+                created_at = now - timedelta(minutes=options["exchanges"] - index)
+                batch.append(
+                    PointExchange(
+                        user=random.choice(members),
+                        product=product,
+                        exchange_code=f"BI{index:012d}",
+                        quantity=1,
+                        points_spent=product.required_points,
+                        status=(
+                            ExchangeStatusChoices.PENDING
+                            if random.random() < options["pending_ratio"]
+                            else ExchangeStatusChoices.VERIFIED
+                        ),
+                        created_at=created_at,
+                    )
+                )
+                if len(batch) >= BATCH_SIZE:
+                    PointExchange.objects.bulk_create(batch)
+                    batch = []
+            PointExchange.objects.bulk_create(batch)
+        finally:
+            created_at_field.auto_now_add = True
+
+        return stores, products, members
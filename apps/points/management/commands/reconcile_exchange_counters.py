@@ -0,0 +1,53 @@
+"""
+兌換統計計數器對帳的 Django 管理指令
+
+使用方式：
+    python manage.py reconcile_exchange_counters
+    python manage.py reconcile_exchange_counters --dry-run
+
+依兌換紀錄重新計算每個商品各狀態的筆數、數量與點數，並修正與計數器不一致之處。
+建議以排程定期執行（例如每日一次），--dry-run 僅列出差異不修正。
+"""
+
+from django.core.management.base import BaseCommand
+from apps.points.services.exchange_counter_service import ExchangeCounterService
+
+
+class Command(BaseCommand):
+    help = "依兌換紀錄對帳並修正兌換統計計數器"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="僅列出差異，不修正計數器",
+        )
+
+    def handle(self, *args, **options):
+        """執行計數器對帳"""
+        dry_run = options["dry_run"]
+        self.stdout.write(self.style.SUCCESS("開始對帳兌換統計計數器..."))
+
+        differences = ExchangeCounterService.reconcile(dry_run=dry_run)
+
+        if not differences:
+            self.stdout.write(self.style.SUCCESS("\n完成！計數器與兌換紀錄一致"))
+            return
+
+        self.stdout.write(
+            self.style.WARNING(f"\n發現 {len(differences)} 筆差異：")
+        )
+        for difference in differences:
+            expected = difference["expected"]
+            actual = difference["actual"]
+            self.stdout.write(
+                f"  ✗ 商品 {difference['product_id']} {difference['status']}："
+                f"筆數 {actual['exchange_count']} -> {expected['exchange_count']}，"
+                f"數量 {actual['quantity_total']} -> {expected['quantity_total']}，"
+                f"點數 {actual['points_total']} -> {expected['points_total']}"
+            )
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING("\n--dry-run：未修正計數器"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"\n完成！已修正 {len(differences)} 筆計數器"))
@@ -0,0 +1,505 @@
+"""
+兌換與儲值併發壓力測試的 Django 管理指令（僅支援 PostgreSQL）
+
+使用方式：
+    python manage.py stress_points
+    python manage.py stress_points --clients 400 --requests 30 --mode processes
+    python manage.py stress_points --mode threads --products 3 --stock 20
+
+與 manage.py test 相同建立獨立的測試資料庫（含分片），不會影響開發資料。
+以數百個併發客戶端對 PointExchangeView 與 PointDepositView 發送請求（完整的中間件堆疊）：
+- threads：所有客戶端在同一個行程的執行緒中執行
+- processes：客戶端分散到多個行程（fork），每個行程再以執行緒執行
+- 兌換混合多個熱門商品與數量（1～3），客戶端多於會員，同一個錢包會被多個客戶端同時鎖定；
+  部分會員的錢包為鎖定狀態
+
+每種模式使用各自建立的資料，結束後檢查：
+- 庫存在壓力測試期間與結束後都不為負數
+- 每個會員的交易紀錄加總等於錢包餘額，最後一筆交易的 balance_after 等於餘額
+- 每個商品的兌換數量加總等於初始庫存減去剩餘庫存，且需求足夠時恰好售完（剩餘庫存為 0）
+- 成功的兌換回應數等於兌換紀錄筆數，兌換統計計數器與兌換紀錄一致
+並輸出吞吐量、各操作的延遲、鎖定等待時間分佈（points_lock_wait_seconds）與死鎖、序列化失敗等錯誤次數。
+任一項檢查失敗時指令以錯誤結束。
+"""
+
+import multiprocessing
+import os
+import random
+import statistics
+import threading
+import time
+from collections import Counter as CounterDict
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+from django.db.models import Min, Sum
+from django.test import override_settings
+from django.test.utils import setup_databases, teardown_databases
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices, UserPoints
+from apps.products.models import Product
+from apps.points.metrics import deposit_requests, exchange_requests, lock_wait
+from apps.points.models import PointExchange, PointTransaction, TransactionTypeChoices
+from apps.points.services.exchange_counter_service import ExchangeCounterService
+from core.db.pool import close_pools
+from core.db.sharding import shard_for_user, sharding_enabled
+from utils.metrics import Histogram
+
+User = get_user_model()
+
+# PostgreSQL 錯誤代碼
+PGCODE_ERRORS = {
+    "40P01": "deadlock",
+    "40001": "serialization_failure",
+    "55P03": "lock_not_available",
+    "57014": "query_canceled",
+}
+
+EXCHANGE_RATIO = 0.7
+INITIAL_BALANCE = 5000
+
+
+def percentile(values, percent):
+    """計算百分位數（毫秒）"""
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[percent - 1] * 1000
+
+
+def classify_error(exc):
+    """
+    例外的分類（死鎖、序列化失敗等依 PostgreSQL 錯誤代碼，其餘為例外類別名稱）
+
+    Django 的資料庫例外以 __cause__ 保留驅動程式的例外（psycopg2 的 pgcode）。
+    """
+    current = exc
+    while current is not None:
+        code = getattr(current, "pgcode", None)
+        if code in PGCODE_ERRORS:
+            return PGCODE_ERRORS[code]
+        current = current.__cause__ or current.__context__
+    return type(exc).__name__
+
+
+def _counter_delta(counter, before):
+    return {
+        key[0]: value - before.get(key, 0)
+        for key, value in counter.series().items()
+        if value != before.get(key, 0)
+    }
+
+
+def _histogram_delta(histogram, before):
+    delta = {}
+    for key, series in histogram.series().items():
+        previous = before.get(key)
+        if previous is None:
+            delta[key] = series
+            continue
+        counts = [after - prior for after, prior in zip(series["counts"], previous["counts"])]
+        if any(counts):
+            delta[key] = {
+                "counts": counts,
+                "count": series["count"] - previous["count"],
+                "sum": series["sum"] - previous["sum"],
+            }
+    return delta
+
+
+def run_clients(plan, client_ids, start_barrier=None):
+    """
+    在目前的行程以執行緒執行客戶端
+
+    Args:
+        plan: 客戶端共用的設定（會員權杖、商品、每個客戶端的請求數、亂數種子）
+        client_ids: 此行程負責的客戶端編號
+        start_barrier: 所有行程同時開始的 multiprocessing.Barrier（threads 模式為 None）
+
+    Returns:
+        dict: 每個請求的 (操作, 結果, 秒數)、兌換 / 儲值結果與鎖定等待時間的差值（可 pickle）
+    """
+    exchanges_before = exchange_requests.series()
+    deposits_before = deposit_requests.series()
+    lock_wait_before = lock_wait.series()
+
+    samples = []
+    samples_lock = threading.Lock()
+    thread_barrier = threading.Barrier(len(client_ids))
+
+    def client(client_id):
+        rng = random.Random(plan["seed"] * 100003 + client_id)
+        token = plan["tokens"][client_id % len(plan["tokens"])]
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        local_samples = []
+
+        thread_barrier.wait()
+        for _ in range(plan["requests"]):
+            if rng.random() < EXCHANGE_RATIO:
+                action = "exchange"
+                path = "/api/points/exchange/"
+                data = {"product_id": rng.choice(plan["products"]), "quantity": rng.choice((1, 1, 2, 3))}
+            else:
+                action = "deposit"
+                path = "/api/points/deposit/"
+                data = {"amount": rng.randint(1, 500)}
+
+            started = time.perf_counter()
+            try:
+                response = api_client.post(path, data, format="json")
+                outcome = "ok" if response.status_code < 500 else f"http_{response.status_code}"
+            except Exception as exc:
+                outcome = classify_error(exc)
+            finally:
+                # 與實際伺服器相同，請求結束時歸還連線（test client 不會關閉連線）
+                connections.close_all()
+            local_samples.append((action, outcome, time.perf_counter() - started))
+
+        with samples_lock:
+            samples.extend(local_samples)
+
+    threads = [threading.Thread(target=client, args=(client_id,)) for client_id in client_ids]
+    if start_barrier is not None:
+        start_barrier.wait()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "samples": samples,
+        "exchanges": _counter_delta(exchange_requests, exchanges_before),
+        "deposits": _counter_delta(deposit_requests, deposits_before),
+        "lock_wait": _histogram_delta(lock_wait, lock_wait_before),
+    }
+
+
+def _process_main(plan, client_ids, start_barrier, queue):
+    try:
+        queue.put(run_clients(plan, client_ids, start_barrier))
+    except BaseException as exc:
+        queue.put({"error": repr(exc)})
+        raise
+
+
+class Command(BaseCommand):
+    help = "以大量併發客戶端對兌換與儲值施壓，並檢查庫存、餘額與交易紀錄的一致性（僅支援 PostgreSQL）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=200, help="併發客戶端數量（預設 200）")
+        parser.add_argument("--requests", type=int, default=20, help="每個客戶端的請求數（預設 20）")
+        parser.add_argument(
+            "--mode",
+            choices=("threads", "processes", "both"),
+            default="both",
+            help="以執行緒、多行程或兩者依序執行（預設 both）",
+        )
+        parser.add_argument(
+            "--processes", type=int, default=os.cpu_count() or 2, help="processes 模式的行程數（預設 CPU 數量）"
+        )
+        parser.add_argument("--members", type=int, default=50, help="會員數量（預設 50，少於客戶端數以產生錢包競爭）")
+        parser.add_argument("--locked-ratio", type=float, default=0.1, help="錢包鎖定的會員比例（預設 0.1）")
+        parser.add_argument("--products", type=int, default=5, help="熱門商品數量（預設 5）")
+        parser.add_argument("--stock", type=int, default=100, help="每個商品的初始庫存（預設 100）")
+        parser.add_argument("--seed", type=int, default=0, help="亂數種子（預設 0）")
+        parser.add_argument("--timeout", type=float, default=600, help="每種模式的逾時秒數（預設 600）")
+
+    def handle(self, *args, **options):
+        """建立測試資料庫並依序執行各模式"""
+        if connections["default"].vendor != "postgresql":
+            raise CommandError("併發壓力測試需要 PostgreSQL（row lock 與多個連線），目前為 " + connections["default"].vendor)
+
+        modes = ["threads", "processes"] if options["mode"] == "both" else [options["mode"]]
+        demand = options["clients"] * options["requests"] * EXCHANGE_RATIO * 1.75
+        if demand < options["products"] * options["stock"] * 2:
+            self.stdout.write(self.style.WARNING("兌換需求不足初始庫存的兩倍，商品可能不會售完"))
+
+        verbosity = options["verbosity"]
+        old_config = setup_databases(verbosity, interactive=False, serialized_aliases=set())
+        failures = []
+        try:
+            # 存取日誌以背景執行緒輸出，壓力測試時停用避免大量輸出
+            with override_settings(DEBUG=False, ACCESS_LOG_ENABLED=False):
+                for mode in modes:
+                    failures += self._run_mode(mode, options)
+        finally:
+            connections.close_all()
+            close_pools()
+            teardown_databases(old_config, verbosity)
+
+        if failures:
+            raise CommandError(f"{len(failures)} 項一致性檢查失敗")
+        self.stdout.write(self.style.SUCCESS("\n所有一致性檢查通過"))
+
+    def _run_mode(self, mode, options):
+        """建立資料、施壓並檢查，回傳失敗的檢查"""
+        self.stdout.write(self.style.SUCCESS(f"\n[{mode}] 建立測試資料..."))
+        data = self._seed(mode, options)
+        plan = {
+            "tokens": data["tokens"],
+            "products": data["product_ids"],
+            "requests": options["requests"],
+            "seed": options["seed"],
+        }
+        client_ids = list(range(options["clients"]))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"[{mode}] {options['clients']} 個客戶端，每個 {options['requests']} 個請求...")
+        )
+        monitor = StockMonitor(data["product_ids"])
+        started = time.perf_counter()
+        try:
+            if mode == "threads":
+                monitor.start()
+                outputs = [run_clients(plan, client_ids)]
+            else:
+                outputs = self._run_processes(plan, client_ids, options, monitor)
+        finally:
+            elapsed = time.perf_counter() - started
+            monitor.stop()
+
+        summary = self._summarize(outputs)
+        self._report(mode, summary, elapsed)
+        return self._check_invariants(mode, data, summary, monitor, options)
+
+    def _run_processes(self, plan, client_ids, options, monitor):
+        """以 fork 建立多個行程執行客戶端（子行程建立後才開始監看庫存）"""
+        # fork 前關閉連線與連線池，子行程各自建立連線（測試資料庫名稱由父行程繼承）
+        connections.close_all()
+        close_pools()
+
+        context = multiprocessing.get_context("fork")
+        count = max(1, min(options["processes"], len(client_ids)))
+        start_barrier = context.Barrier(count)
+        queue = context.Queue()
+        processes = [
+            context.Process(target=_process_main, args=(plan, client_ids[index::count], start_barrier, queue))
+            for index in range(count)
+        ]
+        for process in processes:
+            process.start()
+        monitor.start()
+
+        outputs = []
+        try:
+            for _ in processes:
+                output = queue.get(timeout=options["timeout"])
+                if "error" in output:
+                    raise CommandError(f"子行程執行失敗：{output['error']}")
+                outputs.append(output)
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+        return outputs
+
+    def _seed(self, mode, options):
+        """建立店家、會員（含開戶儲值紀錄）與熱門商品"""
+        prefix = f"stress_{mode}"
+        store = User.objects.create_user(
+            username=f"{prefix}_store", email=f"{prefix}_store@example.com", password=None, role=RoleChoices.STORE
+        )
+        members = [
+            User.objects.create_user(
+                username=f"{prefix}_member_{index}",
+                email=f"{prefix}_member_{index}@example.com",
+                password=None,
+                role=RoleChoices.MEMBER,
+            )
+            for index in range(options["members"])
+        ]
+        locked_count = int(len(members) * options["locked_ratio"])
+
+        # 開戶儲值：錢包餘額與交易紀錄加總一致，之後每筆異動都需維持
+        for index, member in enumerate(members):
+            UserPoints.objects.for_user(member.id).filter(user_id=member.id).update(
+                balance=INITIAL_BALANCE, is_locked=index < locked_count
+            )
+            PointTransaction.objects.for_user(member.id).create(
+                user=member,
+                amount=INITIAL_BALANCE,
+                tx_type=TransactionTypeChoices.DEPOSIT,
+                balance_after=INITIAL_BALANCE,
+                memo="壓力測試開戶",
+            )
+
+        products = Product.objects.bulk_create(
+            [
+                Product(store=store, name=f"{prefix} 熱門商品 {index}", required_points=10, stock=options["stock"])
+                for index in range(options["products"])
+            ]
+        )
+        if sharding_enabled():
+            call_command("configure_shard_sequences", stdout=StringIO())
+
+        return {
+            "members": members,
+            "product_ids": [product.id for product in products],
+            "tokens": [str(RefreshToken.for_user(member).access_token) for member in members],
+        }
+
+    @staticmethod
+    def _summarize(outputs):
+        """合併各行程的結果"""
+        lock_histogram = Histogram(
+            "stress_lock_wait_seconds", "鎖定等待時間", labels=lock_wait.labels, buckets=lock_wait.buckets, registry=None
+        )
+        summary = {
+            "samples": [],
+            "exchanges": CounterDict(),
+            "deposits": CounterDict(),
+            "lock_wait": lock_histogram,
+        }
+        for output in outputs:
+            summary["samples"] += output["samples"]
+            summary["exchanges"].update(output["exchanges"])
+            summary["deposits"].update(output["deposits"])
+            lock_histogram.merge(output["lock_wait"])
+        return summary
+
+    def _report(self, mode, summary, elapsed):
+        samples = summary["samples"]
+        self.stdout.write(
+            f"  總請求數 {len(samples)}，耗時 {elapsed:.1f} 秒，吞吐量 {len(samples) / elapsed:.0f} req/s"
+        )
+
+        self.stdout.write(f"\n  {'操作':<10}{'請求數':>8}{'p50 (ms)':>12}{'p95 (ms)':>12}{'p99 (ms)':>12}")
+        for action in ("exchange", "deposit"):
+            durations = [duration for name, _, duration in samples if name == action]
+            self.stdout.write(
+                f"  {action:<10}{len(durations):>8}{percentile(durations, 50):>12.2f}"
+                f"{percentile(durations, 95):>12.2f}{percentile(durations, 99):>12.2f}"
+            )
+
+        for name in ("exchanges", "deposits"):
+            results = "、".join(f"{result} {count}" for result, count in sorted(summary[name].items()))
+            self.stdout.write(f"  {name} 結果：{results or '無'}")
+
+        errors = CounterDict(outcome for _, outcome, _ in samples if outcome != "ok")
+        if errors:
+            self.stdout.write(self.style.WARNING("  錯誤：" + "、".join(f"{kind} {count}" for kind, count in errors.items())))
+        else:
+            self.stdout.write("  錯誤：無（沒有死鎖或序列化失敗）")
+
+        histogram = summary["lock_wait"]
+        self.stdout.write(f"\n  {'鎖定等待':<20}{'次數':>8}{'平均 (ms)':>12}{'p50 (ms)':>12}{'p95 (ms)':>12}{'p99 (ms)':>12}")
+        for key, series in sorted(histogram.series().items()):
+            labels = dict(zip(histogram.labels, key))
+            quantiles = [(histogram.quantile(q, **labels) or 0.0) * 1000 for q in (0.5, 0.95, 0.99)]
+            self.stdout.write(
+                f"  {'/'.join(key):<20}{series['count']:>8}{series['sum'] / series['count'] * 1000:>12.2f}"
+                + "".join(f"{value:>12.2f}" for value in quantiles)
+            )
+        for key, series in sorted(histogram.series().items()):
+            buckets = "  ".join(
+                f"≤{bound * 1000:g}ms:{count}" for bound, count in zip(histogram.buckets, series["counts"]) if count
+            )
+            overflow = series["counts"][-1]
+            self.stdout.write(f"    {'/'.join(key)}  {buckets}" + (f"  >{histogram.buckets[-1]}s:{overflow}" if overflow else ""))
+
+    def _check_invariants(self, mode, data, summary, monitor, options):
+        """一致性檢查，回傳失敗的檢查說明"""
+        failures = []
+
+        def check(condition, message):
+            self.stdout.write((self.style.SUCCESS("  ✓ ") if condition else self.style.ERROR("  ✗ ")) + message)
+            if not condition:
+                failures.append(f"[{mode}] {message}")
+
+        self.stdout.write(self.style.SUCCESS(f"\n[{mode}] 一致性檢查："))
+        product_ids = data["product_ids"]
+        members = data["members"]
+        member_ids = [member.id for member in members]
+
+        final_min = Product.objects.filter(id__in=product_ids).aggregate(Min("stock"))["stock__min"]
+        check(
+            (monitor.min_stock is None or monitor.min_stock >= 0) and final_min >= 0,
+            f"庫存不為負數（期間最低 {monitor.min_stock}，結束後最低 {final_min}，取樣 {monitor.samples} 次）",
+        )
+
+        exchanges = []
+        for alias in {shard_for_user(member_id) for member_id in member_ids}:
+            exchanges += list(
+                PointExchange.objects.on_shard(alias)
+                .filter(product_id__in=product_ids, user_id__in=member_ids)
+                .values("product_id", "quantity")
+            )
+        sold = CounterDict()
+        for exchange in exchanges:
+            sold[exchange["product_id"]] += exchange["quantity"]
+        stocks = dict(Product.objects.filter(id__in=product_ids).values_list("id", "stock"))
+        check(
+            all(sold[product_id] + stocks[product_id] == options["stock"] for product_id in product_ids),
+            "每個商品的兌換數量加總 + 剩餘庫存 = 初始庫存",
+        )
+        check(
+            all(stocks[product_id] == 0 for product_id in product_ids),
+            f"商品恰好售完（成功兌換數量 {sum(sold.values())} = 初始庫存 {options['stock'] * len(product_ids)}，"
+            f"剩餘 {sum(stocks.values())}）",
+        )
+        check(
+            summary["exchanges"].get("success", 0) == len(exchanges),
+            f"成功兌換回應數 {summary['exchanges'].get('success', 0)} = 兌換紀錄筆數 {len(exchanges)}",
+        )
+
+        mismatched, locked_changed = [], []
+        locked_count = int(len(members) * options["locked_ratio"])
+        for index, member in enumerate(members):
+            wallet = UserPoints.objects.for_user(member.id).get(user_id=member.id)
+            ledger = PointTransaction.objects.for_user(member.id).filter(user_id=member.id, is_success=True)
+            total = ledger.aggregate(Sum("amount"))["amount__sum"] or 0
+            latest = ledger.order_by("-created_at", "-id").values_list("balance_after", flat=True).first()
+            if wallet.balance < 0 or total != wallet.balance or latest != wallet.balance:
+                mismatched.append(f"{member.username}（餘額 {wallet.balance}，紀錄加總 {total}，最後 {latest}）")
+            if index < locked_count and wallet.balance != INITIAL_BALANCE:
+                locked_changed.append(member.username)
+        check(not mismatched, "每個錢包的交易紀錄加總 = 餘額 = 最後一筆 balance_after" + (
+            "：" + "、".join(mismatched[:5]) if mismatched else ""
+        ))
+        check(not locked_changed, f"鎖定的錢包（{locked_count} 個）餘額未變動")
+
+        differences = [
+            difference for difference in ExchangeCounterService.reconcile(dry_run=True)
+            if difference["product_id"] in product_ids
+        ]
+        check(not differences, f"兌換統計計數器與兌換紀錄一致（差異 {len(differences)} 筆）")
+        return failures
+
+
+class StockMonitor(threading.Thread):
+    """壓力測試期間定期查詢商品的最低庫存"""
+
+    def __init__(self, product_ids, interval=0.02):
+        super().__init__(daemon=True)
+        self.product_ids = product_ids
+        self.interval = interval
+        self.min_stock = None
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stopped.is_set():
+                self._sample()
+                self._stopped.wait(self.interval)
+            self._sample()
+        finally:
+            connections.close_all()
+
+    def _sample(self):
+        try:
+            value = Product.objects.filter(id__in=self.product_ids).aggregate(Min("stock"))["stock__min"]
+        except DatabaseError:
+            return
+        self.min_stock = value if self.min_stock is None else min(self.min_stock, value)
+        self.samples += 1
+
+    def stop(self):
+        self._stopped.set()
+        if self.is_alive():
+            self.join()
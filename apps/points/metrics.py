@@ -0,0 +1,55 @@
+"""
+點數兌換與儲值的指標（由 /metrics 輸出）
+
+- points_exchange_requests_total / points_deposit_requests_total：依結果（success 或失敗原因）累計
+- points_exchange_duration_seconds / points_deposit_duration_seconds：處理時間，依結果分組
+- points_lock_wait_seconds：select_for_update() 鎖定商品或錢包的時間（含查詢本身，鎖定競爭時主要為等待時間）
+"""
+
+import time
+from contextlib import contextmanager
+
+from utils.metrics import Counter, Histogram
+
+exchange_requests = Counter(
+    "points_exchange_requests_total",
+    "兌換請求數（依結果：success 或失敗原因）",
+    labels=("result",),
+)
+exchange_duration = Histogram(
+    "points_exchange_duration_seconds",
+    "兌換請求處理時間（秒）",
+    labels=("result",),
+)
+deposit_requests = Counter(
+    "points_deposit_requests_total",
+    "儲值請求數（依結果：success 或失敗原因）",
+    labels=("result",),
+)
+deposit_duration = Histogram(
+    "points_deposit_duration_seconds",
+    "儲值請求處理時間（秒）",
+    labels=("result",),
+)
+lock_wait = Histogram(
+    "points_lock_wait_seconds",
+    "select_for_update() 鎖定的時間（秒）",
+    labels=("operation", "resource"),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+@contextmanager
+def track_lock_wait(operation, resource):
+    """
+    記錄區塊內 select_for_update() 查詢的時間
+
+    Args:
+        operation: exchange / deposit
+        resource: product / wallet
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        lock_wait.observe(time.perf_counter() - start, operation=operation, resource=resource)
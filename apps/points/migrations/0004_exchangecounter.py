@@ -0,0 +1,72 @@
+# Generated by Django 4.2.16 on 2026-10-19 04:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_exchange_counters(apps, schema_editor):
+    """依既有兌換紀錄建立計數器"""
+    PointExchange = apps.get_model("points", "PointExchange")
+    ExchangeCounter = apps.get_model("points", "ExchangeCounter")
+
+    rows = (
+        PointExchange.objects.values("product_id", "product__store_id", "status")
+        .annotate(
+            exchange_count=models.Count("id"),
+            quantity_total=models.Sum("quantity"),
+            points_total=models.Sum("points_spent"),
+        )
+        .order_by()
+    )
+    ExchangeCounter.objects.bulk_create(
+        [
+            ExchangeCounter(
+                store_id=row["product__store_id"],
+                product_id=row["product_id"],
+                status=row["status"],
+                exchange_count=row["exchange_count"],
+                quantity_total=row["quantity_total"],
+                points_total=row["points_total"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('products', '0002_alter_product_store'),
+        ('points', '0003_pointexchange_quantity_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='創建時間')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='修改時間')),
+                ('status', models.CharField(choices=[('PENDING', '待核銷'), ('VERIFIED', '已核銷')], help_text='交換狀態：PENDING=待核銷, VERIFIED=已核銷', max_length=20)),
+                ('exchange_count', models.BigIntegerField(default=0, help_text='兌換筆數')),
+                ('quantity_total', models.BigIntegerField(default=0, help_text='兌換數量合計')),
+                ('points_total', models.BigIntegerField(default=0, help_text='消費點數合計')),
+                ('product', models.ForeignKey(help_text='兌換商品', on_delete=django.db.models.deletion.CASCADE, related_name='exchange_counters', to='products.product')),
+                ('store', models.ForeignKey(help_text='所屬店家', on_delete=django.db.models.deletion.CASCADE, related_name='exchange_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': '兌換統計計數器',
+                'verbose_name_plural': '兌換統計計數器',
+                'db_table': 'point_exchange_counters',
+                'indexes': [models.Index(fields=['store', 'status'], name='point_excha_store_i_6155e5_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='exchangecounter',
+            constraint=models.UniqueConstraint(fields=('product', 'status'), name='uniq_exchange_counter_product_status'),
+        ),
+        migrations.RunPython(backfill_exchange_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.16 on 2026-10-19 04:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('points', '0004_exchangecounter'),
+    ]
+
+    # 先建立新索引再移除舊索引，避免調整期間查詢沒有可用的索引
+    operations = [
+        migrations.AddIndex(
+            model_name='pointexchange',
+            index=models.Index(fields=['user', '-created_at'], name='point_exch_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pointexchange',
+            index=models.Index(fields=['product', '-created_at'], name='point_exch_product_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pointexchange',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['product', '-created_at'], include=('id', 'user', 'exchange_code', 'quantity', 'points_spent'), name='point_exch_pending_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pointexchange',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['-created_at'], name='point_exch_pending_created_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='pointexchange',
+            name='point_excha_user_id_2ebcd9_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pointexchange',
+            name='point_excha_product_504508_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pointexchange',
+            name='point_excha_exchang_8476b3_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pointexchange',
+            name='point_excha_status_556d60_idx',
+        ),
+    ]
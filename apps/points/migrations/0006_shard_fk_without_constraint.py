@@ -0,0 +1,25 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:09
+
+from django.conf import settings
+from django.db import migrations
+import core.db.operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('products', '0002_alter_product_store'),
+        ('points', '0005_pointexchange_index_redesign'),
+    ]
+
+    operations = [
+        core.db.operations.DropForeignKeyConstraintOnShards(
+            model_name='pointexchange',
+            fields=('product', 'user'),
+        ),
+        core.db.operations.DropForeignKeyConstraintOnShards(
+            model_name='pointtransaction',
+            fields=('user',),
+        ),
+    ]
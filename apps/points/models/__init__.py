@@ -1,9 +1,11 @@
 from .point_transaction_model import PointTransaction, TransactionTypeChoices
 from .point_exchange_model import PointExchange, ExchangeStatusChoices
+from .exchange_counter_model import ExchangeCounter
 
 __all__ = [
     "PointTransaction",
     "TransactionTypeChoices",
     "PointExchange",
     "ExchangeStatusChoices",
+    "ExchangeCounter",
 ]
@@ -0,0 +1,66 @@
+from django.db import models
+from django.conf import settings
+from core.models.base_model import BaseModel
+from apps.products.models import Product
+from .point_exchange_model import ExchangeStatusChoices
+
+
+class ExchangeCounter(BaseModel):
+    """
+    兌換統計計數器模型
+    
+    以 (店家, 商品, 狀態) 為單位累計兌換筆數、數量與點數，
+    於兌換與核銷的事務中以 F() 增減，店家統計只需讀取計數器，不需掃描兌換紀錄。
+    """
+    
+    store = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="exchange_counters",
+        help_text="所屬店家",
+    )
+    
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="exchange_counters",
+        help_text="兌換商品",
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=ExchangeStatusChoices.choices,
+        help_text="交換狀態：PENDING=待核銷, VERIFIED=已核銷",
+    )
+    
+    exchange_count = models.BigIntegerField(
+        default=0,
+        help_text="兌換筆數",
+    )
+    
+    quantity_total = models.BigIntegerField(
+        default=0,
+        help_text="兌換數量合計",
+    )
+    
+    points_total = models.BigIntegerField(
+        default=0,
+        help_text="消費點數合計",
+    )
+    
+    class Meta:
+        db_table = "point_exchange_counters"
+        verbose_name = "兌換統計計數器"
+        verbose_name_plural = "兌換統計計數器"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "status"],
+                name="uniq_exchange_counter_product_status",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["store", "status"]),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} {self.status}: {self.exchange_count}"
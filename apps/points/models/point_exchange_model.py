@@ -3,6 +3,7 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from core.models.base_model import BaseModel
+from core.db.sharding import ShardedManager
 from apps.products.models import Product
 
 
@@ -17,8 +18,12 @@ class PointExchange(BaseModel):
     點數兌換紀錄模型
     
     記錄會員使用點數兌換商品的完整資訊，包含交換序號供店家核銷使用。
+    與會員的 UserPoints 一起依 user_id 分片（見 core.db.sharding），商品留在主資料庫，
+    分片上的 user 與 product 不建立資料庫外鍵約束（migration 0006）。
     """
     
+    SHARD_KEY = "user_id"
+    
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -57,16 +62,32 @@ class PointExchange(BaseModel):
         help_text="交換狀態：PENDING=待核銷, VERIFIED=已核銷",
     )
     
+    objects = ShardedManager()
+    
     class Meta:
         db_table = "point_exchanges"
         verbose_name = "點數兌換紀錄"
         verbose_name_plural = "點數兌換紀錄"
         ordering = ["-created_at"]
+        # exchange_code 已有 unique 約束（即唯一索引），不另建索引
         indexes = [
-            models.Index(fields=["user", "status"]),
-            models.Index(fields=["product", "status"]),
-            models.Index(fields=["exchange_code"]),
-            models.Index(fields=["status"]),
+            # 會員兌換紀錄列表：WHERE user_id = ? ORDER BY created_at DESC
+            models.Index(fields=["user", "-created_at"], name="point_exch_user_created_idx"),
+            # 店家兌換紀錄列表（不限狀態）：WHERE product_id IN (...) ORDER BY created_at DESC
+            models.Index(fields=["product", "-created_at"], name="point_exch_product_created_idx"),
+            # 店家待核銷列表：僅索引 PENDING 紀錄，並包含常用欄位以支援 index-only scan
+            models.Index(
+                fields=["product", "-created_at"],
+                name="point_exch_pending_product_idx",
+                condition=models.Q(status=ExchangeStatusChoices.PENDING),
+                include=["id", "user", "exchange_code", "quantity", "points_spent"],
+            ),
+            # 管理員待核銷列表：WHERE status = 'PENDING' ORDER BY created_at DESC
+            models.Index(
+                fields=["-created_at"],
+                name="point_exch_pending_created_idx",
+                condition=models.Q(status=ExchangeStatusChoices.PENDING),
+            ),
         ]
     
     def __str__(self):
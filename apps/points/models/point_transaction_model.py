@@ -3,6 +3,7 @@ from django.core.validators import MinValueValidator
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from core.models.base_model import BaseModel
+from core.db.sharding import ShardedManager
 
 
 class TransactionTypeChoices(models.TextChoices):
@@ -17,8 +18,11 @@ class PointTransaction(BaseModel):
     
     記錄所有點數異動，包含儲值、兌換等操作。
     使用資料庫事務確保 UserPoints 餘額更新與交易紀錄的一致性。
+    與 UserPoints 一起依 user_id 分片（見 core.db.sharding），分片上的 user 不建立資料庫外鍵約束（migration 0006）。
     """
     
+    SHARD_KEY = "user_id"
+    
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -53,6 +57,8 @@ class PointTransaction(BaseModel):
         help_text="備註",
     )
     
+    objects = ShardedManager()
+    
     class Meta:
         db_table = "point_transactions"
         verbose_name = "點數交易紀錄"
@@ -4,7 +4,11 @@ from .point_exchange_serializer import PointExchangeSerializer
 from .point_exchange_list_serializer import (
     PointExchangeListSerializer,
     PointExchangeVerifySerializer,
+    PointExchangeUserSerializer,
+    PointExchangeSideloadSerializer,
 )
+from .point_exchange_bulk_verify_serializer import PointExchangeBulkVerifySerializer
+from .point_exchange_offline_sync_serializer import PointExchangeOfflineSyncSerializer
 
 __all__ = [
     "PointDepositSerializer",
@@ -12,4 +16,8 @@ __all__ = [
     "PointExchangeSerializer",
     "PointExchangeListSerializer",
     "PointExchangeVerifySerializer",
+    "PointExchangeUserSerializer",
+    "PointExchangeSideloadSerializer",
+    "PointExchangeBulkVerifySerializer",
+    "PointExchangeOfflineSyncSerializer",
 ]
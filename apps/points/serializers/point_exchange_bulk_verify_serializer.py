@@ -0,0 +1,32 @@
+from rest_framework import serializers
+from apps.points.services.exchange_verify_service import ExchangeVerifyService
+
+
+class PointExchangeBulkVerifySerializer(serializers.Serializer):
+    """
+    點數兌換批次核銷序列化器
+
+    接收交換序號列表（codes）或兌換紀錄 ID 列表（ids），兩者擇一。
+    """
+
+    codes = serializers.ListField(
+        child=serializers.CharField(max_length=20),
+        required=False,
+        allow_empty=False,
+        max_length=ExchangeVerifyService.MAX_ITEMS,
+        help_text="交換序號列表",
+    )
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=ExchangeVerifyService.MAX_ITEMS,
+        help_text="兌換紀錄 ID 列表",
+    )
+
+    def validate(self, attrs):
+        """驗證 codes 與 ids 必須擇一提供"""
+        if ("codes" in attrs) == ("ids" in attrs):
+            raise serializers.ValidationError("請提供 codes 或 ids 其中之一")
+        return attrs
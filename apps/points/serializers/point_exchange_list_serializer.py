@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from django.contrib.auth import get_user_model
 from apps.points.models import PointExchange
 from apps.products.serializers import ProductSerializer
 
+User = get_user_model()
+
 
 class PointExchangeListSerializer(serializers.ModelSerializer):
     """
@@ -85,3 +88,57 @@ class PointExchangeVerifySerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("已核銷的紀錄無法改回待核銷狀態")
         
         return value
+
+
+class PointExchangeUserSerializer(serializers.ModelSerializer):
+    """
+    兌換會員序列化器
+
+    用於側載（sideload）回應的 included.users，每位會員僅輸出一次。
+    """
+
+    class Meta:
+        model = User
+        fields = ["id", "username", "email"]
+        read_only_fields = ["id", "username", "email"]
+
+
+class PointExchangeSideloadSerializer(serializers.ModelSerializer):
+    """
+    點數兌換紀錄側載序列化器
+
+    用於 ?sideload=true 的列表回應：每筆紀錄僅以 user_id / product_id 參照關聯資料，
+    商品與會員資訊改由回應最上層的 included 統一提供，避免重複輸出相同物件。
+    """
+
+    user_id = serializers.IntegerField(
+        read_only=True,
+        help_text="兌換會員 ID（對應 included.users）",
+    )
+
+    product_id = serializers.IntegerField(
+        read_only=True,
+        help_text="兌換商品 ID（對應 included.products）",
+    )
+
+    status_display = serializers.CharField(
+        source="get_status_display",
+        read_only=True,
+        help_text="交換狀態顯示名稱",
+    )
+
+    class Meta:
+        model = PointExchange
+        fields = [
+            "id",
+            "exchange_code",
+            "user_id",
+            "product_id",
+            "quantity",
+            "points_spent",
+            "status",
+            "status_display",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
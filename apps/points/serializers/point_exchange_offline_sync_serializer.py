@@ -0,0 +1,17 @@
+from rest_framework import serializers
+from apps.points.services.exchange_verify_service import ExchangeVerifyService
+
+
+class PointExchangeOfflineSyncSerializer(serializers.Serializer):
+    """
+    點數兌換離線核銷同步序列化器
+
+    接收店家離線時掃描並暫存的簽章交換序號列表（signed_code）。
+    """
+
+    tokens = serializers.ListField(
+        child=serializers.CharField(max_length=500),
+        allow_empty=False,
+        max_length=ExchangeVerifyService.MAX_ITEMS,
+        help_text="簽章交換序號列表",
+    )
@@ -0,0 +1,60 @@
+"""
+跨分片兌換的補償服務
+
+啟用分片時兌換涉及兩個資料庫：使用者所屬的分片（錢包、兌換與交易紀錄）先提交，
+主資料庫（商品庫存、統計計數器）後提交。主資料庫提交失敗時庫存未扣除，
+需撤銷已提交的分片資料：
+- 退回錢包點數
+- 刪除兌換紀錄（交換序號失效）
+- 交易紀錄保留並標記為失敗（is_success=False），供對帳追蹤
+
+補償本身失敗時記錄錯誤日誌，需人工依日誌處理。
+"""
+
+import logging
+
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from apps.users.models import UserPoints
+from apps.points.models import PointExchange, PointTransaction
+
+logger = logging.getLogger(__name__)
+
+
+class ExchangeCompensationService:
+    """跨分片兌換的補償服務類別"""
+
+    @classmethod
+    def compensate(cls, shard, exchange, point_transaction):
+        """
+        撤銷已提交於分片的兌換
+
+        Args:
+            shard: 兌換紀錄所在的分片
+            exchange: 已建立的兌換紀錄
+            point_transaction: 已建立的交易紀錄
+
+        Returns:
+            bool: 是否補償成功
+        """
+        try:
+            with transaction.atomic(using=shard):
+                UserPoints.objects.on_shard(shard).filter(user_id=exchange.user_id).update(
+                    balance=F("balance") + exchange.points_spent
+                )
+                PointExchange.objects.on_shard(shard).filter(pk=exchange.pk).delete()
+                PointTransaction.objects.on_shard(shard).filter(pk=point_transaction.pk).update(
+                    is_success=False,
+                    memo=f"{point_transaction.memo}（兌換失敗，點數已退回）",
+                )
+        except DatabaseError:
+            logger.exception(
+                "跨分片兌換補償失敗：shard=%s exchange_id=%s transaction_id=%s user_id=%s points=%s",
+                shard,
+                exchange.pk,
+                point_transaction.pk,
+                exchange.user_id,
+                exchange.points_spent,
+            )
+            return False
+        return True
@@ -0,0 +1,205 @@
+"""
+兌換統計計數器服務
+
+以 (店家, 商品, 狀態) 累計兌換筆數、數量與點數：
+- 兌換：於兌換事務中增加 PENDING 計數
+- 核銷：於核銷事務中將計數由 PENDING 移至 VERIFIED
+- 對帳：reconcile_exchange_counters 指令依兌換紀錄重新計算並修正差異
+
+計數器在主資料庫，啟用分片時兌換紀錄分散在各分片，對帳會彙總所有分片的兌換紀錄。
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from apps.products.models import Product
+from apps.points.models import PointExchange, ExchangeCounter, ExchangeStatusChoices
+from core.db.sharding import shard_aliases
+
+COUNTER_FIELDS = ("exchange_count", "quantity_total", "points_total")
+
+
+class ExchangeCounterService:
+    """兌換統計計數器服務類別"""
+
+    @classmethod
+    def _add(cls, product_id, status, exchange_count, quantity, points, store_id=None):
+        """
+        以 F() 增減單一計數器，計數器不存在時先建立
+
+        必須在呼叫端的事務中執行，與兌換紀錄的異動一起提交或回滾。
+        """
+        counters = ExchangeCounter.objects.filter(product_id=product_id, status=status)
+        changes = {
+            "exchange_count": F("exchange_count") + exchange_count,
+            "quantity_total": F("quantity_total") + quantity,
+            "points_total": F("points_total") + points,
+            "updated_at": timezone.now(),
+        }
+        if counters.update(**changes):
+            return
+
+        if store_id is None:
+            store_id = Product.objects.values_list("store_id", flat=True).get(pk=product_id)
+        ExchangeCounter.objects.get_or_create(
+            product_id=product_id, status=status, defaults={"store_id": store_id}
+        )
+        counters.update(**changes)
+
+    @classmethod
+    def record_exchange(cls, exchange):
+        """記錄一筆新的兌換（PENDING）"""
+        cls._add(
+            exchange.product_id,
+            ExchangeStatusChoices.PENDING,
+            1,
+            exchange.quantity,
+            exchange.points_spent,
+            store_id=exchange.product.store_id,
+        )
+
+    @classmethod
+    def record_verified(cls, exchanges):
+        """
+        記錄核銷：將計數由 PENDING 移至 VERIFIED
+
+        Args:
+            exchanges: 已核銷紀錄的 (product_id, quantity, points_spent) 列表
+        """
+        totals = defaultdict(lambda: [0, 0, 0])
+        for product_id, quantity, points_spent in exchanges:
+            total = totals[product_id]
+            total[0] += 1
+            total[1] += quantity
+            total[2] += points_spent
+
+        # 依商品 ID 順序更新，避免並行核銷時互相鎖死
+        for product_id in sorted(totals):
+            exchange_count, quantity, points = totals[product_id]
+            cls._add(product_id, ExchangeStatusChoices.PENDING, -exchange_count, -quantity, -points)
+            cls._add(product_id, ExchangeStatusChoices.VERIFIED, exchange_count, quantity, points)
+
+    @classmethod
+    def get_stats(cls, store_id=None, product_id=None):
+        """
+        讀取兌換統計
+
+        Returns:
+            dict: 包含統計結果的字典
+                - totals: 各狀態的 count / quantity / points 合計
+                - products: 每個商品各狀態的 count / quantity / points
+        """
+        counters = ExchangeCounter.objects.all()
+        if store_id is not None:
+            counters = counters.filter(store_id=store_id)
+        if product_id is not None:
+            counters = counters.filter(product_id=product_id)
+
+        def empty():
+            return {status: {"count": 0, "quantity": 0, "points": 0} for status in ExchangeStatusChoices.values}
+
+        totals = empty()
+        products = {}
+        rows = counters.order_by("product_id").values_list(
+            "product_id", "status", *COUNTER_FIELDS
+        )
+        for row_product_id, status, exchange_count, quantity, points in rows:
+            product = products.setdefault(row_product_id, {"product_id": row_product_id, **empty()})
+            product[status] = {"count": exchange_count, "quantity": quantity, "points": points}
+            totals[status]["count"] += exchange_count
+            totals[status]["quantity"] += quantity
+            totals[status]["points"] += points
+
+        return {"totals": totals, "products": list(products.values())}
+
+    @classmethod
+    def _count_exchanges(cls, product_id):
+        """
+        彙總各分片中單一商品的兌換紀錄
+
+        Returns:
+            dict: {status: (exchange_count, quantity_total, points_total)}
+        """
+        expected = {}
+        for alias in shard_aliases():
+            rows = (
+                PointExchange.objects.on_shard(alias)
+                .filter(product_id=product_id)
+                .values("status")
+                .annotate(
+                    exchange_count=Count("id"),
+                    quantity_total=Sum("quantity"),
+                    points_total=Sum("points_spent"),
+                )
+                .order_by()
+            )
+            for row in rows:
+                totals = expected.get(row["status"], (0, 0, 0))
+                expected[row["status"]] = (
+                    totals[0] + row["exchange_count"],
+                    totals[1] + row["quantity_total"],
+                    totals[2] + row["points_total"],
+                )
+        return expected
+
+    @classmethod
+    def reconcile(cls, dry_run=False):
+        """
+        依兌換紀錄重新計算計數器並修正差異
+
+        逐商品處理：先鎖定商品與其計數器，兌換（鎖定商品）與核銷（更新計數器）會等待對帳完成，
+        不會與對帳結果互相覆蓋。
+
+        Returns:
+            list[dict]: 差異列表（product_id、status、expected、actual）
+        """
+        differences = []
+        product_ids = set(ExchangeCounter.objects.values_list("product_id", flat=True).order_by())
+        for alias in shard_aliases():
+            product_ids.update(
+                PointExchange.objects.on_shard(alias)
+                .values_list("product_id", flat=True)
+                .distinct()
+                .order_by()
+            )
+
+        for product_id in sorted(product_ids):
+            with transaction.atomic():
+                store_id = (
+                    Product.objects.select_for_update()
+                    .values_list("store_id", flat=True)
+                    .get(pk=product_id)
+                )
+                actual = {
+                    counter.status: counter
+                    for counter in ExchangeCounter.objects.select_for_update().filter(product_id=product_id)
+                }
+                expected = cls._count_exchanges(product_id)
+
+                for status in ExchangeStatusChoices.values:
+                    counter = actual.get(status)
+                    expected_values = expected.get(status, (0, 0, 0))
+                    actual_values = (
+                        tuple(getattr(counter, field) for field in COUNTER_FIELDS)
+                        if counter else (0, 0, 0)
+                    )
+                    if expected_values == actual_values:
+                        continue
+
+                    differences.append({
+                        "product_id": product_id,
+                        "status": status,
+                        "expected": dict(zip(COUNTER_FIELDS, expected_values)),
+                        "actual": dict(zip(COUNTER_FIELDS, actual_values)),
+                    })
+                    if dry_run:
+                        continue
+                    ExchangeCounter.objects.update_or_create(
+                        product_id=product_id,
+                        status=status,
+                        defaults={"store_id": store_id, **dict(zip(COUNTER_FIELDS, expected_values))},
+                    )
+
+        return differences
@@ -0,0 +1,150 @@
+"""
+交換序號查詢快取
+
+店家掃描交換序號時（lookup_by_code）優先從快取讀取已序列化的兌換紀錄（未命中時查詢後寫入），
+並以快取中的 user_id / store_id 進行權限檢查，大多數查詢不需要存取資料庫。
+
+- 兌換紀錄、商品資訊與商品庫存分開快取，任一未命中即視為未命中：
+  - 兌換紀錄在建立與狀態更新（save）後由 signals 寫入最新資料
+  - 商品資訊（不含庫存）在儲存或刪除後由 signals 失效
+  - 兌換扣庫存（save(update_fields=["stock"])）只寫入新的庫存，不使商品資訊失效，
+    熱銷商品的查詢仍可命中；併發兌換的提交順序可能讓庫存短暫落後，直到下一次兌換或快取過期
+- 批次核銷以 UPDATE 直接更新，不會觸發 signals，由 ExchangeVerifyService 主動失效
+- 失效只會作用在目前行程可見的快取：使用行程內快取（LocMemCache）時，其他 worker 的快取不會失效，
+  因此有效時間上限為 EXCHANGE_LOOKUP_LOCAL_CACHE_SECONDS 秒（0 表示停用）；
+  共用快取（例如 Redis / Memcached）才使用 EXCHANGE_LOOKUP_CACHE_SECONDS
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from apps.points.models import PointExchange
+
+# 每個行程各自保存的快取後端（其他 worker 無法使其失效）
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+class ExchangeLookupCache:
+    """交換序號查詢快取類別"""
+
+    KEY_PREFIX = "points:exchange-code:"
+    PRODUCT_KEY_PREFIX = "points:exchange-product:"
+    STOCK_KEY_PREFIX = "points:exchange-product-stock:"
+
+    @classmethod
+    def make_key(cls, exchange_code):
+        return f"{cls.KEY_PREFIX}{exchange_code}"
+
+    @classmethod
+    def make_product_key(cls, product_id):
+        return f"{cls.PRODUCT_KEY_PREFIX}{product_id}"
+
+    @classmethod
+    def make_stock_key(cls, product_id):
+        return f"{cls.STOCK_KEY_PREFIX}{product_id}"
+
+    @classmethod
+    def timeout(cls):
+        """快取有效秒數（行程內快取時以 EXCHANGE_LOOKUP_LOCAL_CACHE_SECONDS 為上限）"""
+        if settings.CACHES["default"]["BACKEND"] in LOCAL_CACHE_BACKENDS:
+            return min(settings.EXCHANGE_LOOKUP_CACHE_SECONDS, settings.EXCHANGE_LOOKUP_LOCAL_CACHE_SECONDS)
+        return settings.EXCHANGE_LOOKUP_CACHE_SECONDS
+
+    @staticmethod
+    def _compose(entry, product, stock):
+        return {**entry, "data": {**entry["data"], "product": {**product, "stock": stock}}}
+
+    @classmethod
+    def _compose_cached(cls, entry, values):
+        """由 get_many 的結果組成快取內容（商品資訊或庫存未命中時回傳 None）"""
+        product = values.get(cls.make_product_key(entry["product_id"]))
+        stock = values.get(cls.make_stock_key(entry["product_id"]))
+        if product is None or stock is None:
+            return None
+        return cls._compose(entry, product, stock)
+
+    @classmethod
+    def set(cls, exchange, data):
+        """
+        寫入兌換紀錄與其商品資訊的快取（需要 exchange.product 已載入）
+
+        Args:
+            exchange: 兌換紀錄
+            data: PointExchangeListSerializer 的輸出
+
+        Returns:
+            dict: 快取內容，除 data 外另保存權限檢查所需的 user_id / store_id
+        """
+        data = dict(data)
+        product = dict(data["product"])
+        stock = product["stock"]
+        product["stock"] = None
+        data["product"] = None
+        entry = {
+            "data": data,
+            "user_id": exchange.user_id,
+            "store_id": exchange.product.store_id,
+            "product_id": exchange.product_id,
+        }
+        timeout = cls.timeout()
+        if timeout > 0:
+            cache.set_many(
+                {
+                    cls.make_key(exchange.exchange_code): entry,
+                    cls.make_product_key(exchange.product_id): product,
+                    cls.make_stock_key(exchange.product_id): stock,
+                },
+                timeout,
+            )
+        return cls._compose(entry, product, stock)
+
+    @classmethod
+    def get(cls, exchange_code):
+        """
+        讀取交換序號的快取
+
+        Returns:
+            dict | None: 快取內容，未命中（含商品資訊已失效）時回傳 None
+        """
+        max_length = PointExchange._meta.get_field("exchange_code").max_length
+        if len(exchange_code) > max_length or cls.timeout() <= 0:
+            return None
+        entry = cache.get(cls.make_key(exchange_code))
+        if entry is None:
+            return None
+        product_id = entry["product_id"]
+        values = cache.get_many([cls.make_product_key(product_id), cls.make_stock_key(product_id)])
+        return cls._compose_cached(entry, values)
+
+    @classmethod
+    async def aget(cls, exchange_code):
+        """get() 的 async 版本"""
+        max_length = PointExchange._meta.get_field("exchange_code").max_length
+        if len(exchange_code) > max_length or cls.timeout() <= 0:
+            return None
+        entry = await cache.aget(cls.make_key(exchange_code))
+        if entry is None:
+            return None
+        product_id = entry["product_id"]
+        values = await cache.aget_many([cls.make_product_key(product_id), cls.make_stock_key(product_id)])
+        return cls._compose_cached(entry, values)
+
+    @classmethod
+    def invalidate(cls, exchange_codes):
+        """使交換序號的快取失效"""
+        if exchange_codes:
+            cache.delete_many([cls.make_key(code) for code in exchange_codes])
+
+    @classmethod
+    def invalidate_product(cls, product_id):
+        """使商品資訊的快取失效（引用此商品的兌換紀錄快取於下次查詢時視為未命中）"""
+        cache.delete(cls.make_product_key(product_id))
+
+    @classmethod
+    def set_product_stock(cls, product_id, stock):
+        """寫入商品的最新庫存（兌換扣庫存時使用，不使商品資訊失效）"""
+        timeout = cls.timeout()
+        if timeout > 0:
+            cache.set(cls.make_stock_key(product_id), stock, timeout)
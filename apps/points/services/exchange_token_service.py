@@ -0,0 +1,155 @@
+"""
+離線可驗證的簽章交換序號服務
+
+簽章序號與原本的 exchange_code 並行發放，內容包含兌換紀錄 ID、交換序號、商品 ID、
+店家 ID、數量與發放日期，並以該店家專屬的 HMAC-SHA256 金鑰簽章。
+店家端取得自己的金鑰後即可在本機驗證序號真偽與歸屬，網路恢復後再批次同步核銷。
+
+格式：EXT1.<base64url(payload JSON)>.<base64url(HMAC 前 16 bytes)>
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+
+from django.conf import settings
+from django.utils import timezone
+from apps.users.models import RoleChoices
+from apps.points.services.exchange_verify_service import ExchangeVerifyService, VerifyResult
+
+TOKEN_VERSION = "EXT1"
+SIGNATURE_BYTES = 16
+INVALID_SIGNATURE = "invalid_signature"
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class ExchangeTokenService:
+    """簽章交換序號服務類別"""
+
+    @classmethod
+    def get_store_key(cls, store_id):
+        """
+        取得店家專屬的簽章金鑰
+
+        由主金鑰（EXCHANGE_CODE_SIGNING_KEY）衍生，每個店家的金鑰不同，
+        店家金鑰外洩時僅影響該店家的商品。
+        """
+        master_key = settings.EXCHANGE_CODE_SIGNING_KEY.encode("utf-8")
+        return hmac.new(master_key, f"exchange-code:store:{store_id}".encode("ascii"), hashlib.sha256).digest()
+
+    @classmethod
+    def encode_key(cls, key):
+        """將金鑰編碼為 base64url 字串（供店家端下載）"""
+        return _b64encode(key)
+
+    @classmethod
+    def _sign(cls, store_id, message):
+        return hmac.new(cls.get_store_key(store_id), message.encode("ascii"), hashlib.sha256).digest()[
+            :SIGNATURE_BYTES
+        ]
+
+    @classmethod
+    def build_payload(cls, exchange):
+        """建立簽章內容（需要 exchange.product 已載入）"""
+        issued_at = timezone.localtime(exchange.created_at) if exchange.created_at else timezone.localtime()
+        return {
+            "e": exchange.id,
+            "c": exchange.exchange_code,
+            "p": exchange.product_id,
+            "s": exchange.product.store_id,
+            "q": exchange.quantity,
+            "d": issued_at.strftime("%Y%m%d"),
+        }
+
+    @classmethod
+    def sign(cls, exchange):
+        """產生兌換紀錄的簽章序號"""
+        payload = cls.build_payload(exchange)
+        body = _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        message = f"{TOKEN_VERSION}.{body}"
+        return f"{message}.{_b64encode(cls._sign(payload['s'], message))}"
+
+    @classmethod
+    def verify(cls, token, store_id=None):
+        """
+        驗證簽章序號
+
+        Args:
+            token: 簽章序號
+            store_id: 指定店家時，僅接受該店家金鑰簽章的序號（歸屬檢查）
+
+        Returns:
+            dict | None: 簽章有效時回傳 payload（e/c/p/s/q/d），否則回傳 None
+        """
+        try:
+            version, body, signature = token.split(".")
+            if version != TOKEN_VERSION:
+                return None
+            payload = json.loads(_b64decode(body))
+            expected_store_id = payload["s"] if store_id is None else store_id
+            expected = cls._sign(expected_store_id, f"{version}.{body}")
+            if not hmac.compare_digest(expected, _b64decode(signature)):
+                return None
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+        if payload.get("s") != expected_store_id:
+            return None
+        return payload
+
+    @classmethod
+    def sync_offline(cls, user, tokens):
+        """
+        同步店家離線核銷的簽章序號
+
+        先驗證每個序號的簽章（STORE 僅接受自己金鑰簽章的序號），
+        簽章有效者再交由 ExchangeVerifyService.bulk_verify 以資料庫狀態為準核銷。
+
+        Returns:
+            dict: 包含處理結果的字典
+                - results: 依輸入順序的每筆結果，result 為
+                  verified / already_verified / not_found / not_yours / invalid_signature
+                - summary: 各結果的筆數
+        """
+        store_id = user.id if user.role == RoleChoices.STORE else None
+        tokens = list(dict.fromkeys(tokens))
+        payloads = {token: cls.verify(token, store_id=store_id) for token in tokens}
+
+        codes = [payload["c"] for payload in payloads.values() if payload]
+        outcomes = {}
+        summary = {
+            VerifyResult.VERIFIED: 0,
+            VerifyResult.ALREADY_VERIFIED: 0,
+            VerifyResult.NOT_FOUND: 0,
+            VerifyResult.NOT_YOURS: 0,
+            INVALID_SIGNATURE: 0,
+        }
+        if codes:
+            verified = ExchangeVerifyService.bulk_verify(user, codes=codes)
+            outcomes = {item["code"]: item for item in verified["results"]}
+            summary.update(verified["summary"])
+
+        results = []
+        for token in tokens:
+            payload = payloads[token]
+            if payload is None:
+                summary[INVALID_SIGNATURE] += 1
+                results.append({"token": token, "result": INVALID_SIGNATURE})
+                continue
+            outcome = outcomes[payload["c"]]
+            results.append({
+                "token": token,
+                "code": payload["c"],
+                "id": outcome["id"],
+                "result": outcome["result"],
+            })
+
+        return {"results": results, "summary": summary}
@@ -0,0 +1,172 @@
+"""
+兌換紀錄批次核銷服務
+
+店家一次核銷多筆兌換紀錄：以單一 UPDATE ... RETURNING 將屬於該店家且為 PENDING 的紀錄
+改為 VERIFIED，其餘序號再以一次查詢判斷未核銷的原因。
+兌換統計計數器於同一事務中更新，已核銷紀錄的交換序號查詢快取會一併失效。
+
+啟用分片時逐一在每個分片執行（STORE 的商品 ID 先於主資料庫取得，分片上沒有商品資料）。
+"""
+
+from django.db import connections, transaction
+from django.utils import timezone
+from apps.users.models import RoleChoices
+from apps.products.models import Product
+from apps.points.models import PointExchange, ExchangeStatusChoices
+from apps.points.services.exchange_lookup_cache import ExchangeLookupCache
+from apps.points.services.exchange_counter_service import ExchangeCounterService
+from core.db.sharding import shard_aliases, sharding_enabled
+
+
+class VerifyResult:
+    """單筆核銷結果"""
+    VERIFIED = "verified"
+    ALREADY_VERIFIED = "already_verified"
+    NOT_FOUND = "not_found"
+    NOT_YOURS = "not_yours"
+
+
+class ExchangeVerifyService:
+    """兌換紀錄批次核銷服務類別"""
+
+    MAX_ITEMS = 1000
+
+    @classmethod
+    def _verify_pending(cls, user, column, values, using, store_product_ids=None):
+        """
+        以單一 UPDATE ... RETURNING 核銷 PENDING 紀錄
+
+        STORE 僅能核銷自己商品的紀錄；ADMIN 不限制。
+
+        Args:
+            using: 執行的資料庫（分片）
+            store_product_ids: STORE 的商品 ID（啟用分片時提供，取代對商品資料表的子查詢）
+
+        Returns:
+            list[tuple]: 已核銷紀錄的 (id, exchange_code, product_id, quantity, points_spent)
+        """
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        placeholders = ", ".join(["%s"] * len(values))
+        sql = (
+            f"UPDATE {quote(PointExchange._meta.db_table)} "
+            f"SET {quote('status')} = %s, {quote('updated_at')} = %s "
+            f"WHERE {quote('status')} = %s AND {quote(column)} IN ({placeholders})"
+        )
+        params = [
+            ExchangeStatusChoices.VERIFIED,
+            connection.ops.adapt_datetimefield_value(timezone.now()),
+            ExchangeStatusChoices.PENDING,
+            *values,
+        ]
+
+        if store_product_ids is not None:
+            if not store_product_ids:
+                return []
+            sql += f" AND {quote('product_id')} IN ({', '.join(['%s'] * len(store_product_ids))})"
+            params.extend(store_product_ids)
+        elif user.role == RoleChoices.STORE:
+            sql += (
+                f" AND {quote('product_id')} IN ("
+                f"SELECT {quote('id')} FROM {quote(Product._meta.db_table)} "
+                f"WHERE {quote('store_id')} = %s)"
+            )
+            params.append(user.id)
+
+        returning = ", ".join(
+            quote(name) for name in ("id", "exchange_code", "product_id", "quantity", "points_spent")
+        )
+        sql += f" RETURNING {returning}"
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    @classmethod
+    def _find_unverified(cls, column, values):
+        """
+        查詢未被核銷的序號 / ID 對應的兌換紀錄
+
+        Returns:
+            list[tuple]: (序號或 ID, 兌換紀錄 ID, 店家 ID)
+        """
+        if not sharding_enabled():
+            return list(
+                PointExchange.objects.filter(**{f"{column}__in": values}).values_list(
+                    column, "id", "product__store_id"
+                )
+            )
+
+        rows = []
+        for alias in shard_aliases():
+            rows.extend(
+                PointExchange.objects.on_shard(alias)
+                .filter(**{f"{column}__in": values})
+                .values_list(column, "id", "product_id")
+            )
+        store_ids = dict(
+            Product.objects.filter(pk__in={row[2] for row in rows}).values_list("id", "store_id")
+        )
+        return [(value, exchange_id, store_ids.get(product_id)) for value, exchange_id, product_id in rows]
+
+    @classmethod
+    def bulk_verify(cls, user, codes=None, ids=None):
+        """
+        批次核銷兌換紀錄
+
+        Args:
+            user: 執行核銷的店家或管理員
+            codes: 交換序號列表（與 ids 擇一）
+            ids: 兌換紀錄 ID 列表（與 codes 擇一）
+
+        Returns:
+            dict: 包含處理結果的字典
+                - results: 依輸入順序的每筆結果，result 為
+                  verified / already_verified / not_found / not_yours
+                - summary: 各結果的筆數
+        """
+        if codes is not None:
+            key, column, values = "code", "exchange_code", list(dict.fromkeys(codes))
+        else:
+            key, column, values = "id", "id", list(dict.fromkeys(ids))
+
+        store_product_ids = None
+        if sharding_enabled() and user.role == RoleChoices.STORE:
+            store_product_ids = list(Product.objects.filter(store=user).values_list("id", flat=True))
+
+        outcomes = {}
+        for alias in shard_aliases():
+            # 外層為主資料庫的事務（統計計數器），內層為分片的事務；未啟用分片時為同一個事務
+            with transaction.atomic(), transaction.atomic(using=alias, savepoint=False):
+                verified = cls._verify_pending(user, column, values, alias, store_product_ids)
+                ExchangeCounterService.record_verified([row[2:] for row in verified])
+            # UPDATE 不會觸發 signals，需主動使查詢快取失效
+            ExchangeLookupCache.invalidate([row[1] for row in verified])
+            for exchange_id, exchange_code, *_ in verified:
+                value = exchange_code if key == "code" else exchange_id
+                outcomes[value] = (exchange_id, VerifyResult.VERIFIED)
+
+        remaining = [value for value in values if value not in outcomes]
+        if remaining:
+            for value, exchange_id, store_id in cls._find_unverified(column, remaining):
+                if user.role == RoleChoices.STORE and store_id != user.id:
+                    outcomes[value] = (None, VerifyResult.NOT_YOURS)
+                else:
+                    outcomes[value] = (exchange_id, VerifyResult.ALREADY_VERIFIED)
+
+        results = []
+        summary = {
+            VerifyResult.VERIFIED: 0,
+            VerifyResult.ALREADY_VERIFIED: 0,
+            VerifyResult.NOT_FOUND: 0,
+            VerifyResult.NOT_YOURS: 0,
+        }
+        for value in values:
+            exchange_id, result = outcomes.get(value, (None, VerifyResult.NOT_FOUND))
+            summary[result] += 1
+            item = {key: value, "result": result}
+            if key == "code":
+                item["id"] = exchange_id
+            results.append(item)
+
+        return {"results": results, "summary": summary}
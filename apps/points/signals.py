@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.products.models import Product
+from .models import PointExchange
+from .serializers import PointExchangeListSerializer
+from .services.exchange_lookup_cache import ExchangeLookupCache
+
+
+@receiver(post_save, sender=PointExchange)
+def update_exchange_lookup_cache(sender, instance, **kwargs):
+    """
+    兌換紀錄儲存後更新交換序號查詢快取
+
+    於交易提交後才寫入，避免回滾的兌換紀錄進入快取。
+    """
+    transaction.on_commit(
+        lambda: ExchangeLookupCache.set(instance, PointExchangeListSerializer(instance).data)
+    )
+
+
+@receiver(post_delete, sender=PointExchange)
+def remove_exchange_lookup_cache(sender, instance, **kwargs):
+    """兌換紀錄刪除後使快取失效"""
+    exchange_code = instance.exchange_code
+    transaction.on_commit(lambda: ExchangeLookupCache.invalidate([exchange_code]))
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_exchange_product_cache(sender, instance, update_fields=None, **kwargs):
+    """
+    商品儲存或刪除後使交換序號查詢快取中的商品資訊失效
+
+    只更新庫存時（兌換扣庫存）改為寫入最新庫存，不使商品資訊失效。
+    """
+    product_id = instance.pk
+    if update_fields is not None and set(update_fields) == {"stock"}:
+        stock = instance.stock
+        transaction.on_commit(lambda: ExchangeLookupCache.set_product_stock(product_id, stock))
+        return
+    transaction.on_commit(lambda: ExchangeLookupCache.invalidate_product(product_id))
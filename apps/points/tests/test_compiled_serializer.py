@@ -0,0 +1,133 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices
+from apps.products.models import Product
+from apps.points.models import (
+    PointExchange,
+    PointTransaction,
+    ExchangeStatusChoices,
+    TransactionTypeChoices,
+)
+from apps.points.serializers import PointExchangeListSerializer, PointTransactionSerializer
+from utils.serializers import compile_serializer
+from utils.ttl_cache import TTLCache
+from utils.views import base as views_base
+
+User = get_user_model()
+
+
+class CompiledSerializerTestCase(APITestCase):
+    """
+    編譯序列化器測試
+
+    驗證編譯後的唯讀 serializer 與原 serializer 輸出的 JSON 完全相同
+    """
+
+    def setUp(self):
+        """建立交易紀錄與兌換紀錄（包含 null 備註、不同狀態）"""
+        self.store = User.objects.create_user(
+            username="store_compiled",
+            email="store_compiled@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.member = User.objects.create_user(
+            username="member_compiled",
+            email="member_compiled@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+
+        self.product = Product.objects.create(
+            store=self.store,
+            name="編譯測試商品",
+            required_points=100,
+            stock=10,
+            is_active=True,
+            memo=None,
+        )
+
+        PointTransaction.objects.create(
+            user=self.member,
+            amount=500,
+            tx_type=TransactionTypeChoices.DEPOSIT,
+            balance_after=500,
+            memo=None,
+        )
+        PointTransaction.objects.create(
+            user=self.member,
+            amount=-100,
+            tx_type=TransactionTypeChoices.REDEMPTION,
+            is_success=False,
+            balance_after=400,
+            memo="兌換商品：編譯測試商品 x1",
+        )
+
+        for index, exchange_status in enumerate(ExchangeStatusChoices.values):
+            PointExchange.objects.create(
+                user=self.member,
+                product=self.product,
+                exchange_code=f"EXCOMPILED{index}",
+                quantity=index + 1,
+                points_spent=100 * (index + 1),
+                status=exchange_status,
+            )
+
+    def _render(self, data):
+        return JSONRenderer().render(data)
+
+    def _assert_identical(self, serializer_class, queryset):
+        expected = self._render(serializer_class(queryset, many=True).data)
+
+        compiled = compile_serializer(serializer_class(), queryset.model)
+        self.assertIsNotNone(compiled)
+        actual = self._render(compiled.to_representation(compiled.values_queryset(queryset)))
+
+        self.assertEqual(actual, expected)
+
+    def test_transaction_serializer_output_identical(self):
+        """測試 PointTransactionSerializer 編譯後輸出完全相同"""
+        self._assert_identical(PointTransactionSerializer, PointTransaction.objects.all())
+
+    def test_exchange_list_serializer_output_identical(self):
+        """測試 PointExchangeListSerializer（含巢狀商品）編譯後輸出完全相同"""
+        self._assert_identical(
+            PointExchangeListSerializer,
+            PointExchange.objects.select_related("user", "product"),
+        )
+
+    def test_list_endpoint_uses_compiled_output(self):
+        """測試 list API 的回應與原 serializer 相同"""
+        token = str(RefreshToken.for_user(self.member).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        response = self.client.get("/api/points/transactions/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = PointTransactionSerializer(
+            PointTransaction.objects.filter(user=self.member), many=True
+        ).data
+        self.assertEqual(response.content, self._render(expected))
+
+    def test_compiled_serializer_cache_key_and_size(self):
+        """測試稀疏欄位的順序不影響快取 key，且快取數量有上限"""
+        token = str(RefreshToken.for_user(self.member).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        views_base.compiled_serializers.clear()
+
+        self.client.get("/api/points/transactions/?fields=id,amount,memo")
+        self.client.get("/api/points/transactions/?fields=memo,amount,id")
+        self.assertEqual(len(views_base.compiled_serializers), 1)
+
+        compiled_serializers = TTLCache(maxsize=2, ttl=float("inf"))
+        with mock.patch.object(views_base, "compiled_serializers", compiled_serializers):
+            for fields in ("id", "amount", "memo", "id,amount"):
+                response = self.client.get(f"/api/points/transactions/?fields={fields}")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(compiled_serializers), 2)
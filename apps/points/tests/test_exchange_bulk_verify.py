@@ -0,0 +1,120 @@
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices
+from apps.products.models import Product
+from apps.points.models import PointExchange, ExchangeStatusChoices
+
+User = get_user_model()
+
+
+class ExchangeBulkVerifyTestCase(APITestCase):
+    """
+    批次核銷測試
+
+    測試店家批次核銷時每筆序號的結果（核銷成功、已核銷、找不到、非自己商品）
+    """
+
+    def setUp(self):
+        """建立兩個店家、會員與兌換紀錄"""
+        self.store_a = User.objects.create_user(
+            username="store_verify_a",
+            email="store_verify_a@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.store_b = User.objects.create_user(
+            username="store_verify_b",
+            email="store_verify_b@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.member = User.objects.create_user(
+            username="member_verify",
+            email="member_verify@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+
+        self.product_a = Product.objects.create(
+            store=self.store_a, name="A 商品", required_points=100, stock=10, is_active=True
+        )
+        self.product_b = Product.objects.create(
+            store=self.store_b, name="B 商品", required_points=100, stock=10, is_active=True
+        )
+
+        self.pending_a = self._create_exchange("EXVERIFYA1", self.product_a)
+        self.verified_a = self._create_exchange(
+            "EXVERIFYA2", self.product_a, ExchangeStatusChoices.VERIFIED
+        )
+        self.pending_b = self._create_exchange("EXVERIFYB1", self.product_b)
+
+        self.url = "/api/points/exchanges/bulk-verify/"
+
+    def _create_exchange(self, code, product, exchange_status=ExchangeStatusChoices.PENDING):
+        return PointExchange.objects.create(
+            user=self.member,
+            product=product,
+            exchange_code=code,
+            quantity=1,
+            points_spent=100,
+            status=exchange_status,
+        )
+
+    def _authenticate(self, user):
+        """設定認證用戶"""
+        token = str(RefreshToken.for_user(user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_member_cannot_bulk_verify(self):
+        """測試 MEMBER 無法批次核銷（403）"""
+        self._authenticate(self.member)
+
+        response = self.client.post(self.url, {"codes": ["EXVERIFYA1"]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_store_bulk_verify_outcomes(self):
+        """測試店家批次核銷每筆序號的結果"""
+        self._authenticate(self.store_a)
+
+        codes = ["EXVERIFYA1", "EXVERIFYA2", "EXVERIFYB1", "EXNOTEXIST"]
+        response = self.client.post(self.url, {"codes": codes}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = {item["code"]: item["result"] for item in response.data["results"]}
+        self.assertEqual(results, {
+            "EXVERIFYA1": "verified",
+            "EXVERIFYA2": "already_verified",
+            "EXVERIFYB1": "not_yours",
+            "EXNOTEXIST": "not_found",
+        })
+        self.assertEqual(response.data["summary"]["verified"], 1)
+
+        self.pending_a.refresh_from_db()
+        self.pending_b.refresh_from_db()
+        self.assertEqual(self.pending_a.status, ExchangeStatusChoices.VERIFIED)
+        self.assertEqual(self.pending_b.status, ExchangeStatusChoices.PENDING)
+
+    def test_bulk_verify_by_ids(self):
+        """測試以 ID 批次核銷，重複核銷回報 already_verified"""
+        self._authenticate(self.store_a)
+
+        ids = [self.pending_a.id, self.pending_a.id]
+        first = self.client.post(self.url, {"ids": ids}, format="json")
+        second = self.client.post(self.url, {"ids": ids}, format="json")
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data["results"], [{"id": self.pending_a.id, "result": "verified"}])
+        self.assertEqual(second.data["results"][0]["result"], "already_verified")
+
+    def test_codes_or_ids_required(self):
+        """測試 codes 與 ids 必須擇一提供"""
+        self._authenticate(self.store_a)
+
+        response = self.client.post(self.url, {}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,125 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices, UserPoints
+from apps.products.models import Product
+from apps.points.models import ExchangeCounter, ExchangeStatusChoices
+
+User = get_user_model()
+
+
+class ExchangeCounterTestCase(APITestCase):
+    """
+    兌換統計計數器測試
+
+    測試兌換與核銷時計數器同步更新、統計查詢與對帳指令
+    """
+
+    def setUp(self):
+        """建立兩個店家、會員與商品"""
+        self.store_a = User.objects.create_user(
+            username="store_counter_a",
+            email="store_counter_a@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.store_b = User.objects.create_user(
+            username="store_counter_b",
+            email="store_counter_b@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.member = User.objects.create_user(
+            username="member_counter",
+            email="member_counter@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+        UserPoints.objects.filter(user=self.member).update(balance=10000)
+
+        self.product_a = Product.objects.create(
+            store=self.store_a, name="A 商品", required_points=100, stock=50, is_active=True
+        )
+        self.product_b = Product.objects.create(
+            store=self.store_b, name="B 商品", required_points=30, stock=50, is_active=True
+        )
+
+        self.url = "/api/points/exchanges/stats/"
+
+    def _authenticate(self, user):
+        """設定認證用戶"""
+        token = str(RefreshToken.for_user(user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def _exchange(self, product, quantity):
+        self._authenticate(self.member)
+        response = self.client.post(
+            "/api/points/exchange/", {"product_id": product.id, "quantity": quantity}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def test_counters_follow_exchange_and_verification(self):
+        """測試兌換增加待核銷計數，單筆與批次核銷將計數移至已核銷"""
+        first = self._exchange(self.product_a, 2)
+        second = self._exchange(self.product_a, 1)
+        self._exchange(self.product_b, 3)
+
+        self._authenticate(self.store_a)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["totals"]["PENDING"], {"count": 2, "quantity": 3, "points": 300}
+        )
+
+        self.client.patch(
+            f"/api/points/exchanges/{first['exchange_id']}/", {"status": "VERIFIED"}, format="json"
+        )
+        self.client.post(
+            "/api/points/exchanges/bulk-verify/", {"codes": [second["exchange_code"]]}, format="json"
+        )
+
+        response = self.client.get(self.url)
+        totals = response.data["totals"]
+        self.assertEqual(totals["PENDING"], {"count": 0, "quantity": 0, "points": 0})
+        self.assertEqual(totals["VERIFIED"], {"count": 2, "quantity": 3, "points": 300})
+        self.assertEqual([item["product_id"] for item in response.data["products"]], [self.product_a.id])
+
+    def test_member_cannot_view_stats(self):
+        """測試 MEMBER 無法查詢統計（403）"""
+        self._authenticate(self.member)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reconcile_fixes_drift(self):
+        """測試對帳指令修正與兌換紀錄不一致的計數器"""
+        self._exchange(self.product_a, 2)
+        ExchangeCounter.objects.filter(product=self.product_a).update(exchange_count=99)
+        ExchangeCounter.objects.create(
+            store=self.store_b,
+            product=self.product_b,
+            status=ExchangeStatusChoices.VERIFIED,
+            exchange_count=5,
+        )
+
+        call_command("reconcile_exchange_counters", "--dry-run", stdout=StringIO())
+        self.assertEqual(ExchangeCounter.objects.get(product=self.product_a).exchange_count, 99)
+
+        call_command("reconcile_exchange_counters", stdout=StringIO())
+
+        counter = ExchangeCounter.objects.get(product=self.product_a, status=ExchangeStatusChoices.PENDING)
+        self.assertEqual(
+            (counter.exchange_count, counter.quantity_total, counter.points_total), (1, 2, 200)
+        )
+        self.assertEqual(
+            ExchangeCounter.objects.get(product=self.product_b, status=ExchangeStatusChoices.VERIFIED).exchange_count,
+            0,
+        )
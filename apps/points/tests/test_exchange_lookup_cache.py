@@ -0,0 +1,176 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices, UserPoints
+from apps.products.models import Product
+from apps.points.models import PointExchange
+from apps.points.services.exchange_lookup_cache import ExchangeLookupCache
+
+User = get_user_model()
+
+
+class ExchangeLookupCacheTestCase(APITestCase):
+    """
+    交換序號查詢快取測試
+
+    測試兌換後寫入快取、命中快取時不查詢兌換紀錄、核銷與商品更新後快取更新，
+    以及行程內快取的有效時間上限
+    """
+
+    def setUp(self):
+        """建立兩個店家、會員與商品，並清空快取"""
+        cache.clear()
+
+        self.store_a = User.objects.create_user(
+            username="store_lookup_a",
+            email="store_lookup_a@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.store_b = User.objects.create_user(
+            username="store_lookup_b",
+            email="store_lookup_b@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.member = User.objects.create_user(
+            username="member_lookup",
+            email="member_lookup@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+        UserPoints.objects.filter(user=self.member).update(balance=1000)
+
+        self.product = Product.objects.create(
+            store=self.store_a, name="查詢快取商品", required_points=100, stock=10, is_active=True
+        )
+
+        self.url = "/api/points/exchanges/lookup-by-code/"
+
+    def _authenticate(self, user):
+        """設定認證用戶"""
+        token = str(RefreshToken.for_user(user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def _exchange(self):
+        """會員兌換商品，回傳交換序號（執行提交後的 callbacks 以寫入快取）"""
+        self._authenticate(self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/points/exchange/", {"product_id": self.product.id, "quantity": 1}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["exchange_code"]
+
+    def _exchange_queries(self, context):
+        table = PointExchange._meta.db_table
+        return [query["sql"] for query in context.captured_queries if table in query["sql"]]
+
+    def test_lookup_hits_cache_after_exchange(self):
+        """測試兌換後查詢命中快取，不需要查詢兌換紀錄"""
+        exchange_code = self._exchange()
+        self._authenticate(self.store_a)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {"code": exchange_code})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["exchange_code"], exchange_code)
+        self.assertEqual(response.data["status"], "PENDING")
+        self.assertEqual(self._exchange_queries(context), [])
+
+    def test_ownership_checked_from_cache(self):
+        """測試以快取資料檢查權限：其他店家 403，兌換會員本人可查詢"""
+        exchange_code = self._exchange()
+
+        self._authenticate(self.store_b)
+        response = self.client.get(self.url, {"code": exchange_code})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self._authenticate(self.member)
+        response = self.client.get(self.url, {"code": exchange_code})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cache_updated_after_verification(self):
+        """測試單筆核銷與批次核銷後，查詢結果為已核銷"""
+        first_code = self._exchange()
+        second_code = self._exchange()
+        self._authenticate(self.store_a)
+
+        exchange_id = self.client.get(self.url, {"code": first_code}).data["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f"/api/points/exchanges/{exchange_id}/", {"status": "VERIFIED"}, format="json"
+            )
+        self.client.post("/api/points/exchanges/bulk-verify/", {"codes": [second_code]}, format="json")
+
+        for exchange_code in (first_code, second_code):
+            response = self.client.get(self.url, {"code": exchange_code})
+            self.assertEqual(response.data["status"], "VERIFIED")
+
+    def test_lookup_unknown_code(self):
+        """測試查詢不存在的交換序號（404）"""
+        self._authenticate(self.store_a)
+
+        response = self.client.get(self.url, {"code": "EXNOTEXIST"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_product_update_invalidates_cache(self):
+        """測試商品更新後查詢結果為最新的商品資訊"""
+        exchange_code = self._exchange()
+        self._authenticate(self.store_a)
+
+        self.product.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = "改名後的商品"
+            self.product.save()
+
+        response = self.client.get(self.url, {"code": exchange_code})
+        self.assertEqual(response.data["product"]["name"], "改名後的商品")
+        self.assertEqual(response.data["product"]["stock"], 9)
+
+    def test_exchanges_keep_lookup_cache_hits(self):
+        """測試同一商品持續兌換時，先前的交換序號查詢仍命中快取且庫存為最新"""
+        first_code = self._exchange()
+        self._authenticate(self.store_a)
+        self.client.get(self.url, {"code": first_code})
+
+        for _ in range(3):
+            self._exchange()
+        self._authenticate(self.store_a)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {"code": first_code})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["product"]["stock"], 6)
+        self.assertEqual(self._exchange_queries(context), [])
+
+    @override_settings(EXCHANGE_LOOKUP_LOCAL_CACHE_SECONDS=0)
+    def test_local_cache_disabled(self):
+        """測試行程內快取的有效時間上限為 0 時不使用快取"""
+        exchange_code = self._exchange()
+        self._authenticate(self.store_a)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {"code": exchange_code})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(self._exchange_queries(context)), 1)
+
+    def test_cache_timeout_by_backend(self):
+        """測試行程內快取以 EXCHANGE_LOOKUP_LOCAL_CACHE_SECONDS 為上限，共用快取使用完整有效時間"""
+        with override_settings(EXCHANGE_LOOKUP_CACHE_SECONDS=600, EXCHANGE_LOOKUP_LOCAL_CACHE_SECONDS=2):
+            self.assertEqual(ExchangeLookupCache.timeout(), 2)
+            with override_settings(
+                CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": ""}}
+            ):
+                self.assertEqual(ExchangeLookupCache.timeout(), 600)
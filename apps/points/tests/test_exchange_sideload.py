@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices
+from apps.products.models import Product
+from apps.points.models import PointExchange, ExchangeStatusChoices
+
+User = get_user_model()
+
+
+class ExchangeSideloadTestCase(APITestCase):
+    """
+    兌換紀錄側載測試
+
+    測試 ?sideload=true 時關聯資料去重後放在 included
+    """
+
+    def setUp(self):
+        """建立店家、兩位會員、兩項商品與多筆兌換紀錄"""
+        self.store = User.objects.create_user(
+            username="store_sideload",
+            email="store_sideload@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.members = [
+            User.objects.create_user(
+                username=f"member_sideload_{index}",
+                email=f"member_sideload_{index}@test.com",
+                password="testpass123",
+                role=RoleChoices.MEMBER,
+            )
+            for index in range(2)
+        ]
+
+        self.products = [
+            Product.objects.create(
+                store=self.store,
+                name=f"側載商品 {index}",
+                required_points=100,
+                stock=10,
+                is_active=True,
+            )
+            for index in range(2)
+        ]
+
+        for index in range(6):
+            PointExchange.objects.create(
+                user=self.members[index % 2],
+                product=self.products[index % 2],
+                exchange_code=f"EXSIDE{index}",
+                quantity=1,
+                points_spent=100,
+                status=ExchangeStatusChoices.PENDING,
+            )
+
+        self.url = "/api/points/exchanges/"
+        token = str(RefreshToken.for_user(self.store).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_sideload_deduplicates_related_objects(self):
+        """測試側載回應中每項商品與會員僅出現一次"""
+        response = self.client.get(self.url, {"sideload": "true"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        included = response.data["included"]
+
+        self.assertEqual(len(results), 6)
+        self.assertNotIn("product", results[0])
+        self.assertEqual(len(included["products"]), 2)
+        self.assertEqual(len(included["users"]), 2)
+
+        for row in results:
+            product = included["products"][str(row["product_id"])]
+            user = included["users"][str(row["user_id"])]
+            self.assertEqual(product["id"], row["product_id"])
+            self.assertEqual(user["id"], row["user_id"])
+            self.assertIn("username", user)
+
+    def test_sideload_with_pagination(self):
+        """測試分頁時 included 僅包含當頁參照的物件"""
+        response = self.client.get(self.url, {"sideload": "true", "page": 1, "size": 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["page"]["totalResources"], 6)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(len(response.data["included"]["products"]), 1)
+
+    def test_sideload_with_sparse_fields(self):
+        """測試側載搭配 ?fields= 時，未選取的關聯不會出現在 included"""
+        response = self.client.get(
+            self.url, {"sideload": "true", "fields": "exchange_code,product_id"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data["results"][0]), {"exchange_code", "product_id"})
+        self.assertIn("products", response.data["included"])
+        self.assertNotIn("users", response.data["included"])
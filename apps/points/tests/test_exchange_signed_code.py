@@ -0,0 +1,143 @@
+import base64
+import hashlib
+import hmac
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices, UserPoints
+from apps.products.models import Product
+from apps.points.models import PointExchange, ExchangeStatusChoices
+from apps.points.services.exchange_token_service import ExchangeTokenService
+
+User = get_user_model()
+
+
+class ExchangeSignedCodeTestCase(APITestCase):
+    """
+    簽章交換序號測試
+
+    測試簽章序號的發放、店家金鑰離線驗證與離線核銷同步
+    """
+
+    def setUp(self):
+        """建立兩個店家、會員與商品"""
+        self.store_a = User.objects.create_user(
+            username="store_signed_a",
+            email="store_signed_a@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.store_b = User.objects.create_user(
+            username="store_signed_b",
+            email="store_signed_b@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.member = User.objects.create_user(
+            username="member_signed",
+            email="member_signed@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+        UserPoints.objects.filter(user=self.member).update(balance=1000)
+
+        self.product_a = Product.objects.create(
+            store=self.store_a, name="A 商品", required_points=100, stock=10, is_active=True
+        )
+        self.product_b = Product.objects.create(
+            store=self.store_b, name="B 商品", required_points=100, stock=10, is_active=True
+        )
+
+    def _authenticate(self, user):
+        """設定認證用戶"""
+        token = str(RefreshToken.for_user(user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def _create_exchange(self, code, product):
+        return PointExchange.objects.create(
+            user=self.member,
+            product=product,
+            exchange_code=code,
+            quantity=1,
+            points_spent=100,
+            status=ExchangeStatusChoices.PENDING,
+        )
+
+    def test_exchange_issues_signed_code_verifiable_with_store_key(self):
+        """測試兌換時發放簽章序號，店家以下載的金鑰即可離線驗證"""
+        self._authenticate(self.member)
+        response = self.client.post(
+            "/api/points/exchange/", {"product_id": self.product_a.id, "quantity": 2}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        signed_code = response.data["signed_code"]
+
+        self._authenticate(self.store_a)
+        key_response = self.client.get("/api/points/exchanges/signing-key/")
+        self.assertEqual(key_response.status_code, status.HTTP_200_OK)
+
+        # 模擬店家端離線驗證
+        key = base64.urlsafe_b64decode(key_response.data["key"] + "==")
+        version, body, signature = signed_code.split(".")
+        expected = hmac.new(key, f"{version}.{body}".encode(), hashlib.sha256).digest()[:16]
+        self.assertEqual(base64.urlsafe_b64encode(expected).rstrip(b"=").decode(), signature)
+
+        payload = ExchangeTokenService.verify(signed_code, store_id=self.store_a.id)
+        self.assertEqual(payload["e"], response.data["exchange_id"])
+        self.assertEqual(payload["c"], response.data["exchange_code"])
+        self.assertEqual(payload["s"], self.store_a.id)
+        self.assertEqual(payload["q"], 2)
+
+    def test_signed_code_rejects_tampering_and_other_store(self):
+        """測試竄改內容或其他店家的金鑰皆無法通過驗證"""
+        exchange = self._create_exchange("EXSIGNEDA1", self.product_a)
+        signed_code = ExchangeTokenService.sign(exchange)
+        version, body, signature = signed_code.split(".")
+        tampered = f"{version}.{body[:-2]}AA.{signature}"
+
+        self.assertIsNotNone(ExchangeTokenService.verify(signed_code, store_id=self.store_a.id))
+        self.assertIsNone(ExchangeTokenService.verify(signed_code, store_id=self.store_b.id))
+        self.assertIsNone(ExchangeTokenService.verify(tampered))
+        self.assertIsNone(ExchangeTokenService.verify("EX20260126A1B2C3"))
+
+    def test_member_cannot_get_signing_key(self):
+        """測試 MEMBER 無法取得簽章金鑰（403）"""
+        self._authenticate(self.member)
+
+        response = self.client.get("/api/points/exchanges/signing-key/")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_offline_sync_outcomes(self):
+        """測試離線核銷同步每筆序號的結果"""
+        pending_a = self._create_exchange("EXSIGNEDA1", self.product_a)
+        pending_b = self._create_exchange("EXSIGNEDB1", self.product_b)
+        token_a = ExchangeTokenService.sign(pending_a)
+        token_b = ExchangeTokenService.sign(pending_b)
+
+        self._authenticate(self.store_a)
+        response = self.client.post(
+            "/api/points/exchanges/offline-sync/",
+            {"tokens": [token_a, token_b, "EXT1.invalid.token"]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = [item["result"] for item in response.data["results"]]
+        self.assertEqual(results, ["verified", "invalid_signature", "invalid_signature"])
+        self.assertEqual(response.data["results"][0]["id"], pending_a.id)
+
+        pending_a.refresh_from_db()
+        pending_b.refresh_from_db()
+        self.assertEqual(pending_a.status, ExchangeStatusChoices.VERIFIED)
+        self.assertEqual(pending_b.status, ExchangeStatusChoices.PENDING)
+
+        # 重複同步（例如另一台裝置）回報 already_verified
+        again = self.client.post(
+            "/api/points/exchanges/offline-sync/", {"tokens": [token_a]}, format="json"
+        )
+        self.assertEqual(again.data["results"][0]["result"], "already_verified")
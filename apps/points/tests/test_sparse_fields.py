@@ -0,0 +1,129 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices
+from apps.products.models import Product
+from apps.points.models import PointExchange, ExchangeStatusChoices
+
+User = get_user_model()
+
+
+class SparseFieldsTestCase(APITestCase):
+    """
+    稀疏欄位測試
+
+    測試 ?fields= / ?exclude= 同時裁剪回應欄位與查詢欄位、JOIN
+    """
+
+    def setUp(self):
+        """建立店家、會員、商品與兌換紀錄"""
+        self.store = User.objects.create_user(
+            username="store_sparse",
+            email="store_sparse@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.member = User.objects.create_user(
+            username="member_sparse",
+            email="member_sparse@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+
+        self.product = Product.objects.create(
+            store=self.store,
+            name="稀疏欄位商品",
+            required_points=100,
+            stock=10,
+            is_active=True,
+        )
+
+        for index in range(3):
+            PointExchange.objects.create(
+                user=self.member,
+                product=self.product,
+                exchange_code=f"EXSPARSE{index}",
+                quantity=1,
+                points_spent=100,
+                status=ExchangeStatusChoices.PENDING,
+            )
+
+        self.url = "/api/points/exchanges/"
+
+    def _authenticate(self, user):
+        """設定認證用戶"""
+        token = str(RefreshToken.for_user(user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def _exchange_queries(self, context):
+        """取得查詢 point_exchanges 的 SQL"""
+        return [
+            query["sql"] for query in context.captured_queries
+            if 'FROM "point_exchanges"' in query["sql"]
+        ]
+
+    def test_fields_limits_response_and_columns(self):
+        """測試 ?fields= 僅回傳指定欄位，且不查詢用不到的欄位與 JOIN"""
+        self._authenticate(self.store)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {"fields": "exchange_code,status,quantity"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        for item in response.data:
+            self.assertEqual(set(item.keys()), {"exchange_code", "status", "quantity"})
+
+        queries = self._exchange_queries(context)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"users"', queries[0])
+        self.assertNotIn('"points_spent"', queries[0])
+        self.assertNotIn('"products"."name"', queries[0])
+
+    def test_nested_fields(self):
+        """測試 ?fields=product.name 僅輸出巢狀商品名稱"""
+        self._authenticate(self.store)
+
+        response = self.client.get(self.url, {"fields": "exchange_code,product.name"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["product"], {"name": self.product.name})
+
+    def test_exclude_removes_nested_join(self):
+        """測試 ?exclude=product 不輸出商品資訊，也不查詢商品欄位"""
+        self._authenticate(self.member)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {"exclude": "product,user_username,user_email"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("product", response.data[0])
+        self.assertIn("exchange_code", response.data[0])
+
+        queries = self._exchange_queries(context)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"products"', queries[0])
+        self.assertNotIn('"users"', queries[0])
+
+    def test_unknown_field_returns_400(self):
+        """測試指定不存在的欄位回傳 400"""
+        self._authenticate(self.store)
+
+        response = self.client.get(self.url, {"fields": "exchange_code,not_a_field"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_default_response_unchanged(self):
+        """測試未帶參數時回應欄位與原本一致"""
+        self._authenticate(self.store)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("product", response.data[0])
+        self.assertIn("user_username", response.data[0])
+        self.assertIn("store", response.data[0]["product"])
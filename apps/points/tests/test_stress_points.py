@@ -0,0 +1,41 @@
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase
+from apps.points.management.commands.stress_points import classify_error
+
+
+class DriverError(Exception):
+    """模擬帶有 PostgreSQL 錯誤代碼的驅動程式例外"""
+
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+class StressPointsTestCase(SimpleTestCase):
+    """
+    併發壓力測試指令測試
+
+    壓力測試本身需要 PostgreSQL，此處測試錯誤分類與非 PostgreSQL 時拒絕執行
+    """
+
+    def test_classify_error(self):
+        """測試依 Django 資料庫例外保留的驅動程式錯誤代碼分類"""
+        for pgcode, expected in (("40P01", "deadlock"), ("40001", "serialization_failure")):
+            with self.subTest(pgcode=pgcode):
+                try:
+                    try:
+                        raise DriverError(pgcode)
+                    except DriverError as exc:
+                        raise OperationalError(str(exc)) from exc
+                except OperationalError as exc:
+                    self.assertEqual(classify_error(exc), expected)
+
+        self.assertEqual(classify_error(OperationalError("connection lost")), "OperationalError")
+
+    def test_requires_postgresql(self):
+        """測試非 PostgreSQL 時不執行"""
+        if connection.vendor == "postgresql":
+            self.skipTest("目前為 PostgreSQL")
+        with self.assertRaises(CommandError):
+            call_command("stress_points")
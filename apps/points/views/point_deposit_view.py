@@ -1,12 +1,17 @@
-from django.db import transaction
+import time
+
+from django.db import DatabaseError, transaction
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import CreateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
 from apps.users.models import RoleChoices, UserPoints
 from apps.points.models import PointTransaction, TransactionTypeChoices
+from apps.points.metrics import deposit_duration, deposit_requests, track_lock_wait
 from apps.points.serializers import PointDepositSerializer
+from core.db.sharding import shard_for_user
 
 
 @extend_schema(
@@ -21,12 +26,39 @@ class PointDepositView(CreateAPIView):
     僅限已登入的 MEMBER 存取。
     使用 select_for_update() 悲觀鎖，防止餘額更新時的競爭條件。
     使用 transaction.atomic() 確保 UserPoints 餘額更新與 PointTransaction 建立的一致性。
+    錢包與交易紀錄在同一個分片（使用者所屬的分片），事務只涉及該分片。
+    
+    指標（apps.points.metrics）：依結果累計請求數與處理時間，並記錄鎖定錢包的時間。
     """
     
     permission_classes = [IsAuthenticated]
     serializer_class = PointDepositSerializer
     
     def create(self, request, *args, **kwargs):
+        """執行儲值並記錄結果（success 或失敗原因）與處理時間"""
+        start = time.perf_counter()
+        self.reject_reason = None
+        result = "error"
+        try:
+            response = self.deposit(request)
+            result = self.reject_reason or "success"
+            return response
+        except ValidationError:
+            result = "invalid"
+            raise
+        except DatabaseError:
+            result = "db_error"
+            raise
+        finally:
+            deposit_requests.inc(result=result)
+            deposit_duration.observe(time.perf_counter() - start, result=result)
+    
+    def reject(self, reason, data, status_code):
+        """儲值失敗的回應（reason 為指標的失敗原因）"""
+        self.reject_reason = reason
+        return Response(data, status=status_code)
+    
+    def deposit(self, request):
         """
         執行儲值操作
         
@@ -36,9 +68,10 @@ class PointDepositView(CreateAPIView):
         """
         # 檢查用戶角色
         if request.user.role != RoleChoices.MEMBER:
-            return Response(
+            return self.reject(
+                "not_member",
                 {"detail": "僅會員可進行儲值操作"},
-                status=status.HTTP_403_FORBIDDEN
+                status.HTTP_403_FORBIDDEN,
             )
         
         serializer = self.get_serializer(data=request.data)
@@ -47,18 +80,21 @@ class PointDepositView(CreateAPIView):
         amount = serializer.validated_data["amount"]
         memo = serializer.validated_data.get("memo", "")
         
-        # 使用資料庫事務確保一致性
-        with transaction.atomic():
+        # 使用資料庫事務確保一致性（錢包與交易紀錄皆在使用者所屬的分片）
+        shard = shard_for_user(request.user.id)
+        with transaction.atomic(using=shard):
             # 使用 select_for_update() 鎖定 UserPoints，防止競爭條件
-            user_points = UserPoints.objects.select_for_update().get(
-                user=request.user
-            )
+            with track_lock_wait("deposit", "wallet"):
+                user_points = UserPoints.objects.for_user(request.user.id).select_for_update().get(
+                    user=request.user
+                )
             
             # 檢查錢包是否鎖定
             if user_points.is_locked:
-                return Response(
+                return self.reject(
+                    "wallet_locked",
                     {"detail": "錢包已鎖定，無法進行儲值操作"},
-                    status=status.HTTP_400_BAD_REQUEST
+                    status.HTTP_400_BAD_REQUEST,
                 )
             
             # 計算新餘額
@@ -69,7 +105,7 @@ class PointDepositView(CreateAPIView):
             user_points.save(update_fields=["balance"])
             
             # 建立交易紀錄
-            transaction_record = PointTransaction.objects.create(
+            transaction_record = PointTransaction.objects.for_user(request.user.id).create(
                 user=request.user,
                 amount=amount,
                 tx_type=TransactionTypeChoices.DEPOSIT,
@@ -1,7 +1,9 @@
 import secrets
+import time
 from datetime import datetime
-from django.db import transaction
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, transaction
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import CreateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -14,7 +16,12 @@ from apps.points.models import (
     PointExchange,
     ExchangeStatusChoices,
 )
+from apps.points.metrics import exchange_duration, exchange_requests, track_lock_wait
 from apps.points.serializers import PointExchangeSerializer
+from apps.points.services.exchange_token_service import ExchangeTokenService
+from apps.points.services.exchange_counter_service import ExchangeCounterService
+from apps.points.services.exchange_compensation_service import ExchangeCompensationService
+from core.db.sharding import shard_aliases, shard_for_user
 
 
 def generate_exchange_code():
@@ -29,6 +36,14 @@ def generate_exchange_code():
     return f"EX{date_str}{random_code}"
 
 
+def exchange_code_exists(exchange_code):
+    """交換序號是否已存在（啟用分片時檢查所有分片）"""
+    return any(
+        PointExchange.objects.on_shard(alias).filter(exchange_code=exchange_code).exists()
+        for alias in shard_aliases()
+    )
+
+
 @extend_schema(
     tags=["點數管理"],
     summary="會員兌換商品",
@@ -40,12 +55,47 @@ class PointExchangeView(CreateAPIView):
     
     僅限已登入的 MEMBER 存取。
     使用 transaction.atomic() 與 select_for_update() 確保高併發環境下的資料一致性。
+    
+    啟用分片時（跨資料庫兌換）：
+    - 先鎖定主資料庫的商品，再於使用者所屬的分片鎖定錢包並寫入兌換與交易紀錄
+    - 分片事務先提交，主資料庫（庫存、統計計數器）後提交
+    - 主資料庫提交失敗時由 ExchangeCompensationService 退回點數、刪除兌換紀錄，
+      並將交易紀錄標記為失敗
+    - 補償只在主資料庫提交失敗（拋出 DatabaseError）時執行；行程在兩次提交之間中止
+      （例如 worker 被終止、主機當機）時不會補償：錢包已扣點、兌換與交易紀錄已建立，
+      但庫存與統計計數器未扣除，需以對帳（交易紀錄與庫存）人工處理
+    
+    指標（apps.points.metrics）：依結果累計請求數與處理時間，並記錄鎖定商品與錢包的時間。
     """
     
     permission_classes = [IsAuthenticated]
     serializer_class = PointExchangeSerializer
     
     def create(self, request, *args, **kwargs):
+        """執行兌換並記錄結果（success 或失敗原因）與處理時間"""
+        start = time.perf_counter()
+        self.reject_reason = None
+        result = "error"
+        try:
+            response = self.exchange(request)
+            result = self.reject_reason or "success"
+            return response
+        except ValidationError:
+            result = "invalid"
+            raise
+        except DatabaseError:
+            result = "db_error"
+            raise
+        finally:
+            exchange_requests.inc(result=result)
+            exchange_duration.observe(time.perf_counter() - start, result=result)
+    
+    def reject(self, reason, data, status_code):
+        """兌換失敗的回應（reason 為指標的失敗原因）"""
+        self.reject_reason = reason
+        return Response(data, status=status_code)
+    
+    def exchange(self, request):
         """
         執行兌換操作
         
@@ -56,9 +106,10 @@ class PointExchangeView(CreateAPIView):
         """
         # 檢查用戶角色
         if request.user.role != RoleChoices.MEMBER:
-            return Response(
+            return self.reject(
+                "not_member",
                 {"detail": "僅會員可進行兌換操作"},
-                status=status.HTTP_403_FORBIDDEN
+                status.HTTP_403_FORBIDDEN,
             )
         
         serializer = self.get_serializer(data=request.data)
@@ -68,101 +119,123 @@ class PointExchangeView(CreateAPIView):
         quantity = serializer.validated_data.get("quantity", 1)
         
         # 使用資料庫事務確保一致性
-        with transaction.atomic():
-            # 1. 鎖定並取得商品（先鎖定商品，避免死鎖）
-            try:
-                product = Product.objects.select_for_update().get(
-                    id=product_id,
-                    is_active=True
-                )
-            except Product.DoesNotExist:
-                return Response(
-                    {"detail": "商品不存在或已下架"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # 2. 驗證庫存是否足夠（在鎖定後檢查，避免競態條件）
-            if product.stock < quantity:
-                return Response(
-                    {
-                        "detail": "商品庫存不足，無法兌換",
-                        "required": quantity,
-                        "available": product.stock,
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # 3. 鎖定並取得用戶點數
-            user_points = UserPoints.objects.select_for_update().get(
-                user=request.user
-            )
-            
-            # 4. 檢查錢包是否鎖定
-            if user_points.is_locked:
-                return Response(
-                    {"detail": "錢包已鎖定，無法進行兌換操作"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # 5. 計算總點數並驗證餘額是否足夠
-            required_points_per_item = product.required_points
-            total_points_required = required_points_per_item * quantity
-            balance_before = user_points.balance  # 記錄原始餘額
-            
-            if balance_before < total_points_required:
-                return Response(
-                    {
-                        "detail": "點數餘額不足",
-                        "required": total_points_required,
-                        "balance": balance_before,
-                        "quantity": quantity,
-                        "points_per_item": required_points_per_item,
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # 6. 計算新餘額
-            new_balance = balance_before - total_points_required
-            
-            # 7. 更新庫存
-            product.stock -= quantity
-            product.save(update_fields=["stock"])
-            
-            # 8. 更新餘額
-            user_points.balance = new_balance
-            user_points.save(update_fields=["balance"])
-            
-            # 9. 生成交換序號（確保唯一性）
-            exchange_code = generate_exchange_code()
-            # 如果序號已存在，重新生成（機率極低）
-            while PointExchange.objects.filter(exchange_code=exchange_code).exists():
-                exchange_code = generate_exchange_code()
-            
-            # 10. 建立兌換紀錄（一次兌換建立一筆紀錄，包含 quantity）
-            point_exchange = PointExchange.objects.create(
-                user=request.user,
-                product=product,
-                exchange_code=exchange_code,
-                quantity=quantity,
-                points_spent=total_points_required,
-                status=ExchangeStatusChoices.PENDING,
-            )
-            
-            # 11. 建立交易紀錄（amount 為負數，表示扣點）
-            point_transaction = PointTransaction.objects.create(
-                user=request.user,
-                amount=-total_points_required,  # 負數表示扣點
-                tx_type=TransactionTypeChoices.REDEMPTION,
-                is_success=True,
-                balance_after=new_balance,
-                memo=f"兌換商品：{product.name} x{quantity}",
-            )
+        # 外層為主資料庫的事務（商品庫存、統計計數器），內層為使用者所屬分片的事務（錢包、兌換與交易紀錄）；
+        # 未啟用分片時兩者為同一個事務
+        shard = shard_for_user(request.user.id)
+        shard_committed = False
+        try:
+            with transaction.atomic():
+                # 1. 鎖定並取得商品（先鎖定商品，避免死鎖）
+                try:
+                    with track_lock_wait("exchange", "product"):
+                        product = Product.objects.select_for_update().get(
+                            id=product_id,
+                            is_active=True
+                        )
+                except Product.DoesNotExist:
+                    return self.reject(
+                        "product_unavailable",
+                        {"detail": "商品不存在或已下架"},
+                        status.HTTP_400_BAD_REQUEST,
+                    )
+                
+                # 2. 驗證庫存是否足夠（在鎖定後檢查，避免競態條件）
+                if product.stock < quantity:
+                    return self.reject(
+                        "out_of_stock",
+                        {
+                            "detail": "商品庫存不足，無法兌換",
+                            "required": quantity,
+                            "available": product.stock,
+                        },
+                        status.HTTP_400_BAD_REQUEST,
+                    )
+                
+                with transaction.atomic(using=shard, savepoint=False):
+                    # 3. 鎖定並取得用戶點數
+                    with track_lock_wait("exchange", "wallet"):
+                        user_points = UserPoints.objects.for_user(request.user.id).select_for_update().get(
+                            user=request.user
+                        )
+                    
+                    # 4. 檢查錢包是否鎖定
+                    if user_points.is_locked:
+                        return self.reject(
+                            "wallet_locked",
+                            {"detail": "錢包已鎖定，無法進行兌換操作"},
+                            status.HTTP_400_BAD_REQUEST,
+                        )
+                    
+                    # 5. 計算總點數並驗證餘額是否足夠
+                    required_points_per_item = product.required_points
+                    total_points_required = required_points_per_item * quantity
+                    balance_before = user_points.balance  # 記錄原始餘額
+                    
+                    if balance_before < total_points_required:
+                        return self.reject(
+                            "insufficient_points",
+                            {
+                                "detail": "點數餘額不足",
+                                "required": total_points_required,
+                                "balance": balance_before,
+                                "quantity": quantity,
+                                "points_per_item": required_points_per_item,
+                            },
+                            status.HTTP_400_BAD_REQUEST,
+                        )
+                    
+                    # 6. 計算新餘額
+                    new_balance = balance_before - total_points_required
+                    
+                    # 7. 更新庫存
+                    product.stock -= quantity
+                    product.save(update_fields=["stock"])
+                    
+                    # 8. 更新餘額
+                    user_points.balance = new_balance
+                    user_points.save(update_fields=["balance"])
+                    
+                    # 9. 生成交換序號（確保所有分片中唯一）
+                    exchange_code = generate_exchange_code()
+                    # 如果序號已存在，重新生成（機率極低）
+                    while exchange_code_exists(exchange_code):
+                        exchange_code = generate_exchange_code()
+                    
+                    # 10. 建立兌換紀錄（一次兌換建立一筆紀錄，包含 quantity）
+                    point_exchange = PointExchange.objects.for_user(request.user.id).create(
+                        user=request.user,
+                        product=product,
+                        exchange_code=exchange_code,
+                        quantity=quantity,
+                        points_spent=total_points_required,
+                        status=ExchangeStatusChoices.PENDING,
+                    )
+                    ExchangeCounterService.record_exchange(point_exchange)
+                    
+                    # 11. 建立交易紀錄（amount 為負數，表示扣點）
+                    point_transaction = PointTransaction.objects.for_user(request.user.id).create(
+                        user=request.user,
+                        amount=-total_points_required,  # 負數表示扣點
+                        tx_type=TransactionTypeChoices.REDEMPTION,
+                        is_success=True,
+                        balance_after=new_balance,
+                        memo=f"兌換商品：{product.name} x{quantity}",
+                    )
+                
+                # 分片與主資料庫不同時，分片的事務已先提交
+                shard_committed = shard != DEFAULT_DB_ALIAS
+        except DatabaseError:
+            # 主資料庫提交失敗（庫存未扣除）：補償已提交的分片資料後回報錯誤
+            if shard_committed:
+                ExchangeCompensationService.compensate(shard, point_exchange, point_transaction)
+            raise
         
         return Response(
             {
                 "message": "兌換成功",
                 "exchange_id": point_exchange.id,
                 "exchange_code": exchange_code,
+                "signed_code": ExchangeTokenService.sign(point_exchange),
                 "product": {
                     "id": product.id,
                     "name": product.name,
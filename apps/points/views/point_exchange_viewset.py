@@ -1,23 +1,36 @@
+from asgiref.sync import sync_to_async
+from django.db import transaction
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from utils.views import ModelViewSet
+from utils.views import AsyncDispatchMixin, ModelViewSet, ShardedViewSetMixin
 from apps.points.models import PointExchange, ExchangeStatusChoices
 from apps.points.serializers import (
     PointExchangeListSerializer,
     PointExchangeVerifySerializer,
+    PointExchangeUserSerializer,
+    PointExchangeSideloadSerializer,
+    PointExchangeBulkVerifySerializer,
+    PointExchangeOfflineSyncSerializer,
 )
+from apps.points.services.exchange_verify_service import ExchangeVerifyService
+from apps.points.services.exchange_token_service import ExchangeTokenService, TOKEN_VERSION
+from apps.points.services.exchange_lookup_cache import ExchangeLookupCache
+from apps.points.services.exchange_counter_service import ExchangeCounterService
+from apps.products.models import Product
+from apps.products.serializers import ProductSerializer
 from apps.users.models import RoleChoices
-from core.permissions import IsStoreOrAdmin
+from core.db.sharding import sharding_enabled
+from core.permissions import IsStore, IsStoreOrAdmin
 
 
 @extend_schema(
     tags=["點數管理"],
     description="查詢和管理點數兌換紀錄，不同角色有不同的查詢範圍和權限",
 )
-class PointExchangeViewSet(ModelViewSet):
+class PointExchangeViewSet(AsyncDispatchMixin, ShardedViewSetMixin, ModelViewSet):
     """
     點數兌換紀錄 ViewSet
     
@@ -25,18 +38,43 @@ class PointExchangeViewSet(ModelViewSet):
     - List: 查詢兌換紀錄列表（根據角色過濾）
     - Retrieve: 查詢單一兌換紀錄（根據角色過濾）
     - Update/Partial Update: 核銷兌換紀錄（僅 STORE 和 ADMIN）
+    - Bulk Verify: 批次核銷兌換紀錄（僅 STORE 和 ADMIN）
+    - Signed Code: 取得兌換紀錄的簽章交換序號（可離線驗證）
+    - Signing Key: 取得店家的簽章驗證金鑰（僅 STORE）
+    - Offline Sync: 同步離線核銷的簽章序號（僅 STORE 和 ADMIN）
+    - Stats: 查詢兌換統計（僅 STORE 和 ADMIN）
     
     權限控制：
     - MEMBER：僅能查看自己的兌換紀錄
     - STORE：僅能查看自己商品的兌換紀錄，可以核銷自己商品的兌換紀錄
     - ADMIN：可以查看所有兌換紀錄，可以核銷任何兌換紀錄
+    
+    啟用分片時 MEMBER 僅查詢自己所屬的分片，STORE / ADMIN 查詢所有分片後合併。
+    ASGI 模式下 Lookup By Code 使用 async 版本（alookup_by_code）。
+    
+    query_budget：各 action 的查詢次數上限（含 JWT 使用者快取未命中時的一次查詢），
+    超過時由 ServerTimingMiddleware 記錄警告，用於發現 N+1 查詢。
     """
     
+    async_handlers = {"lookup_by_code": "alookup_by_code"}
+    query_budget = {
+        "list": 5,
+        "retrieve": 3,
+        "lookup_by_code": 2,
+        "signed_code": 2,
+        "stats": 2,
+    }
+    
     permission_classes = [IsAuthenticated]
     serializer_class = PointExchangeListSerializer
     search_fields = ["exchange_code", "user__username", "product__name"]
     ordering_fields = ["created_at", "points_spent", "status"]
     ordering = ["-created_at"]
+    sideload_serializer_class = PointExchangeSideloadSerializer
+    sideload_includes = {
+        "products": ("product_id", ProductSerializer),
+        "users": ("user_id", PointExchangeUserSerializer),
+    }
     
     def get_queryset(self):
         """
@@ -45,6 +83,8 @@ class PointExchangeViewSet(ModelViewSet):
         - MEMBER：僅能查看自己的兌換紀錄
         - STORE：僅能查看自己商品的兌換紀錄
         - ADMIN：可以查看所有兌換紀錄
+        
+        啟用分片時 STORE / ADMIN 的查詢由 ShardedViewSetMixin 在所有分片執行。
         """
         queryset = PointExchange.objects.select_related(
             "user", "product", "product__store"
@@ -52,10 +92,17 @@ class PointExchangeViewSet(ModelViewSet):
         
         if self.request.user.role == RoleChoices.MEMBER:
             # 會員：只看自己的兌換紀錄
-            queryset = queryset.filter(user=self.request.user)
+            queryset = queryset.for_user(self.request.user.id).filter(user=self.request.user)
         elif self.request.user.role == RoleChoices.STORE:
             # 店家：只看自己商品的兌換紀錄
-            queryset = queryset.filter(product__store=self.request.user)
+            if sharding_enabled():
+                # 分片上沒有商品資料，先在主資料庫取得店家的商品 ID
+                product_ids = list(
+                    Product.objects.filter(store=self.request.user).values_list("id", flat=True)
+                )
+                queryset = queryset.filter(product_id__in=product_ids)
+            else:
+                queryset = queryset.filter(product__store=self.request.user)
         # ADMIN 可以查看所有兌換紀錄，不需要過濾
         
         return queryset
@@ -65,24 +112,34 @@ class PointExchangeViewSet(ModelViewSet):
         根據 action 返回不同的 Serializer
         
         - list/retrieve: 使用 PointExchangeListSerializer（查詢用）
+        - list + ?sideload=true: 使用 PointExchangeSideloadSerializer（側載用）
         - update/partial_update: 使用 PointExchangeVerifySerializer（核銷用）
+        - bulk_verify: 使用 PointExchangeBulkVerifySerializer（批次核銷用）
+        - offline_sync: 使用 PointExchangeOfflineSyncSerializer（離線核銷同步用）
         """
         if self.action in ['update', 'partial_update']:
             return PointExchangeVerifySerializer
-        return PointExchangeListSerializer
+        if self.action == 'bulk_verify':
+            return PointExchangeBulkVerifySerializer
+        if self.action == 'offline_sync':
+            return PointExchangeOfflineSyncSerializer
+        return super().get_serializer_class()
     
     def get_permissions(self):
         """
         動態設定權限
         
-        - List/Retrieve: 需要登入（IsAuthenticated）
-        - Update/Partial Update: 需要登入且為店家或管理員（IsAuthenticated + IsStore 或 IsAdmin）
+        - List/Retrieve/Signed Code: 需要登入（IsAuthenticated）
+        - Update/Partial Update/Bulk Verify/Offline Sync/Stats: 需要登入且為店家或管理員（IsAuthenticated + IsStore 或 IsAdmin）
+        - Signing Key: 需要登入且為店家（IsAuthenticated + IsStore）
         """
-        if self.action in ['list', 'retrieve', 'lookup_by_code']:
+        if self.action in ['list', 'retrieve', 'lookup_by_code', 'signed_code']:
             return [IsAuthenticated()]
-        elif self.action in ['update', 'partial_update']:
+        elif self.action in ['update', 'partial_update', 'bulk_verify', 'offline_sync', 'stats']:
             # 核銷功能需要是店家或管理員
             return [IsAuthenticated(), IsStoreOrAdmin()]
+        elif self.action == 'signing_key':
+            return [IsAuthenticated(), IsStore()]
         return super().get_permissions()
     
     @extend_schema(
@@ -92,6 +149,9 @@ class PointExchangeViewSet(ModelViewSet):
         - MEMBER：僅能查看自己的兌換紀錄
         - STORE：僅能查看自己商品的兌換紀錄
         - ADMIN：可以查看所有兌換紀錄
+        
+        帶 sideload=true 時，每筆紀錄僅包含 user_id / product_id，
+        商品與會員資訊改放在最上層 included.products / included.users（每個物件僅出現一次）。
         """,
         parameters=[
             OpenApiParameter(
@@ -108,6 +168,13 @@ class PointExchangeViewSet(ModelViewSet):
                 description="商品 ID 篩選（店家可用）",
                 required=False,
             ),
+            OpenApiParameter(
+                name="sideload",
+                type=bool,
+                location=OpenApiParameter.QUERY,
+                description="是否使用側載格式（關聯資料去重後放在 included）",
+                required=False,
+            ),
         ],
     )
     def list(self, request, *args, **kwargs):
@@ -196,8 +263,27 @@ class PointExchangeViewSet(ModelViewSet):
         )
         serializer.is_valid(raise_exception=True)
         
-        # 更新狀態為 VERIFIED
-        serializer.save(status=ExchangeStatusChoices.VERIFIED)
+        # 外層為主資料庫的事務（統計計數器），內層為兌換紀錄所在分片的事務；未啟用分片時為同一個事務
+        shard = instance._state.db
+        with transaction.atomic(), transaction.atomic(using=shard, savepoint=False):
+            # 鎖定兌換紀錄後再檢查狀態，避免同時核銷重複計入統計
+            instance.status = (
+                PointExchange.objects.on_shard(shard).select_for_update()
+                .values_list("status", flat=True)
+                .get(pk=instance.pk)
+            )
+            
+            if instance.status != ExchangeStatusChoices.PENDING:
+                return Response(
+                    {"detail": f"此兌換紀錄狀態為 {instance.get_status_display()}，無法核銷"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            # 更新狀態為 VERIFIED
+            serializer.save(status=ExchangeStatusChoices.VERIFIED)
+            ExchangeCounterService.record_verified(
+                [(instance.product_id, instance.quantity, instance.points_spent)]
+            )
         
         return Response(
             {
@@ -234,42 +320,258 @@ class PointExchangeViewSet(ModelViewSet):
         """
         根據交換序號查詢兌換紀錄
         
-        用於店家核銷時快速查詢。
+        用於店家核銷時快速查詢。優先讀取交換序號查詢快取，
+        權限檢查使用快取中的 user_id / store_id，命中時不需要查詢資料庫。
         """
         exchange_code = request.query_params.get("code")
         
         if not exchange_code:
-            return Response(
-                {"detail": "請提供交換序號（code 參數）"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return self._missing_code_response()
         
-        try:
-            exchange = PointExchange.objects.select_related(
-                "user", "product", "product__store"
-            ).get(exchange_code=exchange_code)
-        except PointExchange.DoesNotExist:
-            return Response(
-                {"detail": "找不到此交換序號的兌換紀錄"},
-                status=status.HTTP_404_NOT_FOUND
+        entry = ExchangeLookupCache.get(exchange_code)
+        if entry is None:
+            try:
+                # 啟用分片時依序在各分片查詢
+                exchange = self._lookup_queryset().get(exchange_code=exchange_code)
+            except PointExchange.DoesNotExist:
+                return self._code_not_found_response()
+            entry = ExchangeLookupCache.set(exchange, PointExchangeListSerializer(exchange).data)
+        
+        denied = self._check_lookup_permission(request, entry)
+        if denied is not None:
+            return denied
+        
+        if self.sparse_fields is None:
+            return Response(entry["data"], status=status.HTTP_200_OK)
+        
+        # 指定 fields / exclude 時改以資料庫資料序列化（裁剪巢狀欄位）
+        exchange = self._lookup_queryset().get(pk=entry["data"]["id"])
+        serializer = self.get_serializer(exchange)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+    
+    async def alookup_by_code(self, request):
+        """lookup_by_code() 的 async 版本（ASGI 模式），快取與資料庫皆以 async API 讀取"""
+        exchange_code = request.query_params.get("code")
+        
+        if not exchange_code:
+            return self._missing_code_response()
+        
+        entry = await ExchangeLookupCache.aget(exchange_code)
+        if entry is None:
+            try:
+                exchange = await self._lookup_queryset().aget(exchange_code=exchange_code)
+            except PointExchange.DoesNotExist:
+                return self._code_not_found_response()
+            entry = await sync_to_async(ExchangeLookupCache.set)(
+                exchange, PointExchangeListSerializer(exchange).data
             )
         
-        # 權限檢查
+        denied = self._check_lookup_permission(request, entry)
+        if denied is not None:
+            return denied
+        
+        if self.sparse_fields is None:
+            return Response(entry["data"], status=status.HTTP_200_OK)
+        
+        exchange = await self._lookup_queryset().aget(pk=entry["data"]["id"])
+        serializer = self.get_serializer(exchange)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+    
+    @staticmethod
+    def _lookup_queryset():
+        """交換序號查詢使用的查詢（啟用分片時依序在各分片查詢）"""
+        return PointExchange.objects.select_related(
+            "user", "product", "product__store"
+        ).fan_out()
+    
+    @staticmethod
+    def _missing_code_response():
+        return Response(
+            {"detail": "請提供交換序號（code 參數）"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    @staticmethod
+    def _code_not_found_response():
+        return Response(
+            {"detail": "找不到此交換序號的兌換紀錄"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    @staticmethod
+    def _check_lookup_permission(request, entry):
+        """
+        以快取內容檢查查詢權限
+        
+        Returns:
+            Response | None: 沒有權限時回傳 403 回應
+        """
         if request.user.role == RoleChoices.MEMBER:
             # 會員只能查看自己的
-            if exchange.user != request.user:
+            if entry["user_id"] != request.user.id:
                 return Response(
                     {"detail": "您沒有權限查看此兌換紀錄"},
                     status=status.HTTP_403_FORBIDDEN
                 )
         elif request.user.role == RoleChoices.STORE:
             # 店家只能查看自己商品的
-            if exchange.product.store != request.user:
+            if entry["store_id"] != request.user.id:
                 return Response(
                     {"detail": "您沒有權限查看此兌換紀錄"},
                     status=status.HTTP_403_FORBIDDEN
                 )
         # ADMIN 可以查看任何兌換紀錄
+        return None
+    
+    @extend_schema(
+        summary="批次核銷兌換紀錄",
+        description="""
+        一次核銷多筆兌換紀錄（例如店家處理當日所有取貨），提供 codes（交換序號）或 ids 其中之一。
         
-        serializer = self.get_serializer(exchange)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        以單一 UPDATE 將屬於自己商品且為 PENDING 的紀錄改為 VERIFIED，並回傳每筆結果：
+        - verified：核銷成功
+        - already_verified：已核銷
+        - not_found：找不到此兌換紀錄
+        - not_yours：不屬於自己商品的兌換紀錄（僅 STORE）
+        
+        權限：
+        - STORE：僅能核銷自己商品的兌換紀錄
+        - ADMIN：可以核銷任何兌換紀錄
+        """,
+        request=PointExchangeBulkVerifySerializer,
+    )
+    @action(detail=False, methods=['post'], url_path='bulk-verify')
+    def bulk_verify(self, request):
+        """批次核銷兌換紀錄"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        result = ExchangeVerifyService.bulk_verify(
+            request.user,
+            codes=serializer.validated_data.get("codes"),
+            ids=serializer.validated_data.get("ids"),
+        )
+        
+        return Response(result, status=status.HTTP_200_OK)
+    
+    @extend_schema(
+        summary="取得簽章交換序號",
+        description="""
+        取得兌換紀錄的簽章交換序號（signed_code），供會員出示 QR Code。
+        
+        簽章序號包含兌換紀錄 ID、交換序號、商品 ID、店家 ID、數量與發放日期，
+        店家以自己的簽章金鑰即可離線驗證真偽與歸屬，不需查詢伺服器。
+        """,
+    )
+    @action(detail=True, methods=['get'], url_path='signed-code')
+    def signed_code(self, request, pk=None):
+        """取得簽章交換序號"""
+        exchange = self.get_object()
+        return Response(
+            {
+                "exchange_code": exchange.exchange_code,
+                "signed_code": ExchangeTokenService.sign(exchange),
+            },
+            status=status.HTTP_200_OK
+        )
+    
+    @extend_schema(
+        summary="取得店家簽章驗證金鑰",
+        description="""
+        取得店家專屬的簽章金鑰，供店家端離線驗證簽章交換序號。
+        
+        驗證方式：序號格式為 EXT1.<payload>.<signature>，
+        signature 為以此金鑰對「EXT1.<payload>」計算 HMAC-SHA256 後取前 16 bytes，皆為 base64url（無補位）。
+        payload 為 JSON：e=兌換紀錄 ID、c=交換序號、p=商品 ID、s=店家 ID、q=數量、d=發放日期（YYYYMMDD）。
+        
+        金鑰僅對此店家的商品有效，請妥善保管。
+        """,
+    )
+    @action(detail=False, methods=['get'], url_path='signing-key')
+    def signing_key(self, request):
+        """取得店家簽章驗證金鑰"""
+        key = ExchangeTokenService.get_store_key(request.user.id)
+        return Response(
+            {
+                "store_id": request.user.id,
+                "version": TOKEN_VERSION,
+                "algorithm": "HMAC-SHA256",
+                "key": ExchangeTokenService.encode_key(key),
+            },
+            status=status.HTTP_200_OK
+        )
+    
+    @extend_schema(
+        summary="同步離線核銷",
+        description="""
+        店家離線時掃描並驗證的簽章交換序號，恢復連線後批次上傳核銷。
+        
+        伺服器會重新驗證每個序號的簽章，簽章有效者再依資料庫狀態核銷，回傳每筆結果：
+        - verified：核銷成功
+        - already_verified：已核銷（例如同一序號在其他裝置已核銷）
+        - not_found：找不到此兌換紀錄
+        - not_yours：不屬於自己商品的兌換紀錄（僅 STORE）
+        - invalid_signature：簽章無效或非此店家的序號
+        """,
+        request=PointExchangeOfflineSyncSerializer,
+    )
+    @action(detail=False, methods=['post'], url_path='offline-sync')
+    def offline_sync(self, request):
+        """同步離線核銷"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        result = ExchangeTokenService.sync_offline(
+            request.user,
+            serializer.validated_data["tokens"],
+        )
+        
+        return Response(result, status=status.HTTP_200_OK)
+    
+    @extend_schema(
+        summary="查詢兌換統計",
+        description="""
+        查詢待核銷 / 已核銷的兌換筆數、數量與點數合計（totals），以及每個商品的統計（products）。
+        
+        統計資料讀取兌換統計計數器，不需掃描兌換紀錄。
+        
+        權限：
+        - STORE：僅能查詢自己商品的統計
+        - ADMIN：可以查詢所有統計，或以 store 參數指定店家
+        """,
+        parameters=[
+            OpenApiParameter(
+                name="store",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                description="店家 ID 篩選（管理員可用）",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="product",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                description="商品 ID 篩選",
+                required=False,
+            ),
+        ],
+    )
+    @action(detail=False, methods=['get'], url_path='stats')
+    def stats(self, request):
+        """查詢兌換統計"""
+        try:
+            store_id = request.query_params.get("store")
+            store_id = int(store_id) if store_id else None
+            product_id = request.query_params.get("product")
+            product_id = int(product_id) if product_id else None
+        except ValueError:
+            return Response(
+                {"detail": "store 與 product 參數必須為整數"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if request.user.role == RoleChoices.STORE:
+            store_id = request.user.id
+        
+        result = ExchangeCounterService.get_stats(store_id=store_id, product_id=product_id)
+        return Response(result, status=status.HTTP_200_OK)
@@ -2,7 +2,7 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from utils.views import ModelViewSet
+from utils.views import ModelViewSet, ShardedViewSetMixin
 from apps.points.models import PointTransaction
 from apps.points.serializers import PointTransactionSerializer
 from apps.users.models import RoleChoices
@@ -12,7 +12,7 @@ from apps.users.models import RoleChoices
     tags=["點數管理"],
     description="查詢點數交易紀錄，MEMBER 僅能查看自己的交易紀錄",
 )
-class PointTransactionViewSet(ModelViewSet):
+class PointTransactionViewSet(ShardedViewSetMixin, ModelViewSet):
     """
     點數交易紀錄 ViewSet
     
@@ -23,6 +23,8 @@ class PointTransactionViewSet(ModelViewSet):
     權限控制：
     - MEMBER：僅能查看自己的交易紀錄
     - ADMIN：可以查看所有交易紀錄（用於對帳、異常處理等）
+    
+    啟用分片時 MEMBER 僅查詢自己所屬的分片，ADMIN 查詢所有分片後合併。
     """
     
     permission_classes = [IsAuthenticated]
@@ -36,13 +38,13 @@ class PointTransactionViewSet(ModelViewSet):
         根據用戶角色過濾查詢集
         
         - MEMBER：僅能查看自己的交易紀錄
-        - ADMIN：可以查看所有交易紀錄
+        - ADMIN：可以查看所有交易紀錄（啟用分片時由 ShardedViewSetMixin 查詢所有分片）
         """
         queryset = PointTransaction.objects.select_related("user").all()
         
         # MEMBER 僅能查看自己的交易紀錄
         if self.request.user.role == RoleChoices.MEMBER:
-            queryset = queryset.filter(user=self.request.user)
+            queryset = queryset.for_user(self.request.user.id).filter(user=self.request.user)
         # ADMIN 可以查看所有交易紀錄
         # 注意：STORE 角色目前不允許查看交易紀錄
         
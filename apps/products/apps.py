@@ -5,5 +5,8 @@ class ProductsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.products"
     verbose_name = "商品管理"
-
+    
+    def ready(self):
+        """載入 signals"""
+        import apps.products.signals  # noqa
 
@@ -0,0 +1,5 @@
+"""
+Products app 服務層
+
+將業務邏輯從 views 中分離出來，提高程式碼的可重用性和可測試性。
+"""
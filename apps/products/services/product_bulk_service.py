@@ -0,0 +1,225 @@
+"""
+商品批次匯入服務
+
+供店家一次建立或更新大量商品（JSON 或 CSV）。
+驗證以欄位為單位批次處理，寫入則以 bulk_create / bulk_update 分批執行，
+避免逐筆請求、逐筆權限檢查與逐筆 INSERT 的成本。
+"""
+
+import csv
+import io
+
+from django.db import transaction
+from django.utils import timezone
+from apps.products.models import Product
+from apps.products.services.product_name_index import product_name_index
+
+
+def _clean_name(value):
+    value = "" if value is None else str(value).strip()
+    if not value:
+        raise ValueError("商品名稱不得為空")
+    if len(value) > 200:
+        raise ValueError("商品名稱不得超過 200 字元")
+    return value
+
+
+def _clean_non_negative_int(message):
+    def clean(value):
+        if isinstance(value, bool):
+            raise ValueError("必須為整數")
+        try:
+            value = int(str(value).strip())
+        except (TypeError, ValueError):
+            raise ValueError("必須為整數")
+        if value < 0:
+            raise ValueError(message)
+        return value
+
+    return clean
+
+
+def _clean_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "1", "yes"):
+        return True
+    if text in ("false", "0", "no"):
+        return False
+    raise ValueError("必須為布林值（true/false）")
+
+
+def _clean_memo(value):
+    if value is None:
+        return None
+    value = str(value)
+    if len(value) > 300:
+        raise ValueError("備註不得超過 300 字元")
+    return value
+
+
+def _clean_id(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        raise ValueError("商品 ID 必須為整數")
+
+
+class ProductBulkService:
+    """商品批次匯入服務類別"""
+
+    MAX_ROWS = 10000
+    BATCH_SIZE = 500
+
+    # 欄位 -> 清洗函式（依欄位批次套用）
+    COLUMN_CLEANERS = {
+        "id": _clean_id,
+        "name": _clean_name,
+        "required_points": _clean_non_negative_int("兌換點數不得為負數"),
+        "stock": _clean_non_negative_int("庫存數量不得為負數"),
+        "is_active": _clean_bool,
+        "memo": _clean_memo,
+    }
+
+    # 新增商品時必填的欄位
+    REQUIRED_ON_CREATE = ["name", "required_points"]
+
+    @classmethod
+    def parse_csv(cls, text):
+        """
+        解析 CSV 文字為資料列
+
+        第一列為欄位名稱，空白欄位視為未提供。
+
+        Raises:
+            ValueError: CSV 格式錯誤（例如欄位超過長度上限）
+        """
+        reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+        try:
+            return [
+                {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+                for row in reader
+            ]
+        except csv.Error as e:
+            raise ValueError(f"CSV 格式錯誤（第 {reader.line_num} 行）：{e}")
+
+    @classmethod
+    def validate_rows(cls, rows):
+        """
+        批次驗證資料列
+
+        Returns:
+            (cleaned, errors)：兩者皆為與 rows 等長的 list，errors[i] 為空 dict 表示該列有效
+        """
+        cleaned = [{} for _ in rows]
+        errors = [{} for _ in rows]
+
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors[index]["non_field_errors"] = "資料列格式錯誤，必須為物件"
+
+        for column, cleaner in cls.COLUMN_CLEANERS.items():
+            for index, row in enumerate(rows):
+                if errors[index].get("non_field_errors") or column not in row:
+                    continue
+                try:
+                    cleaned[index][column] = cleaner(row[column])
+                except ValueError as e:
+                    errors[index][column] = str(e)
+
+        seen_ids = set()
+        for index, row in enumerate(cleaned):
+            if errors[index]:
+                continue
+            if "id" in row:
+                if row["id"] in seen_ids:
+                    errors[index]["id"] = "同一批次中商品 ID 重複"
+                seen_ids.add(row["id"])
+                continue
+            for column in cls.REQUIRED_ON_CREATE:
+                if column not in row:
+                    errors[index][column] = "新增商品時此欄位為必填"
+
+        return cleaned, errors
+
+    @classmethod
+    def import_products(cls, store, rows):
+        """
+        批次建立或更新商品
+
+        - 含 id 的資料列：更新該店家既有的商品（bulk_update）
+        - 不含 id 的資料列：建立新商品，store 自動設定為當前店家（bulk_create）
+
+        Returns:
+            dict: 包含處理結果的字典
+                - created / updated / failed: 各狀態筆數
+                - results: 每列結果（row 從 1 開始），status 為 created / updated / error
+        """
+        cleaned, errors = cls.validate_rows(rows)
+
+        update_ids = [row["id"] for row, error in zip(cleaned, errors) if not error and "id" in row]
+
+        with transaction.atomic():
+            existing = {}
+            if update_ids:
+                existing = (
+                    Product.objects.select_for_update()
+                    .filter(store=store, id__in=update_ids)
+                    .in_bulk()
+                )
+
+            to_create = []
+            to_update = []
+            update_fields = set()
+            now = timezone.now()
+
+            for index, row in enumerate(cleaned):
+                if errors[index]:
+                    continue
+
+                if "id" not in row:
+                    to_create.append((index, Product(store=store, **row)))
+                    continue
+
+                product = existing.get(row["id"])
+                if product is None:
+                    errors[index]["id"] = "商品不存在或不屬於此店家"
+                    continue
+
+                for column, value in row.items():
+                    if column != "id":
+                        setattr(product, column, value)
+                        update_fields.add(column)
+                product.updated_at = now
+                to_update.append((index, product))
+
+            Product.objects.bulk_create(
+                [product for _, product in to_create], batch_size=cls.BATCH_SIZE
+            )
+            if to_update:
+                Product.objects.bulk_update(
+                    [product for _, product in to_update],
+                    fields=sorted(update_fields) + ["updated_at"],
+                    batch_size=cls.BATCH_SIZE,
+                )
+
+            # bulk 操作不會觸發 signals，提交後讓名稱索引整批重建
+            if to_create or to_update:
+                transaction.on_commit(product_name_index.mark_stale)
+
+        results = [None] * len(rows)
+        for index, product in to_create:
+            results[index] = {"row": index + 1, "status": "created", "id": product.id}
+        for index, product in to_update:
+            results[index] = {"row": index + 1, "status": "updated", "id": product.id}
+        for index, error in enumerate(errors):
+            if error:
+                results[index] = {"row": index + 1, "status": "error", "errors": error}
+
+        return {
+            "created": len(to_create),
+            "updated": len(to_update),
+            "failed": sum(1 for error in errors if error),
+            "results": results,
+        }
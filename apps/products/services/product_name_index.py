@@ -0,0 +1,210 @@
+"""
+商品名稱前綴索引服務
+
+於每個 worker 行程內維護上架商品名稱的排序索引，供搜尋框自動完成使用，
+查詢時僅做二分搜尋，不需要查詢資料庫。
+
+- 索引於第一次查詢時建立，之後透過 Product 的 post_save / post_delete signals 即時更新
+- bulk_create / bulk_update 不會觸發 signals，由呼叫端以 mark_stale() 遞增快取中共用的索引版本，
+  各 worker 查詢時發現版本改變即整批重建（需使用共用快取，例如 Redis；行程內快取只會通知目前的 worker）
+- 商品改名、上下架與刪除時，signals 更新處理該請求的 worker 的索引後同樣遞增共用版本（notify_changed()），
+  其他 worker 於下一次查詢時整批重建
+- 另每隔 PRODUCT_AUTOCOMPLETE_REFRESH_SECONDS 秒整批重建一次（涵蓋行程內快取等無法通知的情況）
+"""
+
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.cache import cache
+from apps.products.models import Product
+
+# 快取中共用的索引版本（mark_stale() 時遞增）
+GENERATION_CACHE_KEY = "products:name-index-generation"
+
+
+def _is_cjk(char):
+    """是否為中日韓文字（每個字都可作為搜尋起點）"""
+    return unicodedata.east_asian_width(char) in ("W", "F") and char.isalnum()
+
+
+def normalize(text):
+    """正規化：全形轉半形、轉小寫、去除前後空白"""
+    return unicodedata.normalize("NFKC", text).lower().strip()
+
+
+def tokenize(name):
+    """
+    產生商品名稱的索引詞
+
+    索引詞為名稱從每個可搜尋起點開始的後綴：
+    - 英數字：每個單字的開頭
+    - 中日韓文字：每一個字（中文不以空白分詞）
+
+    例如 "iPhone 15 保護殼" -> "iphone 15 保護殼", "15 保護殼", "保護殼", "護殼", "殼"
+    """
+    text = normalize(name)
+    tokens = set()
+    previous = " "
+    for index, char in enumerate(text):
+        if char.isspace():
+            previous = char
+            continue
+        if _is_cjk(char) or not previous.isalnum() or _is_cjk(previous):
+            tokens.add(text[index:])
+        previous = char
+    return tokens
+
+
+class ProductNameIndex:
+    """
+    行程內的商品名稱前綴索引
+
+    以 (索引詞, 商品 ID) 的排序 list 保存，前綴查詢為 O(log n + k)。
+    寫入時持有鎖並以 copy-on-write 更新：複製後修改，再一次替換 (list, 名稱 dict)，
+    讀取不加鎖，查詢期間看到的資料不會被修改。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        # (排序的 (索引詞, 商品 ID) list, {商品 ID: 名稱})，只整體替換不原地修改
+        self._data = ([], {})
+        self._built_at = None
+        self._generation = None
+
+    @property
+    def refresh_seconds(self):
+        return getattr(settings, "PRODUCT_AUTOCOMPLETE_REFRESH_SECONDS", 300)
+
+    @staticmethod
+    def _bump_generation():
+        """
+        遞增共用的索引版本
+
+        Returns:
+            int | None: 新的版本；版本在 add 與 incr 之間被淘汰時回傳 None
+        """
+        try:
+            if cache.add(GENERATION_CACHE_KEY, 1, timeout=None):
+                return 1
+            return cache.incr(GENERATION_CACHE_KEY)
+        except ValueError:
+            return None
+
+    def mark_stale(self):
+        """標記索引需要重建（下一次查詢時重建），並遞增共用的索引版本讓其他 worker 也重建"""
+        self._built_at = None
+        self._bump_generation()
+
+    def notify_changed(self):
+        """
+        此行程已以 upsert / remove 更新索引後呼叫：遞增共用的索引版本讓其他 worker 重建
+
+        版本恰好由此行程的版本遞增（期間沒有其他異動）時，此行程直接採用新版本，不需要重建。
+        """
+        previous = self._generation
+        generation = self._bump_generation()
+        if previous is not None and generation == previous + 1:
+            self._generation = generation
+
+    def _is_stale(self):
+        if self._built_at is None or time.monotonic() - self._built_at > self.refresh_seconds:
+            return True
+        return cache.get(GENERATION_CACHE_KEY, 0) != self._generation
+
+    def build(self):
+        """從資料庫重建整個索引"""
+        # 先取得版本再讀取資料庫，讀取期間的 mark_stale() 會在下一次查詢時再次重建
+        generation = cache.get(GENERATION_CACHE_KEY, 0)
+        products = Product.objects.filter(is_active=True).values_list("id", "name")
+        names = {}
+        entries = []
+        for product_id, name in products.iterator(chunk_size=2000):
+            names[product_id] = name
+            entries.extend((token, product_id) for token in tokenize(name))
+        entries.sort()
+
+        with self._lock:
+            self._data = (entries, names)
+            self._built_at = time.monotonic()
+            self._generation = generation
+
+    def _ensure_fresh(self):
+        if not self._is_stale():
+            return
+        if self._built_at is None:
+            # 尚未建立：必須等待建立完成
+            with self._build_lock:
+                if self._built_at is None:
+                    self.build()
+        elif self._build_lock.acquire(blocking=False):
+            # 已過期：由取得鎖的請求重建，其他請求繼續使用舊索引
+            try:
+                self.build()
+            finally:
+                self._build_lock.release()
+
+    def upsert(self, product_id, name, is_active):
+        """新增或更新單一商品（下架商品會被移除）"""
+        with self._lock:
+            entries, names = self._copy_without(product_id)
+            if is_active:
+                names[product_id] = name
+                for token in tokenize(name):
+                    insort(entries, (token, product_id))
+            self._data = (entries, names)
+
+    def remove(self, product_id):
+        """移除單一商品"""
+        with self._lock:
+            self._data = self._copy_without(product_id)
+
+    def _copy_without(self, product_id):
+        """複製目前的資料並移除單一商品（需持有 _lock）"""
+        entries, names = self._data
+        entries, names = list(entries), dict(names)
+        name = names.pop(product_id, None)
+        if name is None:
+            return entries, names
+        for token in tokenize(name):
+            position = bisect_left(entries, (token, product_id))
+            if position < len(entries) and entries[position] == (token, product_id):
+                del entries[position]
+        return entries, names
+
+    def search(self, query, limit=10):
+        """
+        前綴查詢
+
+        Returns:
+            list[dict]: [{"id": ..., "name": ...}]，名稱開頭相符者優先，其次依名稱長度排序
+        """
+        query = normalize(query)
+        if not query:
+            return []
+
+        self._ensure_fresh()
+        entries, names = self._data
+
+        matched = {}
+        position = bisect_left(entries, (query,))
+        while position < len(entries) and len(matched) < limit * 5:
+            token, product_id = entries[position]
+            if not token.startswith(query):
+                break
+            name = names.get(product_id)
+            if name is not None:
+                matched[product_id] = name
+            position += 1
+
+        ranked = sorted(
+            matched.items(),
+            key=lambda item: (not normalize(item[1]).startswith(query), len(item[1]), item[0]),
+        )
+        return [{"id": product_id, "name": name} for product_id, name in ranked[:limit]]
+
+
+product_name_index = ProductNameIndex()
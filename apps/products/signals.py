@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Product
+from .services.product_name_index import product_name_index
+
+
+# 影響名稱索引的欄位
+NAME_INDEX_FIELDS = {"name", "is_active"}
+
+
+@receiver(post_save, sender=Product)
+def update_product_name_index(sender, instance, update_fields=None, **kwargs):
+    """
+    商品儲存後更新行程內的名稱索引
+
+    於交易提交後才更新，避免回滾的異動進入索引，並通知其他 worker 重建索引。
+    指定 update_fields 且不包含名稱與上架狀態時（例如兌換扣庫存）不更新。
+    """
+    if update_fields is not None and not NAME_INDEX_FIELDS.intersection(update_fields):
+        return
+
+    product_id, name, is_active = instance.id, instance.name, instance.is_active
+
+    def update():
+        product_name_index.upsert(product_id, name, is_active)
+        product_name_index.notify_changed()
+
+    transaction.on_commit(update)
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_name_index(sender, instance, **kwargs):
+    """商品刪除後自名稱索引移除，並通知其他 worker 重建索引"""
+    product_id = instance.id
+
+    def remove():
+        product_name_index.remove(product_id)
+        product_name_index.notify_changed()
+
+    transaction.on_commit(remove)
@@ -0,0 +1,130 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.users.models import RoleChoices
+from apps.products.models import Product
+from apps.products.services.product_name_index import ProductNameIndex, product_name_index
+
+User = get_user_model()
+
+
+class ProductAutocompleteTestCase(APITestCase):
+    """
+    商品名稱自動完成測試
+
+    測試中文任意字起始、英文單字開頭的前綴查詢，以及索引隨商品異動更新
+    """
+
+    def setUp(self):
+        """建立店家與商品，並讓索引從測試資料重建"""
+        self.store = User.objects.create_user(
+            username="store_autocomplete",
+            email="store_autocomplete@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.case = Product.objects.create(
+            store=self.store,
+            name="iPhone 15 手機保護殼",
+            required_points=100,
+            stock=10,
+            is_active=True,
+        )
+
+        self.inactive = Product.objects.create(
+            store=self.store,
+            name="手機支架（已下架）",
+            required_points=50,
+            stock=0,
+            is_active=False,
+        )
+
+        product_name_index.mark_stale()
+        self.url = "/api/products/autocomplete/"
+
+    def _search(self, query):
+        response = self.client.get(self.url, {"q": query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["id"] for item in response.data]
+
+    def test_cjk_prefix_from_any_character(self):
+        """測試中文可從任意字開始搜尋"""
+        self.assertEqual(self._search("保護"), [self.case.id])
+        self.assertEqual(self._search("手機"), [self.case.id])
+
+    def test_word_prefix_case_and_width_insensitive(self):
+        """測試英文單字開頭搜尋，不分大小寫與全形半形"""
+        self.assertEqual(self._search("IPH"), [self.case.id])
+        self.assertEqual(self._search("ｉｐｈｏｎｅ"), [self.case.id])
+        self.assertEqual(self._search("15"), [self.case.id])
+        self.assertEqual(self._search("hone"), [])
+
+    def test_inactive_products_excluded(self):
+        """測試下架商品不會出現在結果中"""
+        self.assertEqual(self._search("支架"), [])
+
+    def test_index_follows_product_updates_without_queries(self):
+        """測試商品更新後索引即時反映，且查詢不需要存取資料庫"""
+        self._search("手機")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.inactive.is_active = True
+            self.inactive.save()
+            self.case.is_active = False
+            self.case.save()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._search("手機"), [self.inactive.id])
+
+    def test_stock_update_does_not_touch_index(self):
+        """測試指定 update_fields 且不含名稱與上架狀態時不更新索引"""
+        with mock.patch.object(product_name_index, "upsert") as upsert:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.case.stock = 9
+                self.case.save(update_fields=["stock"])
+            upsert.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.case.name = "iPhone 16 手機保護殼"
+                self.case.save(update_fields=["name"])
+            upsert.assert_called_once_with(self.case.id, "iPhone 16 手機保護殼", True)
+
+    def test_mark_stale_from_other_worker_rebuilds(self):
+        """測試其他 worker 的 mark_stale()（遞增共用版本）讓此行程的索引重建"""
+        self._search("手機")
+        Product.objects.filter(pk=self.inactive.pk).update(is_active=True)
+        self.assertEqual(self._search("支架"), [])
+
+        ProductNameIndex().mark_stale()
+
+        self.assertEqual(self._search("支架"), [self.inactive.id])
+
+    def test_product_change_reaches_other_workers(self):
+        """測試商品改名與下架後，其他 worker 的索引重建，處理請求的 worker 不需要重建"""
+        other_worker = ProductNameIndex()
+        self.assertEqual([item["id"] for item in other_worker.search("保護")], [self.case.id])
+        self._search("保護")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.case.name = "平板皮套"
+            self.case.save()
+
+        self.assertEqual(other_worker.search("保護"), [])
+        self.assertEqual([item["id"] for item in other_worker.search("皮套")], [self.case.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(self._search("皮套"), [self.case.id])
+
+    def test_updates_do_not_mutate_searched_data(self):
+        """測試更新以 copy-on-write 進行，查詢中的資料不會被修改（不會因長度改變而 IndexError）"""
+        product_name_index.search("手機")
+        entries, names = product_name_index._data
+        snapshot = (list(entries), dict(names))
+
+        product_name_index.upsert(self.inactive.id, "手機支架", True)
+        product_name_index.remove(self.case.id)
+
+        self.assertEqual((entries, names), snapshot)
+        self.assertEqual([item["id"] for item in product_name_index.search("手機")], [self.inactive.id])
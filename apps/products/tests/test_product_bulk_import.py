@@ -0,0 +1,157 @@
+import csv
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices
+from apps.products.models import Product
+
+User = get_user_model()
+
+
+class ProductBulkImportTestCase(APITestCase):
+    """
+    商品批次匯入測試
+
+    測試 JSON / CSV 匯入、更新自己的商品與每列結果
+    """
+
+    def setUp(self):
+        """建立店家與會員"""
+        self.store_a = User.objects.create_user(
+            username="store_bulk_a",
+            email="store_bulk_a@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.store_b = User.objects.create_user(
+            username="store_bulk_b",
+            email="store_bulk_b@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+
+        self.member = User.objects.create_user(
+            username="member_bulk",
+            email="member_bulk@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+
+        self.product_b = Product.objects.create(
+            store=self.store_b,
+            name="Store B Product",
+            required_points=200,
+            stock=30,
+            is_active=True,
+        )
+
+        self.url = "/api/products/bulk/"
+
+    def _authenticate(self, user):
+        """設定認證用戶"""
+        token = str(RefreshToken.for_user(user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_member_cannot_bulk_import(self):
+        """測試 MEMBER 無法批次匯入（403）"""
+        self._authenticate(self.member)
+
+        response = self.client.post(self.url, [{"name": "x", "required_points": 1}], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_json_import_creates_products_with_store(self):
+        """測試 JSON 批次建立商品，store 自動帶入，無效列回報錯誤"""
+        self._authenticate(self.store_a)
+
+        rows = [{"name": f"商品 {index}", "required_points": 10, "stock": 5} for index in range(3)]
+        rows.append({"name": "", "required_points": -1})
+
+        response = self.client.post(self.url, {"products": rows}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(response.data["failed"], 1)
+        self.assertEqual(response.data["results"][3]["status"], "error")
+        self.assertIn("name", response.data["results"][3]["errors"])
+        self.assertIn("required_points", response.data["results"][3]["errors"])
+        self.assertEqual(Product.objects.filter(store=self.store_a).count(), 3)
+
+    def test_csv_import_updates_own_products_only(self):
+        """測試 CSV 匯入：可更新自己的商品，無法更新其他店家的商品"""
+        self._authenticate(self.store_a)
+        own = Product.objects.create(
+            store=self.store_a,
+            name="Own Product",
+            required_points=100,
+            stock=1,
+            is_active=True,
+        )
+
+        content = (
+            "id,name,required_points,stock,is_active\n"
+            f"{own.id},Own Product v2,,9,false\n"
+            f"{self.product_b.id},Hijacked,1,1,true\n"
+            ",CSV 新商品,50,3,true\n"
+        )
+        upload = SimpleUploadedFile("products.csv", content.encode("utf-8"), content_type="text/csv")
+
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, ["updated", "error", "created"])
+
+        own.refresh_from_db()
+        self.assertEqual(own.name, "Own Product v2")
+        self.assertEqual(own.stock, 9)
+        self.assertEqual(own.required_points, 100)
+        self.assertFalse(own.is_active)
+
+        self.product_b.refresh_from_db()
+        self.assertEqual(self.product_b.name, "Store B Product")
+
+    def test_raw_csv_body(self):
+        """測試以 text/csv 直接送出 CSV 內容"""
+        self._authenticate(self.store_a)
+
+        response = self.client.post(
+            self.url,
+            "name,required_points\n商品 A,10\n商品 B,20\n",
+            content_type="text/csv",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+
+    def test_non_utf8_csv_rejected(self):
+        """測試非 UTF-8 的 CSV（檔案上傳與 text/csv）回傳 400"""
+        self._authenticate(self.store_a)
+        content = "name,required_points\n商品 A,10\n".encode("big5")
+
+        upload = SimpleUploadedFile("products.csv", content, content_type="text/csv")
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.url, content, content_type="text/csv")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertFalse(Product.objects.filter(store=self.store_a).exists())
+
+    def test_malformed_csv_rejected(self):
+        """測試格式錯誤的 CSV（欄位超過 csv 模組的長度上限）回傳 400"""
+        self._authenticate(self.store_a)
+        content = "name,required_points\n" + "A" * (csv.field_size_limit() + 1) + ",10\n"
+
+        response = self.client.post(self.url, content, content_type="text/csv")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        upload = SimpleUploadedFile("products.csv", content.encode("utf-8"), content_type="text/csv")
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertFalse(Product.objects.filter(store=self.store_a).exists())
@@ -1,11 +1,16 @@
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from drf_spectacular.utils import extend_schema
-from utils.views import ModelViewSet
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from utils.parsers import CSVTextParser
+from utils.views import AsyncDispatchMixin, ModelViewSet
 from apps.products.models import Product
 from apps.products.serializers import ProductSerializer
 from apps.products.filters import ProductFilter
+from apps.products.services.product_bulk_service import ProductBulkService
+from apps.products.services.product_name_index import product_name_index
 from core.permissions import IsStore, IsProductOwner
 
 
@@ -13,13 +18,15 @@ from core.permissions import IsStore, IsProductOwner
     tags=["商品管理"],
     description="商品 CRUD API，查詢不需要登入，建立需要店家權限，修改需要是商品擁有者",
 )
-class ProductViewSet(ModelViewSet):
+class ProductViewSet(AsyncDispatchMixin, ModelViewSet):
     """
     商品 ViewSet
     
     提供商品的 CRUD 操作：
     - List/Retrieve: 查詢商品列表/詳情（不需要登入）
+    - Autocomplete: 商品名稱自動完成（不需要登入，使用行程內索引，不查詢資料庫）
     - Create: 建立商品（需要登入且為店家）
+    - Bulk Import: 批次建立/更新商品（需要登入且為店家）
     - Update: 更新商品（需要登入且為商品擁有者或管理者）
     - Destroy: 軟刪除商品（需要登入且為商品擁有者或管理者）
     
@@ -27,8 +34,15 @@ class ProductViewSet(ModelViewSet):
     - 查詢：AllowAny（不需要登入）
     - 建立：IsAuthenticated + IsStore（需要是店家）
     - 更新/刪除：IsAuthenticated + IsProductOwner（需要是商品擁有者或管理者）
+    
+    ASGI 模式下 List/Retrieve 使用 async 版本（alist / aretrieve，見 AsyncDispatchMixin）。
+    
+    query_budget：List/Retrieve 的查詢次數上限，超過時由 ServerTimingMiddleware 記錄警告。
     """
     
+    async_handlers = {"list": "alist", "retrieve": "aretrieve"}
+    query_budget = {"list": 3, "retrieve": 2}
+    
     queryset = Product.objects.select_related("store").all()
     serializer_class = ProductSerializer
     filterset_class = ProductFilter
@@ -40,14 +54,14 @@ class ProductViewSet(ModelViewSet):
         """
         動態設定權限
         
-        - List/Retrieve: 不需要登入（AllowAny）
-        - Create: 需要登入且為店家（IsAuthenticated + IsStore）
+        - List/Retrieve/Autocomplete: 不需要登入（AllowAny）
+        - Create/Bulk Import: 需要登入且為店家（IsAuthenticated + IsStore）
         - Update/Delete: 需要登入且為商品擁有者或管理者（IsAuthenticated + IsProductOwner）
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'autocomplete']:
             # 查詢商品不需要登入
             return [AllowAny()]
-        elif self.action == 'create':
+        elif self.action in ['create', 'bulk_import']:
             # 建立商品需要是店家
             return [IsAuthenticated(), IsStore()]
         else:
@@ -89,3 +103,128 @@ class ProductViewSet(ModelViewSet):
         instance.save(update_fields=["is_active"])
         
         return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    @extend_schema(
+        summary="批次匯入商品",
+        description="""
+        店家一次建立或更新大量商品，支援以下格式：
+        - JSON：商品陣列，或 {"products": [...]}
+        - CSV：Content-Type: text/csv，或以 multipart 上傳 file 欄位；第一列為欄位名稱
+        
+        欄位：id（選填，填寫時更新自己既有的商品）、name、required_points、stock、is_active、memo。
+        新增商品時 name、required_points 為必填，store 自動設定為當前登入的店家。
+        
+        單次最多 10000 筆，回傳每列的處理結果（created / updated / error）。
+        """,
+        request={
+            "application/json": {"type": "array", "items": {"type": "object"}},
+            "text/csv": {"type": "string"},
+        },
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk",
+        parser_classes=[JSONParser, CSVTextParser, MultiPartParser],
+    )
+    def bulk_import(self, request):
+        """
+        批次建立或更新商品
+        
+        權限檢查已透過 get_permissions() 中的 IsStore 處理。
+        """
+        data = request.data
+        content = None
+        if isinstance(data, str):
+            content = data
+        elif "file" in request.FILES:
+            try:
+                content = request.FILES["file"].read().decode("utf-8-sig")
+            except UnicodeDecodeError:
+                return Response(
+                    {"detail": "CSV 檔案需使用 UTF-8 編碼"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        if content is not None:
+            try:
+                rows = ProductBulkService.parse_csv(content)
+            except ValueError as e:
+                return Response(
+                    {"detail": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        elif isinstance(data, list):
+            rows = data
+        elif isinstance(data, dict) and isinstance(data.get("products"), list):
+            rows = data["products"]
+        else:
+            return Response(
+                {"detail": "請提供商品陣列、{\"products\": [...]} 或 CSV 檔案"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not rows:
+            return Response(
+                {"detail": "沒有可匯入的商品資料"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if len(rows) > ProductBulkService.MAX_ROWS:
+            return Response(
+                {"detail": f"單次最多匯入 {ProductBulkService.MAX_ROWS} 筆商品"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        result = ProductBulkService.import_products(request.user, rows)
+        return Response(result, status=status.HTTP_200_OK)
+    
+    @extend_schema(
+        summary="商品名稱自動完成",
+        description="""
+        搜尋框自動完成，依輸入前綴回傳上架中的商品名稱。
+        
+        支援中文任意字起始的搜尋（如輸入「保護」可找到「手機保護殼」）與英文單字開頭搜尋，
+        全形/半形與大小寫不影響結果。使用行程內索引，不查詢資料庫。
+        """,
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                description="搜尋前綴",
+                required=True,
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                description="回傳筆數（1-50，預設 10）",
+                required=False,
+            ),
+        ],
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="autocomplete",
+        authentication_classes=[],
+        pagination_class=None,
+    )
+    def autocomplete(self, request):
+        """
+        商品名稱自動完成
+        
+        不需要登入，因此略過 JWT 認證以省去 token 解析與用戶查詢。
+        """
+        query = request.query_params.get("q", "")
+        
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 50)
+        except ValueError:
+            return Response(
+                {"detail": "limit 必須為整數"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(product_name_index.search(query, limit=limit), status=status.HTTP_200_OK)
@@ -7,7 +7,24 @@ class UsersConfig(AppConfig):
     verbose_name = "用戶管理"
     
     def ready(self):
-        """載入 signals"""
+        """
+        載入 signals，並依設定啟用非對稱 JWT 簽章
+        
+        金鑰於第一次簽章 / 驗證時才讀取，金鑰尚未建立時仍可執行 generate_jwt_key、migrate 等指令。
+        """
         import apps.users.signals  # noqa
+        from functools import partial
+        from django.conf import settings
+        from rest_framework_simplejwt import state
+        from apps.users.token_backend import (
+            ASYMMETRIC_ALGORITHMS,
+            LazyTokenBackend,
+            build_token_backend,
+            install_token_backend,
+        )
+        
+        if settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+            backend = LazyTokenBackend(partial(build_token_backend, legacy_backend=state.token_backend))
+            install_token_backend(backend)
 
 
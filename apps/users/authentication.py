@@ -0,0 +1,117 @@
+"""
+JWT 認證（快取使用者）
+
+simplejwt 的 JWTAuthentication 每個請求都會查詢一次 users 資料表，
+CachedJWTAuthentication 改由行程內的 TTL 快取取得使用者：
+
+- User 儲存或刪除後由 signals 使快取失效（僅限同一行程）
+- 其他 worker 的快取最多延遲 JWT_USER_CACHE_TTL_SECONDS 秒（例如停用帳號、變更角色）
+- 每個請求取得的是快取使用者的複本，請求中對 request.user 的修改不會影響快取
+
+每個請求只解析一次 JWT：結果保存在 HttpRequest 上，
+DRF 認證與 get_current_user()（config.middlewares）共用同一個結果。
+"""
+
+import copy
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from utils.metrics import Counter
+from utils.request_timing import timed
+from utils.ttl_cache import TTLCache
+
+user_cache = TTLCache(
+    maxsize=settings.JWT_USER_CACHE_MAX_SIZE,
+    ttl=settings.JWT_USER_CACHE_TTL_SECONDS,
+)
+
+user_cache_requests = Counter(
+    "jwt_user_cache_requests_total",
+    "JWT 認證取得使用者的次數（hit：快取命中，miss：查詢資料庫）",
+    labels=("result",),
+)
+
+# HttpRequest 上保存認證結果的屬性名稱：(result, error)
+REQUEST_AUTH_ATTR = "_jwt_authentication"
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """以 TTL 快取取得使用者的 JWT 認證"""
+
+    def authenticate(self, request):
+        """
+        認證請求，同一個請求只解析一次 JWT
+
+        Args:
+            request: DRF Request 或 Django HttpRequest
+
+        Returns:
+            (user, validated_token) | None: 未提供 JWT 時回傳 None
+        """
+        http_request = getattr(request, "_request", request)
+        cached = getattr(http_request, REQUEST_AUTH_ATTR, None)
+        if cached is None:
+            with timed("auth"):
+                try:
+                    cached = (super().authenticate(request), None)
+                except APIException as e:
+                    cached = (None, e)
+            setattr(http_request, REQUEST_AUTH_ATTR, cached)
+
+        result, error = cached
+        if error is not None:
+            raise error
+        return result
+
+    def get_user(self, validated_token):
+        """
+        取得 token 對應的使用者
+
+        快取命中時不查詢資料庫；帳號停用與密碼變更的檢查與 JWTAuthentication 相同。
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        user_cache_requests.inc(result="miss" if user is None else "hit")
+        if user is None:
+            generation = user_cache.generation
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(user_id, user, generation=generation)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return copy.copy(user)
+
+
+def get_request_user(request):
+    """
+    取得請求的 JWT 使用者（供 DRF 以外的程式使用）
+
+    Returns:
+        User | None: 未提供 JWT 或認證失敗時回傳 None
+    """
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except APIException:
+        return None
+    return result[0] if result else None
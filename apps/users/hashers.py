@@ -0,0 +1,18 @@
+"""
+密碼雜湊器
+
+與 Django 預設的 PBKDF2PasswordHasher 相同（algorithm 同為 pbkdf2_sha256，既有密碼不需重設），
+但雜湊在 PasswordHashingService 的執行池中進行。
+check_password、set_password 與 ModelBackend 的防時序攻擊雜湊最後都會呼叫 encode，
+因此只需覆寫 encode。
+"""
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from apps.users.services.password_hashing_service import PasswordHashingService
+
+
+class BoundedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """在有上限的執行池中雜湊的 PBKDF2 雜湊器"""
+
+    def encode(self, password, salt, iterations=None):
+        return PasswordHashingService.run(super().encode, password, salt, iterations)
@@ -0,0 +1,106 @@
+"""
+登入吞吐量基準測試的 Django 管理指令
+
+使用方式：
+    python manage.py benchmark_login
+    python manage.py benchmark_login --requests 500 --concurrency 16
+
+以多個執行緒同時呼叫登入 API（/api/auth/token/），量測：
+- 每秒登入數與每個 CPU 秒的登入數（約等於每個核心每秒可處理的登入數）
+- 登入延遲 p50 / p95
+- 因密碼雜湊執行池已滿而回傳 503 的次數
+
+調整 PASSWORD_HASH_WORKERS / PASSWORD_HASH_MAX_PENDING 後重跑即可比較。
+測試帳號於結束後刪除。
+"""
+
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client
+from apps.users.models import RoleChoices
+
+User = get_user_model()
+
+USERNAME = "bench_login_member"
+PASSWORD = "bench-login-123!"
+
+
+class Command(BaseCommand):
+    help = "量測登入 API 的吞吐量（每秒登入數、每核心登入數、延遲）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="登入次數（預設 200）")
+        parser.add_argument("--concurrency", type=int, default=8, help="同時登入的執行緒數（預設 8）")
+
+    def handle(self, *args, **options):
+        """執行基準測試"""
+        total = options["requests"]
+        concurrency = options["concurrency"]
+        self.stdout.write(self.style.SUCCESS(
+            f"開始量測登入吞吐量：{total} 次、{concurrency} 個執行緒、"
+            f"雜湊執行池 {settings.PASSWORD_HASH_WORKERS} 個（排隊 {settings.PASSWORD_HASH_MAX_PENDING}）"
+        ))
+
+        User.objects.filter(username=USERNAME).delete()
+        User.objects.create_user(
+            username=USERNAME,
+            email=f"{USERNAME}@example.com",
+            password=PASSWORD,
+            role=RoleChoices.MEMBER,
+        )
+        try:
+            results = self._run(total, concurrency)
+        finally:
+            User.objects.filter(username=USERNAME).delete()
+
+        timings = [elapsed for status_code, elapsed in results["responses"] if status_code == 200]
+        status_counts = {}
+        for status_code, _elapsed in results["responses"]:
+            status_counts[status_code] = status_counts.get(status_code, 0) + 1
+
+        wall = results["wall"]
+        cpu = results["cpu"]
+        self.stdout.write(self.style.SUCCESS("\n結果："))
+        self.stdout.write(f"  回應狀態：{dict(sorted(status_counts.items()))}")
+        self.stdout.write(f"  耗時：{wall:.2f} 秒（CPU {cpu:.2f} 秒，{os.cpu_count()} 核心）")
+        self.stdout.write(f"  每秒登入數：{len(timings) / wall:.1f}")
+        if cpu:
+            self.stdout.write(f"  每核心每秒登入數：{len(timings) / cpu:.1f}")
+        if len(timings) >= 2:
+            quantiles = statistics.quantiles(timings, n=100)
+            self.stdout.write(
+                f"  延遲 p50：{quantiles[49] * 1000:.1f} ms，p95：{quantiles[94] * 1000:.1f} ms"
+            )
+
+    def _run(self, total, concurrency):
+        """以多個執行緒登入，回傳每次的狀態碼與耗時"""
+        local = threading.local()
+
+        def login(_index):
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = Client()
+            started = time.perf_counter()
+            response = client.post(
+                "/api/auth/token/",
+                {"username": USERNAME, "password": PASSWORD},
+                content_type="application/json",
+            )
+            return response.status_code, time.perf_counter() - started
+
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            responses = list(executor.map(login, range(total)))
+        return {
+            "responses": responses,
+            "wall": time.perf_counter() - wall_started,
+            "cpu": time.process_time() - cpu_started,
+        }
@@ -0,0 +1,60 @@
+"""
+產生 JWT 簽章金鑰的 Django 管理指令
+
+使用方式：
+    python manage.py generate_jwt_key --kid 2026-10
+    python manage.py generate_jwt_key --kid 2026-10 --algorithm EdDSA
+
+於 JWT_KEYS_DIR 建立 <kid>.pem 私鑰（權限 600），演算法預設為 JWT_ALGORITHM。
+建立後該金鑰的公鑰即會發布於 JWKS，確認其他服務已取得後再將 JWT_ACTIVE_KID 改為新 kid。
+"""
+
+import os
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.users.token_backend import ASYMMETRIC_ALGORITHMS
+
+
+class Command(BaseCommand):
+    help = "產生 JWT 非對稱簽章金鑰（RS256 / EdDSA）"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kid", required=True, help="金鑰 ID（同時作為檔名）")
+        parser.add_argument(
+            "--algorithm",
+            default=settings.JWT_ALGORITHM,
+            choices=sorted(ASYMMETRIC_ALGORITHMS),
+            help="簽章演算法（預設為 JWT_ALGORITHM）",
+        )
+
+    def handle(self, *args, **options):
+        """產生金鑰檔"""
+        kid = options["kid"]
+        if not kid.replace("-", "").replace("_", "").isalnum():
+            raise CommandError("kid 僅能包含英數字、- 與 _")
+
+        path = Path(settings.JWT_KEYS_DIR) / f"{kid}.pem"
+        if path.exists():
+            raise CommandError(f"金鑰已存在：{path}")
+
+        if options["algorithm"] == "RS256":
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=3072)
+        else:
+            private_key = ed25519.Ed25519PrivateKey.generate()
+
+        pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+
+        self.stdout.write(self.style.SUCCESS(f"已建立 {options['algorithm']} 金鑰：{path}"))
+        self.stdout.write(f"  設定 JWT_ACTIVE_KID={kid} 即可使用此金鑰簽章")
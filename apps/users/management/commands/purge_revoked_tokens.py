@@ -0,0 +1,33 @@
+"""
+刪除已到期撤銷紀錄的 Django 管理指令
+
+使用方式：
+    python manage.py purge_revoked_tokens
+    python manage.py purge_revoked_tokens --batch-size 5000
+
+Refresh Token 到期後即使未撤銷也無法使用，撤銷紀錄不需要再保存。
+建議以排程定期執行（例如每日一次），讓 revoked_tokens 只保留尚未到期的 token。
+"""
+
+from django.core.management.base import BaseCommand
+from apps.users.services.token_blacklist_service import TokenBlacklistService
+
+
+class Command(BaseCommand):
+    help = "刪除已到期的 Refresh Token 撤銷紀錄"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="每批刪除筆數（預設 10000）",
+        )
+
+    def handle(self, *args, **options):
+        """執行刪除"""
+        self.stdout.write(self.style.SUCCESS("開始刪除已到期的撤銷紀錄..."))
+
+        deleted = TokenBlacklistService.purge_expired(batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"\n完成！已刪除 {deleted} 筆撤銷紀錄"))
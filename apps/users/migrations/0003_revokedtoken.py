@@ -0,0 +1,26 @@
+# Generated by Django 4.2.16 on 2026-10-19 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_userpoints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('jti', models.UUIDField(help_text='Token 的 jti', primary_key=True, serialize=False)),
+                ('expires_at', models.DateTimeField(db_index=True, help_text='Token 到期時間（之後可刪除此紀錄）')),
+                ('revoked_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='撤銷時間（供各行程增量同步 Bloom filter）')),
+            ],
+            options={
+                'verbose_name': '已撤銷 Token',
+                'verbose_name_plural': '已撤銷 Token',
+                'db_table': 'revoked_tokens',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:09
+
+from django.db import migrations
+import core.db.operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_email_unique'),
+    ]
+
+    operations = [
+        core.db.operations.DropForeignKeyConstraintOnShards(
+            model_name='userpoints',
+            fields=('user',),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from .user_model import User, RoleChoices
 from .userpoint_model import UserPoints
+from .revoked_token_model import RevokedToken
 
-__all__ = ["User", "RoleChoices", "UserPoints"]
+__all__ = ["User", "RoleChoices", "UserPoints", "RevokedToken"]
@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class RevokedToken(models.Model):
+    """
+    已撤銷的 Refresh Token
+
+    只保存 jti（UUID，16 bytes）與到期時間，不保存 token 內容與使用者關聯，
+    每筆資料固定大小。token 到期後即使未撤銷也無法使用，
+    因此過期的紀錄可由 purge_revoked_tokens 指令刪除。
+    """
+
+    jti = models.UUIDField(
+        primary_key=True,
+        help_text="Token 的 jti",
+    )
+
+    expires_at = models.DateTimeField(
+        db_index=True,
+        help_text="Token 到期時間（之後可刪除此紀錄）",
+    )
+
+    revoked_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        help_text="撤銷時間（供各行程增量同步 Bloom filter）",
+    )
+
+    class Meta:
+        db_table = "revoked_tokens"
+        verbose_name = "已撤銷 Token"
+        verbose_name_plural = "已撤銷 Token"
+
+    def __str__(self):
+        return f"{self.jti} (到期: {self.expires_at})"
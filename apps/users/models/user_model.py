@@ -56,6 +56,14 @@ class User(AbstractUser):
         verbose_name = "使用者"
         verbose_name_plural = "使用者"
         ordering = ["-date_joined"]
+        constraints = [
+            # 註冊時不預先查詢 email 是否已使用，由唯一約束保證（未填 email 的帳號除外）
+            models.UniqueConstraint(
+                fields=["email"],
+                condition=~models.Q(email=""),
+                name="users_email_unique",
+            ),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
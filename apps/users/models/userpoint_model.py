@@ -2,6 +2,7 @@ from django.db import models
 from django.core.validators import MinValueValidator
 from django.conf import settings
 from core.models.base_model import BaseModel
+from core.db.sharding import ShardedManager
 
 
 class UserPoints(BaseModel):
@@ -10,8 +11,11 @@ class UserPoints(BaseModel):
     
     與 User 建立 One-to-One 關係，用於存放使用者的點數餘額。
     系統會在 User 建立時自動建立對應的 UserPoints 紀錄。
+    依 user_id 分片（見 core.db.sharding），分片上的 user 不建立資料庫外鍵約束（migration 0005）。
     """
     
+    SHARD_KEY = "user_id"
+    
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -30,6 +34,8 @@ class UserPoints(BaseModel):
         help_text="錢包鎖定狀態，True=鎖定（禁止交易）, False=正常",
     )
     
+    objects = ShardedManager()
+    
     class Meta:
         db_table = "user_points"
         verbose_name = "使用者點數"
@@ -1,7 +1,15 @@
 from .user_register_serializer import UserRegisterSerializer
 from .me_serializer import MeSerializer
+from .jwt_serializers import (
+    CustomTokenRefreshSerializer,
+    CustomTokenBlacklistSerializer,
+    CustomTokenVerifySerializer,
+)
 
 __all__ = [
     "UserRegisterSerializer",
     "MeSerializer",
+    "CustomTokenRefreshSerializer",
+    "CustomTokenBlacklistSerializer",
+    "CustomTokenVerifySerializer",
 ]
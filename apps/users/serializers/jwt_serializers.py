@@ -0,0 +1,45 @@
+"""
+JWT 相關 Serializer
+
+使用 RevocableRefreshToken，讓 SIMPLE_JWT 的 BLACKLIST_AFTER_ROTATION 生效。
+"""
+
+from rest_framework import serializers
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+from apps.users.services.token_blacklist_service import TokenBlacklistService
+from apps.users.tokens import RevocableRefreshToken
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """刷新 Token：已撤銷的 Refresh Token 無法使用，輪替時撤銷舊的 Refresh Token"""
+
+    token_class = RevocableRefreshToken
+
+
+class CustomTokenBlacklistSerializer(TokenBlacklistSerializer):
+    """登出：撤銷 Refresh Token"""
+
+    token_class = RevocableRefreshToken
+
+
+class CustomTokenVerifySerializer(TokenVerifySerializer):
+    """驗證 Token：已撤銷的 Refresh Token 視為無效"""
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+
+        if token.get(api_settings.TOKEN_TYPE_CLAIM) == RevocableRefreshToken.token_type:
+            try:
+                revoked = TokenBlacklistService.is_revoked(token.get(api_settings.JTI_CLAIM))
+            except ValueError:
+                revoked = True
+            if revoked:
+                raise serializers.ValidationError("Token is blacklisted")
+
+        return {}
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
 from apps.users.models import RoleChoices
 
 User = get_user_model()
@@ -11,6 +13,8 @@ class UserRegisterSerializer(serializers.ModelSerializer):
     
     包含密碼確認與 role 驗證。
     註冊時僅允許選擇 MEMBER 或 STORE，不允許註冊為 ADMIN。
+    
+    帳號與 email 是否已使用不預先查詢，由資料庫唯一約束判斷（見 create）。
     """
     
     password = serializers.CharField(
@@ -39,23 +43,20 @@ class UserRegisterSerializer(serializers.ModelSerializer):
             "password_confirm",
             "role",
         ]
+        # 移除 DRF 自動加入的 UniqueValidator（每個欄位各一次 SELECT）
         extra_kwargs = {
-            "username": {"help_text": "帳號（用於系統登入）"},
-            "email": {"required": True, "help_text": "電子郵件"},
+            "username": {
+                "help_text": "帳號（用於系統登入）",
+                "validators": [UnicodeUsernameValidator()],
+            },
+            "email": {
+                "required": True,
+                "allow_blank": False,
+                "help_text": "電子郵件",
+                "validators": [],
+            },
         }
     
-    def validate_email(self, value):
-        """驗證 email 是否已存在"""
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("此電子郵件已被使用")
-        return value
-    
-    def validate_username(self, value):
-        """驗證 username 是否已存在"""
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError("此帳號已被使用")
-        return value
-    
     def validate(self, attrs):
         """驗證密碼確認是否一致，以及 role 限制"""
         password = attrs.get("password")
@@ -77,15 +78,35 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         return attrs
     
     def create(self, validated_data):
-        """建立使用者，密碼會自動加密"""
+        """
+        建立使用者與點數錢包
+        
+        密碼先在交易外雜湊（不在交易中佔用連線），
+        再於同一個交易中 INSERT User 與 UserPoints（由 post_save signal 建立）。
+        帳號或 email 重複時違反唯一約束，回傳與欄位驗證相同格式的錯誤。
+        """
         # 移除 password_confirm（不需要儲存）
         validated_data.pop("password_confirm", None)
         
-        # 使用 create_user 方法，密碼會自動加密
         password = validated_data.pop("password")
-        user = User.objects.create_user(
-            password=password,
-            **validated_data
-        )
+        validated_data["username"] = User.normalize_username(validated_data["username"])
+        validated_data["email"] = User.objects.normalize_email(validated_data["email"])
+        user = User(**validated_data)
+        user.set_password(password)
+        
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+        except IntegrityError:
+            raise serializers.ValidationError(self._get_conflicts(validated_data))
         
         return user
+    
+    def _get_conflicts(self, validated_data):
+        """INSERT 失敗後查詢是哪個欄位重複"""
+        errors = {}
+        if User.objects.filter(username=validated_data["username"]).exists():
+            errors["username"] = "此帳號已被使用"
+        if User.objects.filter(email=validated_data["email"]).exists():
+            errors["email"] = "此電子郵件已被使用"
+        return errors or {"non_field_errors": "註冊失敗，請稍後再試"}
@@ -0,0 +1,58 @@
+"""
+密碼雜湊執行池
+
+PBKDF2 每次需要數十到數百毫秒的 CPU，登入尖峰時若每個請求都直接雜湊，
+會佔滿 worker 讓其他 API 一起變慢。所有密碼雜湊改在固定大小的執行緒池中進行：
+
+- PASSWORD_HASH_WORKERS：同時雜湊的數量上限（每個行程），限制登入 / 註冊佔用的 CPU
+- PASSWORD_HASH_MAX_PENDING：可排隊等待的數量，超過時等待 PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS 秒
+  仍無空位即回傳 503（Retry-After），不讓請求無限堆積
+
+請求執行緒會等待雜湊結果，因此執行池只在每個行程有多個請求執行緒時才有效果：
+- gunicorn 需使用 gthread（entrypoint.sh），且 GUNICORN_THREADS 大於 WORKERS + MAX_PENDING，
+  登入尖峰時最多佔用 WORKERS + MAX_PENDING 個執行緒，其餘執行緒繼續處理其他 API
+  （hashlib.pbkdf2_hmac 執行時會釋放 GIL）
+- sync worker（每個行程一個執行緒）下名額永遠不會用完，無法限制登入尖峰
+- uvicorn（ASGI）下同步 view（登入、註冊）在每個行程同一個執行緒中依序執行，雜湊也只能依序進行，
+  登入吞吐量以 gunicorn gthread 部署為準
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from utils.exceptions import PasswordHashingBusyException
+
+
+class PasswordHashingService:
+    """密碼雜湊執行池服務類別"""
+
+    _lock = threading.Lock()
+    _executor = None
+    _slots = None
+
+    @classmethod
+    def _get_pool(cls):
+        """取得執行緒池與排隊名額（第一次使用時建立）"""
+        with cls._lock:
+            if cls._executor is None:
+                workers = settings.PASSWORD_HASH_WORKERS
+                cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+                cls._slots = threading.BoundedSemaphore(workers + settings.PASSWORD_HASH_MAX_PENDING)
+            return cls._executor, cls._slots
+
+    @classmethod
+    def run(cls, func, *args, **kwargs):
+        """
+        在執行池中執行雜湊並等待結果
+
+        Raises:
+            PasswordHashingBusyException: 排隊已滿且等待逾時
+        """
+        executor, slots = cls._get_pool()
+        if not slots.acquire(timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS):
+            raise PasswordHashingBusyException()
+        try:
+            return executor.submit(func, *args, **kwargs).result()
+        finally:
+            slots.release()
@@ -90,7 +90,7 @@ class SeedDataService:
 
                 # 驗證 UserPoints 是否自動建立（Signal 應該會自動觸發）
                 # 由於 Signal 是同步執行，create_user 返回後應該已經建立
-                user_points, created = UserPoints.objects.get_or_create(
+                user_points, created = UserPoints.objects.for_user(user.id).get_or_create(
                     user=user,
                     defaults={
                         "balance": 0,
@@ -0,0 +1,125 @@
+"""
+Refresh Token 黑名單服務
+
+已撤銷的 jti 保存在 revoked_tokens 資料表，每個行程另外維護一個 Bloom filter：
+- 檢查：Bloom filter 判斷不存在時直接放行，不查詢資料庫；判斷可能存在時才查詢資料庫確認
+- 撤銷：直接 INSERT，jti 為主鍵，重複撤銷（同一個 Refresh Token 被使用兩次）會違反唯一約束而失敗，
+  因此刷新 Token 時不需要先查詢，也不會因為其他 worker 的 Bloom filter 尚未同步而重複使用
+- 同步：每 JWT_BLACKLIST_SYNC_SECONDS 秒載入其他行程新撤銷的 jti；
+  項目數超過容量時以較大的容量重新載入（只載入尚未到期的 jti）
+
+刷新 Token 的成本固定為一次 INSERT，不隨黑名單筆數增加；
+未撤銷的 token 在 Bloom filter 判斷後即放行，黑名單變大也不會增加查詢。
+"""
+
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from apps.users.models import RevokedToken
+from utils.bloom_filter import BloomFilter
+
+# 增量同步時往前多讀取的時間，涵蓋交易提交延遲與伺服器時間誤差
+SYNC_OVERLAP = timedelta(seconds=60)
+LOAD_CHUNK_SIZE = 10000
+
+
+class TokenBlacklistService:
+    """Refresh Token 黑名單服務類別"""
+
+    _lock = threading.Lock()
+    _filter = None
+    _synced_at = None
+    _checked_at = 0.0
+
+    @staticmethod
+    def _key(jti):
+        """jti 轉為 UUID（格式錯誤時拋出 ValueError）"""
+        return jti if isinstance(jti, uuid.UUID) else uuid.UUID(str(jti))
+
+    @classmethod
+    def _get_filter(cls):
+        """取得 Bloom filter，必要時載入或同步"""
+        with cls._lock:
+            now = time.monotonic()
+            if cls._filter is not None and now - cls._checked_at < settings.JWT_BLACKLIST_SYNC_SECONDS:
+                return cls._filter
+
+            started = timezone.now()
+            if cls._filter is None or cls._filter.is_full:
+                revoked = RevokedToken.objects.filter(expires_at__gt=started)
+                capacity = max(settings.JWT_BLACKLIST_BLOOM_CAPACITY, revoked.count() * 2)
+                bloom = BloomFilter(capacity, settings.JWT_BLACKLIST_BLOOM_ERROR_RATE)
+            else:
+                revoked = RevokedToken.objects.filter(revoked_at__gte=cls._synced_at - SYNC_OVERLAP)
+                bloom = cls._filter
+
+            for jti in revoked.values_list("jti", flat=True).iterator(chunk_size=LOAD_CHUNK_SIZE):
+                if jti.bytes not in bloom:
+                    bloom.add(jti.bytes)
+
+            cls._filter = bloom
+            cls._synced_at = started
+            cls._checked_at = now
+            return bloom
+
+    @classmethod
+    def is_revoked(cls, jti):
+        """
+        檢查 jti 是否已撤銷
+
+        Raises:
+            ValueError: jti 不是 UUID
+        """
+        key = cls._key(jti)
+        if key.bytes not in cls._get_filter():
+            return False
+        return RevokedToken.objects.filter(jti=key).exists()
+
+    @classmethod
+    def revoke(cls, jti, expires_at):
+        """
+        撤銷 jti
+
+        Returns:
+            bool: 撤銷成功回傳 True，已撤銷過回傳 False
+
+        Raises:
+            ValueError: jti 不是 UUID
+        """
+        key = cls._key(jti)
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=key, expires_at=expires_at)
+            revoked = True
+        except IntegrityError:
+            revoked = False
+
+        with cls._lock:
+            if cls._filter is not None and key.bytes not in cls._filter:
+                cls._filter.add(key.bytes)
+        return revoked
+
+    @classmethod
+    def purge_expired(cls, batch_size=LOAD_CHUNK_SIZE):
+        """
+        刪除已到期的撤銷紀錄（token 已過期，不需要再保存）
+
+        分批刪除，避免長時間鎖定資料表。
+
+        Returns:
+            int: 刪除筆數
+        """
+        now = timezone.now()
+        deleted = 0
+        while True:
+            jtis = list(
+                RevokedToken.objects.filter(expires_at__lte=now).values_list("jti", flat=True)[:batch_size]
+            )
+            if not jtis:
+                return deleted
+            deleted += RevokedToken.objects.filter(jti__in=jtis).delete()[0]
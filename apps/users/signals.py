@@ -1,5 +1,7 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from .authentication import user_cache
 from .models import User, UserPoints
 
 
@@ -8,13 +10,26 @@ def create_user_points(sender, instance, created, **kwargs):
     """
     當 User 建立時，自動建立對應的 UserPoints 紀錄
     
-    使用 get_or_create 避免重複建立，確保每個 User 都有唯一的點數錢包。
+    User 剛建立時不可能已有錢包，直接 INSERT（user 的唯一約束保證每個 User 只有一個點數錢包）。
+    與 User 在同一個交易中建立，註冊失敗時一起回滾。
+    啟用分片時錢包建立在使用者所屬的分片（不在 User 的交易中，註冊失敗時僅留下不會被使用的錢包）。
     """
     if created:
-        UserPoints.objects.get_or_create(
+        UserPoints.objects.for_user(instance.pk).create(
             user=instance,
-            defaults={
-                "balance": 0,
-                "is_locked": False,
-            }
+            balance=0,
+            is_locked=False,
         )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    User 異動後使 JWT 認證的使用者快取失效
+
+    立即失效一次，並於交易提交後再失效一次（避免提交前其他請求重新載入舊資料）。
+    """
+    user_id = instance.pk
+    user_cache.invalidate(user_id)
+    transaction.on_commit(lambda: user_cache.invalidate(user_id))
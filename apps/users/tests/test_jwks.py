@@ -0,0 +1,129 @@
+import tempfile
+from io import StringIO
+
+import jwt
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt import state
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices
+from apps.users.token_backend import (
+    KeySetTokenBackend,
+    LazyTokenBackend,
+    install_token_backend,
+    load_key_set,
+)
+
+User = get_user_model()
+
+
+class AsymmetricJWTTestCase(APITestCase):
+    """
+    非對稱 JWT 簽章測試
+
+    測試 RS256 / EdDSA 簽章、以 JWKS 在本地驗證、金鑰輪替與 JWKS 端點
+    """
+
+    def setUp(self):
+        """建立會員與暫存金鑰目錄"""
+        self.member = User.objects.create_user(
+            username="member_jwks",
+            email="member_jwks@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+        self.keys_dir = tempfile.mkdtemp()
+
+    def _generate_key(self, kid, algorithm="RS256"):
+        with override_settings(JWT_KEYS_DIR=self.keys_dir):
+            call_command("generate_jwt_key", kid=kid, algorithm=algorithm, stdout=StringIO())
+
+    def _install(self, active_kid, algorithm="RS256", legacy_backend=None):
+        backend = KeySetTokenBackend(
+            algorithm,
+            load_key_set(self.keys_dir, algorithm),
+            active_kid,
+            legacy_backend=legacy_backend,
+        )
+        previous = install_token_backend(backend)
+        self.addCleanup(install_token_backend, previous)
+        return backend
+
+    def test_rs256_token_verifiable_with_jwks(self):
+        """測試 RS256 token 帶 kid，可用 JWKS 端點的公鑰在本地驗證，且 API 認證正常"""
+        self._generate_key("k1")
+        self._install("k1")
+
+        response = self.client.post(
+            "/api/auth/token/", {"username": "member_jwks", "password": "testpass123"}, format="json"
+        )
+        access = response.data["access"]
+        self.assertEqual(jwt.get_unverified_header(access)["kid"], "k1")
+
+        jwks_response = self.client.get("/api/auth/jwks/")
+        self.assertEqual(jwks_response.status_code, status.HTTP_200_OK)
+        self.assertIn("max-age=", jwks_response["Cache-Control"])
+        jwk = next(key for key in jwks_response.data["keys"] if key["kid"] == "k1")
+        payload = jwt.decode(access, jwt.PyJWK(jwk).key, algorithms=["RS256"])
+        self.assertEqual(payload["user_id"], self.member.id)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(self.client.get("/api/users/me/").status_code, status.HTTP_200_OK)
+
+    def test_key_rotation(self):
+        """測試輪替後舊 kid 的 token 仍有效、未知 kid 無效，舊 HS256 token 依設定接受"""
+        legacy_token = str(RefreshToken.for_user(self.member).access_token)
+        self._generate_key("old")
+        self._generate_key("new")
+
+        self._install("old", legacy_backend=state.token_backend)
+        old_token = str(RefreshToken.for_user(self.member).access_token)
+        self._install("new")
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {old_token}")
+        self.assertEqual(self.client.get("/api/users/me/").status_code, status.HTTP_200_OK)
+
+        forged = jwt.encode({"user_id": self.member.id}, "secret", algorithm="HS256", headers={"kid": "unknown"})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {forged}")
+        self.assertEqual(self.client.get("/api/users/me/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # 未設定 legacy_backend 時不接受舊的 HS256 token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {legacy_token}")
+        self.assertEqual(self.client.get("/api/users/me/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_eddsa_round_trip(self):
+        """測試 EdDSA 簽章與驗證"""
+        self._generate_key("ed1", algorithm="EdDSA")
+        backend = self._install("ed1", algorithm="EdDSA")
+
+        token = backend.encode({"user_id": self.member.id})
+
+        self.assertEqual(backend.decode(token)["user_id"], self.member.id)
+        self.assertEqual(backend.get_jwks()["keys"][0]["crv"], "Ed25519")
+
+    def test_jwks_empty_for_symmetric_signing(self):
+        """測試 HS256 時 JWKS 不發布任何金鑰"""
+        response = self.client.get("/api/auth/jwks/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"keys": []})
+
+    def test_bootstrap_without_keys(self):
+        """測試設定非對稱簽章但金鑰尚未建立時，app 仍可載入並以 generate_jwt_key 建立金鑰"""
+        previous = state.token_backend
+        self.addCleanup(install_token_backend, previous)
+
+        with override_settings(JWT_ALGORITHM="RS256", JWT_KEYS_DIR=self.keys_dir, JWT_ACTIVE_KID="k1"):
+            apps.get_app_config("users").ready()
+            self.assertIsInstance(state.token_backend, LazyTokenBackend)
+
+            call_command("generate_jwt_key", kid="k1", stdout=StringIO())
+
+            token = RefreshToken.for_user(self.member).access_token
+            self.assertEqual(jwt.get_unverified_header(str(token))["kid"], "k1")
+            response = self.client.get("/api/auth/jwks/")
+            self.assertEqual(response.data["keys"][0]["kid"], "k1")
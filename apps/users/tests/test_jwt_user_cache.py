@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.authentication import CachedJWTAuthentication, user_cache
+from apps.users.models import RoleChoices
+from config.middlewares import CurrentUserMiddleware
+from utils.ttl_cache import TTLCache
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTestCase(APITestCase):
+    """
+    JWT 認證使用者快取測試
+
+    測試快取命中時不查詢使用者、User 儲存後快取失效、與 get_current_user() 共用認證結果，
+    以及 TTL 快取的過期與容量上限
+    """
+
+    def setUp(self):
+        """建立會員並清空快取"""
+        user_cache.clear()
+
+        self.member = User.objects.create_user(
+            username="member_jwt_cache",
+            email="member_jwt_cache@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+
+        self.url = "/api/points/exchanges/stats/"
+
+    def _authenticate(self, user):
+        """設定認證用戶"""
+        token = str(RefreshToken.for_user(user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def _user_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/points/exchanges/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        table = User._meta.db_table
+        return [query for query in context.captured_queries if f'FROM "{table}"' in query["sql"]]
+
+    def test_cached_user_skips_query(self):
+        """測試第二個請求由快取取得使用者，少一次 users 查詢"""
+        self._authenticate(self.member)
+
+        first = self._user_queries()
+        second = self._user_queries()
+
+        self.assertEqual(len(second), len(first) - 1)
+
+    def test_user_save_invalidates_cache(self):
+        """測試變更角色、停用帳號後，下一個請求即套用新的使用者資料"""
+        self._authenticate(self.member)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.member.role = RoleChoices.STORE
+        self.member.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        self.member.is_active = False
+        self.member.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_current_user_shares_drf_authentication(self):
+        """測試 get_current_user() 與 DRF 認證共用同一次 JWT 解析與使用者查詢"""
+        token = str(RefreshToken.for_user(self.member).access_token)
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        def view(http_request):
+            drf_user, _ = CachedJWTAuthentication().authenticate(Request(http_request))
+            return drf_user, CurrentUserMiddleware.get_current_user()
+
+        with CaptureQueriesContext(connection) as context:
+            drf_user, current_user = CurrentUserMiddleware(view)(request)
+
+        self.assertIs(drf_user, current_user)
+        self.assertEqual(current_user.id, self.member.id)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertIsNone(CurrentUserMiddleware.get_current_user())
+
+    def test_ttl_cache_expiry_and_maxsize(self):
+        """測試 TTL 快取過期、超過容量淘汰最久未使用的項目，以及 generation 防止寫入舊資料"""
+        now = [0.0]
+        cache = TTLCache(maxsize=2, ttl=10, timer=lambda: now[0])
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+        now[0] = 10.0
+        self.assertIsNone(cache.get("a"))
+
+        generation = cache.generation
+        cache.invalidate("d")
+        cache.set("d", 4, generation=generation)
+        self.assertIsNone(cache.get("d"))
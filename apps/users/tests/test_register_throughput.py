@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.users.models import RoleChoices, UserPoints
+from apps.users.services.password_hashing_service import PasswordHashingService
+
+User = get_user_model()
+
+
+class RegisterThroughputTestCase(APITestCase):
+    """
+    註冊與密碼雜湊執行池測試
+
+    測試註冊以唯一約束判斷重複、同一交易建立錢包，以及雜湊執行池已滿時回傳 503
+    """
+
+    def setUp(self):
+        """建立既有會員"""
+        self.member = User.objects.create_user(
+            username="member_existing",
+            email="member_existing@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+        self.url = "/api/auth/register/"
+
+    def _register(self, username, email):
+        return self.client.post(
+            self.url,
+            {
+                "username": username,
+                "email": email,
+                "password": "testpass123",
+                "password_confirm": "testpass123",
+            },
+            format="json",
+        )
+
+    def test_register_creates_wallet(self):
+        """測試註冊成功並建立點數錢包，不預先查詢帳號與 email"""
+        with self.assertNumQueries(4):  # SAVEPOINT、INSERT users、INSERT user_points、RELEASE
+            response = self._register("member_new", "member_new@test.com")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(UserPoints.objects.get(user_id=response.data["user"]["id"]).balance, 0)
+
+    def test_register_duplicate_username_and_email(self):
+        """測試帳號或 email 重複時回傳 400，且不會留下使用者或錢包"""
+        duplicate_username = self._register("member_existing", "other@test.com")
+        duplicate_email = self._register("member_other", "member_existing@test.com")
+
+        self.assertEqual(duplicate_username.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("此帳號已被使用", str(duplicate_username.data))
+        self.assertEqual(duplicate_email.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("此電子郵件已被使用", str(duplicate_email.data))
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(UserPoints.objects.count(), 1)
+
+    @override_settings(PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS=0)
+    def test_login_returns_503_when_hashing_pool_is_full(self):
+        """測試雜湊執行池已滿時登入回傳 503 與 Retry-After"""
+        # 5xx 回應會送出 got_request_exception，測試用 client 預設會重新拋出
+        self.client.raise_request_exception = False
+        _executor, slots = PasswordHashingService._get_pool()
+        acquired = 0
+        while slots.acquire(blocking=False):
+            acquired += 1
+        try:
+            response = self.client.post(
+                "/api/auth/token/", {"username": "member_existing", "password": "testpass123"}, format="json"
+            )
+        finally:
+            for _index in range(acquired):
+                slots.release()
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "1")
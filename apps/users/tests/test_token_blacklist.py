@@ -0,0 +1,96 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.users.models import RoleChoices, RevokedToken
+from apps.users.services.token_blacklist_service import TokenBlacklistService
+from utils.bloom_filter import BloomFilter
+
+User = get_user_model()
+
+
+class TokenBlacklistTestCase(APITestCase):
+    """
+    Refresh Token 黑名單測試
+
+    測試輪替後舊 Refresh Token 失效、登出、Bloom filter 略過資料庫查詢與過期紀錄清除
+    """
+
+    def setUp(self):
+        """建立會員並登入"""
+        self.member = User.objects.create_user(
+            username="member_blacklist",
+            email="member_blacklist@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+        response = self.client.post(
+            "/api/auth/token/", {"username": "member_blacklist", "password": "testpass123"}, format="json"
+        )
+        self.refresh = response.data["refresh"]
+
+    def _refresh(self, token):
+        return self.client.post("/api/auth/token/refresh/", {"refresh": token}, format="json")
+
+    def test_rotated_refresh_token_cannot_be_reused(self):
+        """測試刷新後舊的 Refresh Token 無法再使用，新的可以"""
+        first = self._refresh(self.refresh)
+        reused = self._refresh(self.refresh)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(reused.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self._refresh(first.data["refresh"]).status_code, status.HTTP_200_OK)
+
+        verify = self.client.post("/api/auth/token/verify/", {"token": self.refresh}, format="json")
+        self.assertEqual(verify.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reuse_rejected_when_bloom_filter_is_stale(self):
+        """測試其他 worker 已撤銷（本行程 Bloom filter 尚未同步）時，仍因唯一約束拒絕重複使用"""
+        self.assertEqual(self._refresh(self.refresh).status_code, status.HTTP_200_OK)
+
+        with mock.patch.object(TokenBlacklistService, "is_revoked", return_value=False):
+            reused = self._refresh(self.refresh)
+
+        self.assertEqual(reused.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout(self):
+        """測試登出後 Refresh Token 無法刷新"""
+        response = self.client.post("/api/auth/token/blacklist/", {"refresh": self.refresh}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._refresh(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unrevoked_token_skips_database_lookup(self):
+        """測試 Bloom filter 判斷未撤銷時不查詢 revoked_tokens"""
+        TokenBlacklistService.is_revoked("00000000000000000000000000000000")
+
+        with self.assertNumQueries(0):
+            self.assertFalse(TokenBlacklistService.is_revoked("11111111111111111111111111111111"))
+
+    def test_purge_expired(self):
+        """測試只刪除已到期的撤銷紀錄"""
+        now = timezone.now()
+        TokenBlacklistService.revoke("22222222222222222222222222222222", now - timedelta(days=1))
+        TokenBlacklistService.revoke("33333333333333333333333333333333", now + timedelta(days=1))
+
+        call_command("purge_revoked_tokens", stdout=StringIO())
+
+        self.assertEqual(
+            list(RevokedToken.objects.values_list("jti", flat=True)),
+            [TokenBlacklistService._key("33333333333333333333333333333333")],
+        )
+
+    def test_bloom_filter(self):
+        """測試 Bloom filter 沒有漏判，誤判率接近設定值"""
+        bloom = BloomFilter(1000, 0.01)
+        for index in range(1000):
+            bloom.add(f"in-{index}")
+
+        self.assertTrue(all(f"in-{index}" in bloom for index in range(1000)))
+        false_positives = sum(f"out-{index}" in bloom for index in range(10000))
+        self.assertLess(false_positives, 300)
@@ -0,0 +1,206 @@
+"""
+JWT 非對稱簽章（RS256 / EdDSA）與金鑰輪替
+
+設定 JWT_ALGORITHM 為 RS256 或 EdDSA 後，token 改以私鑰簽章並在 header 帶入 kid，
+其他服務可從 /api/auth/jwks/ 取得公鑰在本地驗證，不需要呼叫 token verify API。
+
+金鑰放在 JWT_KEYS_DIR，每個檔案為一把 PEM 金鑰，檔名（去掉 .pem / .pub.pem）即為 kid：
+- JWT_ACTIVE_KID 指定的私鑰用於簽章
+- 目錄中的所有金鑰都可用於驗證，且公鑰都會發布於 JWKS
+
+輪替流程：
+1. 新增金鑰檔（python manage.py generate_jwt_key --kid <新 kid>），等待 JWKS 快取過期，讓其他服務先取得新公鑰
+2. 將 JWT_ACTIVE_KID 改為新 kid
+3. 舊 token（包含 Refresh Token）全部過期後，刪除舊金鑰檔（或只保留 .pub.pem 公鑰）
+"""
+
+import threading
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+from rest_framework_simplejwt import state
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+
+ASYMMETRIC_ALGORITHMS = {
+    "RS256": (rsa.RSAPrivateKey, rsa.RSAPublicKey, RSAAlgorithm),
+    "EdDSA": (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey, OKPAlgorithm),
+}
+
+
+def load_key_set(keys_dir, algorithm):
+    """
+    讀取金鑰目錄
+
+    Returns:
+        dict: {kid: (private_key | None, public_key)}
+    """
+    private_type, public_type = ASYMMETRIC_ALGORITHMS[algorithm][:2]
+    keys = {}
+    for path in sorted(Path(keys_dir).glob("*.pem")):
+        kid = path.name.removesuffix(".pem").removesuffix(".pub")
+        data = path.read_bytes()
+        if b"PRIVATE KEY" in data:
+            private_key = serialization.load_pem_private_key(data, password=None)
+            public_key = private_key.public_key()
+        else:
+            private_key = None
+            public_key = serialization.load_pem_public_key(data)
+
+        if not isinstance(public_key, public_type) or (
+            private_key is not None and not isinstance(private_key, private_type)
+        ):
+            raise ValueError(f"金鑰 {path.name} 不是 {algorithm} 可用的金鑰")
+        if kid in keys and keys[kid][0] is not None:
+            continue
+        keys[kid] = (private_key, public_key)
+    return keys
+
+
+class KeySetTokenBackend(TokenBackend):
+    """
+    以 kid 選擇金鑰的 TokenBackend
+
+    - 簽章：使用 active_kid 的私鑰，並在 header 帶入 kid
+    - 驗證：依 token header 的 kid 選擇公鑰，未知的 kid 視為無效
+    - legacy_backend：不帶 kid 的 token 交由舊的（HS256）backend 驗證，供切換期間使用
+    """
+
+    def __init__(self, algorithm, keys, active_kid, legacy_backend=None, **kwargs):
+        super().__init__(algorithm, **kwargs)
+        if active_kid not in keys or keys[active_kid][0] is None:
+            raise TokenBackendError(
+                _("JWT_ACTIVE_KID 必須對應到 JWT_KEYS_DIR 中的私鑰")
+            )
+        self.keys = keys
+        self.active_kid = active_kid
+        self.signing_key = keys[active_kid][0]
+        self.legacy_backend = legacy_backend
+
+    def _validate_algorithm(self, algorithm):
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise TokenBackendError(_("Unrecognized algorithm type '{}'").format(algorithm))
+
+    @staticmethod
+    def _get_kid(token):
+        try:
+            return jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError as ex:
+            raise TokenBackendError(_("Token is invalid or expired")) from ex
+
+    def get_verifying_key(self, token):
+        kid = self._get_kid(token)
+        if kid not in self.keys:
+            raise TokenBackendError(_("Token is invalid or expired"))
+        return self.keys[kid][1]
+
+    def encode(self, payload):
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload["aud"] = self.audience
+        if self.issuer is not None:
+            jwt_payload["iss"] = self.issuer
+
+        return jwt.encode(
+            jwt_payload,
+            self.signing_key,
+            algorithm=self.algorithm,
+            headers={"kid": self.active_kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify=True):
+        if self.legacy_backend is not None and self._get_kid(token) is None:
+            return self.legacy_backend.decode(token, verify=verify)
+        return super().decode(token, verify=verify)
+
+    def get_jwks(self):
+        """產生 JWKS（所有公鑰）"""
+        algorithm_class = ASYMMETRIC_ALGORITHMS[self.algorithm][2]
+        jwks = []
+        for kid, (private_key, public_key) in self.keys.items():
+            jwk = algorithm_class.to_jwk(public_key, as_dict=True)
+            jwk.update({"kid": kid, "alg": self.algorithm, "use": "sig"})
+            jwks.append(jwk)
+        return {"keys": jwks}
+
+
+def build_token_backend(legacy_backend=None):
+    """
+    依設定建立 KeySetTokenBackend（JWT_ALGORITHM 為對稱式時回傳 None）
+
+    Args:
+        legacy_backend: JWT_ACCEPT_LEGACY_HS256 時驗證不帶 kid 的 token 的 backend（預設為目前的 backend）
+    """
+    if settings.JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return None
+
+    if legacy_backend is None:
+        legacy_backend = state.token_backend
+
+    return KeySetTokenBackend(
+        settings.JWT_ALGORITHM,
+        load_key_set(settings.JWT_KEYS_DIR, settings.JWT_ALGORITHM),
+        settings.JWT_ACTIVE_KID,
+        legacy_backend=legacy_backend if settings.JWT_ACCEPT_LEGACY_HS256 else None,
+        audience=api_settings.AUDIENCE,
+        issuer=api_settings.ISSUER,
+        leeway=api_settings.LEEWAY,
+        json_encoder=api_settings.JSON_ENCODER,
+    )
+
+
+class LazyTokenBackend:
+    """
+    第一次簽章 / 驗證時才建立 backend
+
+    app 載入時（UsersConfig.ready）金鑰可能尚未建立（例如首次部署時執行 generate_jwt_key、migrate），
+    延後到實際使用 token 時才讀取金鑰；金鑰仍不存在時於當次請求拋出 TokenBackendError，下次重試。
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._backend = None
+        self._lock = threading.Lock()
+
+    def get_backend(self):
+        """取得（或建立）實際的 backend"""
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._factory()
+        return self._backend
+
+    def __getattr__(self, name):
+        return getattr(self.get_backend(), name)
+
+
+def install_token_backend(backend):
+    """
+    設定 simplejwt 使用的 TokenBackend
+
+    simplejwt 的 Token 每次都從 rest_framework_simplejwt.state.token_backend 取得 backend，
+    替換後所有 token 類別（Access / Refresh / Untyped）都會使用新的 backend。
+
+    Returns:
+        TokenBackend: 原本的 backend
+    """
+    previous = state.token_backend
+    state.token_backend = backend
+    return previous
+
+
+def get_jwks():
+    """取得目前發布的 JWKS（對稱式簽章不發布任何金鑰）"""
+    backend = state.token_backend
+    if isinstance(backend, LazyTokenBackend):
+        backend = backend.get_backend()
+    if isinstance(backend, KeySetTokenBackend):
+        return backend.get_jwks()
+    return {"keys": []}
@@ -0,0 +1,47 @@
+"""
+可撤銷的 Refresh Token
+
+取代 rest_framework_simplejwt.token_blacklist（需要額外的 OutstandingToken 資料表，
+每次刷新都要寫入與查詢），改用 TokenBlacklistService 的 jti 黑名單與 Bloom filter。
+"""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from apps.users.services.token_blacklist_service import TokenBlacklistService
+
+
+class RevocableRefreshToken(RefreshToken):
+    """驗證時檢查黑名單，並可撤銷的 Refresh Token"""
+
+    def verify(self):
+        """驗證簽章與到期時間後，再檢查是否已撤銷"""
+        super().verify()
+        self.check_blacklist()
+
+    def check_blacklist(self):
+        """已撤銷時拋出 TokenError"""
+        try:
+            revoked = TokenBlacklistService.is_revoked(self.payload[api_settings.JTI_CLAIM])
+        except ValueError:
+            raise TokenError(_("Token is invalid or expired"))
+        if revoked:
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """
+        撤銷此 token
+
+        同一個 token 已被撤銷（例如被重複用於刷新）時拋出 TokenError。
+        """
+        try:
+            revoked = TokenBlacklistService.revoke(
+                self.payload[api_settings.JTI_CLAIM],
+                datetime_from_epoch(self.payload["exp"]),
+            )
+        except ValueError:
+            raise TokenError(_("Token is invalid or expired"))
+        if not revoked:
+            raise TokenError(_("Token is blacklisted"))
@@ -5,6 +5,8 @@ from apps.users.views import (
     CustomTokenObtainPairView,
     CustomTokenRefreshView,
     CustomTokenVerifyView,
+    CustomTokenBlacklistView,
+    JWKSView,
 )
 
 app_name = "users"
@@ -16,6 +18,9 @@ urlpatterns = [
     path("auth/token/", CustomTokenObtainPairView.as_view(), name="token-obtain-pair"),
     path("auth/token/refresh/", CustomTokenRefreshView.as_view(), name="token-refresh"),
     path("auth/token/verify/", CustomTokenVerifyView.as_view(), name="token-verify"),
+    path("auth/token/blacklist/", CustomTokenBlacklistView.as_view(), name="token-blacklist"),
+    # JWT 公鑰（供其他服務在本地驗證 token）
+    path("auth/jwks/", JWKSView.as_view(), name="jwks"),
     # 使用者個人資料
     path("users/me/", MeView.as_view(), name="user-me"),
 ]
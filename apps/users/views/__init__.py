@@ -4,7 +4,9 @@ from .jwt_views import (
     CustomTokenObtainPairView,
     CustomTokenRefreshView,
     CustomTokenVerifyView,
+    CustomTokenBlacklistView,
 )
+from .jwks_view import JWKSView
 
 __all__ = [
     "UserRegisterView",
@@ -12,4 +14,6 @@ __all__ = [
     "CustomTokenObtainPairView",
     "CustomTokenRefreshView",
     "CustomTokenVerifyView",
+    "CustomTokenBlacklistView",
+    "JWKSView",
 ]
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_spectacular.utils import extend_schema
+from apps.users.token_backend import get_jwks
+
+
+@extend_schema(
+    tags=["使用者認證"],
+    summary="取得 JWT 公鑰（JWKS）",
+    description="""
+    發布 JWT 驗證用的公鑰（JSON Web Key Set），供其他服務在本地驗證 Access Token，
+    不需要每個請求都呼叫 token verify API。
+    
+    - 使用非對稱簽章（RS256 / EdDSA）時，回傳所有可用於驗證的公鑰，token header 的 kid 對應 JWK 的 kid
+    - 使用 HS256 時不發布任何金鑰（keys 為空陣列）
+    - 回應可快取（Cache-Control: public, max-age），遇到未知的 kid 時再重新取得
+    """,
+)
+class JWKSView(APIView):
+    """JWT 公鑰（JWKS）View"""
+    
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        """取得 JWKS"""
+        response = Response(get_jwks())
+        patch_cache_control(response, public=True, max_age=settings.JWT_JWKS_MAX_AGE_SECONDS)
+        return response
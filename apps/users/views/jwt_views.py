@@ -5,6 +5,7 @@ JWT 認證相關 View
 """
 
 from rest_framework_simplejwt.views import (
+    TokenBlacklistView,
     TokenObtainPairView,
     TokenRefreshView,
     TokenVerifyView,
@@ -200,6 +201,7 @@ class CustomTokenRefreshView(TokenRefreshView):
     
     **注意事項**：
     - 可以驗證 Access Token 或 Refresh Token
+    - 已撤銷（已輪替或已登出）的 Refresh Token 視為無效
     - 有效時返回空物件 `{}`
     - 無效時返回錯誤訊息
     """,
@@ -265,3 +267,56 @@ class CustomTokenVerifyView(TokenVerifyView):
     繼承 TokenVerifyView，添加詳細的 API 文件說明。
     檢查 Token 是否有效（未過期、格式正確）。
     """
+
+
+@extend_schema(
+    tags=["使用者認證"],
+    summary="登出（撤銷 Refresh Token）",
+    description="""
+    撤銷 Refresh Token，之後無法再用它刷新 Token。
+    
+    **注意事項**：
+    - 已發出的 Access Token 在到期前（1 小時）仍然有效
+    - 已撤銷的 Refresh Token 再次登出會返回 401
+    """,
+    request={
+        "application/json": {
+            "type": "object",
+            "properties": {
+                "refresh": {
+                    "type": "string",
+                    "description": "要撤銷的 Refresh Token",
+                    "example": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
+                },
+            },
+            "required": ["refresh"],
+        }
+    },
+    responses={
+        200: {
+            "description": "撤銷成功",
+            "content": {
+                "application/json": {
+                    "example": {},
+                }
+            },
+        },
+        401: {
+            "description": "Refresh Token 無效、已過期或已撤銷",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Token is blacklisted",
+                    }
+                }
+            },
+        },
+    },
+)
+class CustomTokenBlacklistView(TokenBlacklistView):
+    """
+    自訂登出 View
+    
+    繼承 TokenBlacklistView，添加詳細的 API 文件說明。
+    將 Refresh Token 加入黑名單。
+    """
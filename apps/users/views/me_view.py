@@ -1,8 +1,12 @@
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
 from django.contrib.auth import get_user_model
+from apps.users.models import UserPoints
 from apps.users.serializers import MeSerializer
+from core.db.sharding import sharding_enabled
+from utils.views import AsyncDispatchMixin
 
 User = get_user_model()
 
@@ -12,14 +16,16 @@ User = get_user_model()
     summary="查詢當前登入用戶個人資料",
     description="查詢當前登入用戶的基本資訊和點數餘額，僅限已登入用戶存取",
 )
-class MeView(RetrieveAPIView):
+class MeView(AsyncDispatchMixin, RetrieveAPIView):
     """
     當前登入用戶個人資料查詢 View
     
     提供當前登入用戶的基本資訊（username, email, role）和點數餘額。
     使用 select_related("points") 優化查詢，避免 N+1 問題。
+    ASGI 模式下使用 async 版本（aget）。
     """
     
+    async_handlers = {"get": "aget"}
     permission_classes = [IsAuthenticated]
     serializer_class = MeSerializer
     
@@ -28,5 +34,20 @@ class MeView(RetrieveAPIView):
         取得當前登入用戶
         
         使用 select_related("points") 優化查詢，確保一次查詢就取得 UserPoints 資料。
+        啟用分片時 UserPoints 不在主資料庫，改由 user.points 到使用者所屬的分片讀取。
         """
+        if sharding_enabled():
+            return User.objects.get(id=self.request.user.id)
         return User.objects.select_related("points").get(id=self.request.user.id)
+    
+    async def aget(self, request, *args, **kwargs):
+        """get() 的 async 版本，以 async ORM 查詢"""
+        user_id = self.request.user.id
+        if sharding_enabled():
+            user = await User.objects.aget(id=user_id)
+            user.points = await UserPoints.objects.for_user(user_id).aget(user_id=user_id)
+        else:
+            user = await User.objects.select_related("points").aget(id=user_id)
+        
+        serializer = self.get_serializer(user)
+        return Response(serializer.data)
@@ -28,8 +28,8 @@ class UserRegisterView(CreateAPIView):
         """
         建立使用者
         
-        使用 create_user 方法，密碼會自動加密。
-        註冊成功後會自動觸發 Signal 建立 UserPoints。
+        密碼加密後，於同一個交易中建立使用者與 UserPoints（Signal）。
+        帳號或 email 重複時由唯一約束判斷並回傳 400。
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -2,6 +2,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# ASGI 模式下讀取 API 使用 async view（見 utils.views.AsyncDispatchMixin）
+os.environ.setdefault("ASYNC_VIEWS_ENABLED", "true")
 
 application = get_asgi_application()
 
@@ -1,97 +1,388 @@
 import logging
-import jwt
+import random
+import re
+import time
+from contextvars import ContextVar
 from django.conf import settings
-from django.contrib.auth import get_user_model
+from django.contrib.auth import middleware as auth_middleware
 from django.contrib.auth.models import AbstractUser
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import csrf
 from django.http import HttpRequest, HttpResponse
-from django.utils.deprecation import MiddlewareMixin
-from threading import local
+from django.utils.functional import LazyObject, empty
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from typing import Optional
+from apps.users.authentication import get_request_user
+from apps.users.models import RoleChoices
+from core.db.instrumentation import track_queries
+from core.db.routers import choose_replica, is_pinned_to_primary, pin_to_primary, read_from
+from utils.metrics import Counter, request_latency
+from utils.request_timing import timed, track_request
 
 
-logger = logging.getLogger("django.db")
-_user = local()
+_REGEX_GROUP = re.compile(r"\(\?P<(\w+)>[^)]*\)")
 
+access_logger = logging.getLogger("access")
+budget_logger = logging.getLogger("query_budget")
 
-class LogApiEndpointMiddleware(MiddlewareMixin):
-    """記錄 API 端點的中間件"""
-    
-    def process_request(self, request):
-        logger.debug(f"API: {request.path}")
+query_budget_exceeded = Counter(
+    "query_budget_exceeded_total",
+    "查詢次數超過 view 宣告預算的請求數",
+    labels=("route",),
+)
+# 以 contextvars 保存，執行緒（gthread）與 async worker 皆各自獨立
+_current_request: ContextVar[Optional[HttpRequest]] = ContextVar("current_request", default=None)
+_current_user: ContextVar[Optional[AbstractUser]] = ContextVar("current_user", default=None)
+
+
+def is_api_request(request: HttpRequest) -> bool:
+    """是否為 API 請求（路徑以 API_PATH_PREFIX 開頭）"""
+    return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+
+def request_route(request: HttpRequest) -> str:
+    """
+    路由樣板（未符合任何路由時為 <unmatched>，避免路徑造成大量分組）
+
+    DRF router 的正規表示式路由轉為與 path() 相同的寫法，例如 ^exchanges/(?P<pk>[^/.]+)/$ -> exchanges/<pk>/
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None or match.route is None:
+        return "<unmatched>"
+    return _REGEX_GROUP.sub(r"<\1>", match.route).replace("^", "").replace("$", "")
+
+
+def request_role(request: HttpRequest) -> str:
+    """使用者身分；請求中未取用過的 session 使用者不另外查詢"""
+    user = getattr(request, "user", None)
+    if isinstance(user, LazyObject) and user._wrapped is empty:
+        return "anonymous"
+    return getattr(user, "role", None) or "anonymous"
+
+
+class SkipApiPathMixin:
+    """
+    API 請求略過此中間件
+
+    API 以 JWT 認證、無狀態，不需要 session、CSRF、messages 與 session 認證；
+    後台（/admin/）等其他路徑維持完整流程。
+    """
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(SkipApiPathMixin, sessions_middleware.SessionMiddleware):
+    """API 請求略過的 SessionMiddleware"""
+
+
+class CsrfViewMiddleware(SkipApiPathMixin, csrf.CsrfViewMiddleware):
+    """API 請求略過的 CsrfViewMiddleware"""
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if is_api_request(request):
+            return None
+        return super().process_view(request, view_func, view_args, view_kwargs)
+
+
+class AuthenticationMiddleware(SkipApiPathMixin, auth_middleware.AuthenticationMiddleware):
+    """API 請求略過的 AuthenticationMiddleware"""
+
+
+class MessageMiddleware(SkipApiPathMixin, messages_middleware.MessageMiddleware):
+    """API 請求略過的 MessageMiddleware"""
+
+
+class AccessLogMiddleware:
+    """
+    結構化存取日誌中間件
+
+    每個請求記錄路由樣板、狀態碼、處理時間、資料庫查詢次數與耗時、使用者身分，
+    寫入 "access" logger（設定為 BackgroundStreamHandler，由背景執行緒輸出，不阻塞請求）：
+    - 2xx 回應依 ACCESS_LOG_SAMPLE_RATE_2XX 抽樣記錄，其餘狀態碼全部記錄
+    - 每個請求（不論是否抽樣）都計入行程內的路由延遲直方圖（utils.metrics.request_latency）
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _record(self, request: HttpRequest, response: HttpResponse, duration: float, queries) -> None:
+        route = request_route(request)
+        request_latency.observe(duration, method=request.method, route=route)
+
+        if not settings.ACCESS_LOG_ENABLED:
+            return
+        status_code = response.status_code
+        if 200 <= status_code < 300 and random.random() >= settings.ACCESS_LOG_SAMPLE_RATE_2XX:
+            return
+
+        access_logger.info(
+            "%s %s %s",
+            request.method,
+            route,
+            status_code,
+            extra={
+                "fields": {
+                    "method": request.method,
+                    "route": route,
+                    "status": status_code,
+                    "duration_ms": round(duration * 1000, 2),
+                    "db_queries": queries.count,
+                    "db_ms": round(queries.duration * 1000, 2),
+                    "role": request_role(request),
+                }
+            },
+        )
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        with track_queries() as queries:
+            response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        with track_queries() as queries:
+            response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - start, queries)
+        return response
+
+
+class QueryBudgetExceeded(Exception):
+    """查詢次數超過 view 宣告的 query_budget（QUERY_BUDGET_STRICT=true 時拋出）"""
+
+
+class ServerTimingMiddleware:
+    """
+    Server-Timing 與查詢預算中間件
+
+    - 統計每個請求的資料庫查詢次數與時間、認證、serializer 與 render 的耗時（utils.request_timing），
+      以 Server-Timing 標頭回傳；標頭會透露內部耗時與查詢次數，僅在 SERVER_TIMING_ENABLED=true、
+      DEBUG 或 ADMIN 的請求時加上
+    - view 宣告 query_budget（整數，或 {action 或 method: 整數}）時，查詢次數超過預算寫入
+      "query_budget" logger 的警告並累計 query_budget_exceeded_total；
+      QUERY_BUDGET_STRICT=true（測試用）時改為拋出 QueryBudgetExceeded
+    """
+
+    PHASES = ("auth", "serialize", "render")
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def process_template_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        """在此 render 以計入 render 階段（之後 Django 不會重複 render）"""
+        with timed("render"):
+            response.render()
+        return response
+
+    @staticmethod
+    def _query_budget(request: HttpRequest) -> Optional[int]:
+        """view 宣告的查詢預算（未宣告時為 None）"""
+        match = getattr(request, "resolver_match", None)
+        view_class = getattr(getattr(match, "func", None), "cls", None)
+        budget = getattr(view_class, "query_budget", None)
+        if not isinstance(budget, dict):
+            return budget
+
+        actions = getattr(match.func, "actions", None) or {}
+        method = request.method.lower()
+        return budget.get(actions.get(method, method))
+
+    def _check_budget(self, request: HttpRequest, queries) -> None:
+        budget = self._query_budget(request)
+        if budget is None or queries.count <= budget:
+            return
+
+        route = request_route(request)
+        query_budget_exceeded.inc(route=route)
+        budget_logger.warning(
+            "查詢次數超過預算：%s %s（%s > %s）",
+            request.method,
+            route,
+            queries.count,
+            budget,
+            extra={
+                "fields": {
+                    "method": request.method,
+                    "route": route,
+                    "db_queries": queries.count,
+                    "query_budget": budget,
+                    "db_ms": round(queries.duration * 1000, 2),
+                }
+            },
+        )
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(
+                f"{request.method} {route}：{queries.count} 次查詢，超過預算 {budget}"
+            )
+
+    @staticmethod
+    def _header_allowed(request: HttpRequest) -> bool:
+        """是否回傳 Server-Timing 標頭"""
+        if settings.SERVER_TIMING_ENABLED or settings.DEBUG:
+            return True
+        return request_role(request) == RoleChoices.ADMIN
+
+    def _finalize(self, request: HttpRequest, response: HttpResponse, timings, duration: float) -> None:
+        if self._header_allowed(request):
+            queries = timings.queries
+            entries = [f'db;dur={queries.duration * 1000:.2f};desc="{queries.count} queries"']
+            entries.extend(
+                f"{phase};dur={timings.phases[phase] * 1000:.2f}"
+                for phase in self.PHASES
+                if phase in timings.phases
+            )
+            entries.append(f"total;dur={duration * 1000:.2f}")
+            response["Server-Timing"] = ", ".join(entries)
+
+        self._check_budget(request, timings.queries)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        with track_request() as timings:
+            response = self.get_response(request)
+        self._finalize(request, response, timings, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        with track_request() as timings:
+            response = await self.get_response(request)
+        self._finalize(request, response, timings, time.perf_counter() - start)
+        return response
 
 
 class CurrentUserMiddleware:
     """
     當前用戶中間件
-    從 JWT token 中解析用戶資訊，並提供線程本地儲存
+    保存當前請求，提供 get_current_user() 取得當前用戶
+    
+    JWT 不在此解析：get_current_user() 被呼叫時才解析，
+    並與 DRF 的 CachedJWTAuthentication 共用同一次解析結果（每個請求只解析、查詢一次）。
     
-    注意：目前專案中未使用此 middleware，保留供未來可能使用
-    （如：JWT 登入實作、操作日誌記錄等）
+    注意：目前專案中未使用 get_current_user()，保留供未來可能使用
+    （如：操作日誌記錄等）
     """
     
+    sync_capable = True
+    async_capable = True
+    
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request: HttpRequest) -> HttpResponse:
-        User = get_user_model()
-        authorization_header = request.headers.get("Authorization", "")
-        logger.debug(f"Authorization header: {authorization_header}")
-
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        
+        request_token = _current_request.set(request)
+        user_token = _current_user.set(None)
         try:
-            if not authorization_header:
-                logger.debug("No Authorization header found")
-                return self.get_response(request)
-
-            # Handle token with "token" prefix, "Basic" prefix, or no prefix
-            if authorization_header.startswith("token "):
-                access_token = authorization_header.split(" ")[1]
-                logger.debug("Token format: prefixed with 'token'")
-            elif authorization_header.startswith("Basic "):
-                access_token = authorization_header.split(" ")[1]
-                logger.debug("Token format: prefixed with 'Basic'")
-            elif authorization_header.startswith("Bearer "):
-                access_token = authorization_header.split(" ")[1]
-                logger.debug("Token format: prefixed with 'Bearer'")
-            else:
-                access_token = authorization_header
-                logger.debug("Token format: no prefix")
-
-            payload = jwt.decode(access_token, settings.SECRET_KEY, algorithms=["HS256"])
-
-            user_id = payload.get("user_id")
-            if not user_id:
-                logger.warning("No user_id in token payload")
-                return self.get_response(request)
-
-            user = User.objects.filter(id=user_id).first()
-            if user:
-                self.set_current_user(user)
-                logger.debug(f"User {user.id} authenticated successfully")
-            else:
-                logger.warning(f"User with id {user_id} not found")
-
-        except jwt.ExpiredSignatureError:
-            logger.warning("Token has expired")
-        except jwt.InvalidTokenError as e:
-            logger.warning(f"Invalid token: {str(e)}")
-        except Exception as e:
-            logger.error(f"Unexpected error in CurrentUserMiddleware: {str(e)}")
+            return self.get_response(request)
+        finally:
+            _current_user.reset(user_token)
+            _current_request.reset(request_token)
 
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        request_token = _current_request.set(request)
+        user_token = _current_user.set(None)
         try:
-            response = self.get_response(request)
-            return response
+            return await self.get_response(request)
         finally:
-            if hasattr(_user, "value"):
-                del _user.value
+            _current_user.reset(user_token)
+            _current_request.reset(request_token)
 
     @staticmethod
     def set_current_user(user: AbstractUser) -> None:
         """設置當前用戶"""
-        _user.value = user
+        _current_user.set(user)
 
     @staticmethod
     def get_current_user() -> Optional[AbstractUser]:
-        """取得當前用戶"""
-        return getattr(_user, "value", None)
+        """取得當前用戶（未登入或 JWT 無效時回傳 None）"""
+        user = _current_user.get()
+        if user is not None:
+            return user
+        
+        request = _current_request.get()
+        if request is None:
+            return None
+        return get_request_user(request)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    讀寫分離中間件（搭配 core.db.routers.PrimaryReplicaRouter）
+    
+    - 安全方法（GET / HEAD / OPTIONS）的請求選定一個唯讀副本，請求中的讀取使用此副本
+    - 寫入請求成功（狀態碼 < 400）後，將該使用者固定在主資料庫一段時間，
+      期間內的讀取請求也使用主資料庫，確保讀得到自己剛寫入的資料
+    
+    未設定唯讀副本時不做任何事。
+    """
+    
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _choose_database(self, request: HttpRequest) -> Optional[str]:
+        """選擇此請求讀取使用的副本（None 表示主資料庫）"""
+        if request.method not in self.SAFE_METHODS or not settings.DATABASE_REPLICAS:
+            return None
+        user = get_request_user(request)
+        if user is not None and is_pinned_to_primary(user.pk):
+            return None
+        return choose_replica()
+
+    def _record_write(self, request: HttpRequest, response: HttpResponse) -> None:
+        """寫入成功後將使用者固定在主資料庫"""
+        if request.method in self.SAFE_METHODS or not settings.DATABASE_REPLICAS:
+            return
+        if response.status_code >= 400:
+            return
+        user = get_request_user(request)
+        if user is not None:
+            pin_to_primary(user.pk)
 
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        
+        with read_from(self._choose_database(request)):
+            response = self.get_response(request)
+        self._record_write(request, response)
+        return response
 
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        alias = await sync_to_async(self._choose_database)(request)
+        with read_from(alias):
+            response = await self.get_response(request)
+        await sync_to_async(self._record_write)(request, response)
+        return response
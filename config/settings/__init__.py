@@ -1,4 +1,4 @@
 from .base import *
 from .db import *
+from .cache import *
 from .drf import *
-
@@ -58,18 +58,23 @@ INSTALLED_APPS = [
     "apps.payments",
 ]
 
+# API 路徑前綴：API 請求（JWT、無狀態）略過 session、CSRF、session 認證與 messages 中間件
+API_PATH_PREFIX = "/api/"
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "config.middlewares.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "config.middlewares.CsrfViewMiddleware",
+    "config.middlewares.AuthenticationMiddleware",
+    "config.middlewares.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     # Custom middlewares
-    "config.middlewares.LogApiEndpointMiddleware",
+    "config.middlewares.AccessLogMiddleware",
+    "config.middlewares.ServerTimingMiddleware",
     "config.middlewares.CurrentUserMiddleware",
+    "config.middlewares.ReplicaRoutingMiddleware",
 ]
 
 TEMPLATES = [
@@ -89,6 +94,64 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
+
+# 讀取 API（商品列表 / 詳情、MeView、交換序號查詢）使用 async view（ASGI 模式，以 config.asgi 啟動時預設開啟）
+ASYNC_VIEWS_ENABLED = os.getenv("ASYNC_VIEWS_ENABLED", "false").lower() == "true"
+
+# 存取日誌（"access" logger，背景執行緒輸出 JSON）：是否啟用、2xx 回應的抽樣比例（0 ~ 1）、queue 上限
+ACCESS_LOG_ENABLED = os.getenv("ACCESS_LOG_ENABLED", "true").lower() == "true"
+ACCESS_LOG_SAMPLE_RATE_2XX = float(os.getenv("ACCESS_LOG_SAMPLE_RATE_2XX", "1.0"))
+ACCESS_LOG_QUEUE_SIZE = int(os.getenv("ACCESS_LOG_QUEUE_SIZE", "10000"))
+
+# Server-Timing 標頭（資料庫、認證、serializer、render 耗時）是否對所有請求回傳
+# （false 時僅 DEBUG 或 ADMIN 的請求回傳，避免對外透露內部耗時與查詢次數）；
+# 查詢次數超過 view 的 query_budget 時拋出例外（測試用，預設僅寫入警告日誌）
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+
+# 指標（/metrics，Prometheus 文字格式）：多 worker 行程合併用的目錄（留空表示只輸出處理請求的行程）、
+# 各行程寫入目錄的間隔秒數、存取權杖（需帶 Authorization: Bearer <權杖>；留空時僅 DEBUG 可存取）
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+METRICS_AUTH_TOKEN = os.getenv("METRICS_AUTH_TOKEN", "")
+
+# 測試執行器（測試期間不輸出存取日誌）
+TEST_RUNNER = "core.test_runner.TestRunner"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "utils.log_handlers.JsonFormatter"},
+    },
+    "handlers": {
+        "console": {
+            "class": "utils.log_handlers.BackgroundStreamHandler",
+            "formatter": "json",
+            "stream": "ext://sys.stderr",
+            "maxsize": ACCESS_LOG_QUEUE_SIZE,
+        },
+        "access": {
+            "class": "utils.log_handlers.BackgroundStreamHandler",
+            "formatter": "json",
+            "stream": "ext://sys.stdout",
+            "maxsize": ACCESS_LOG_QUEUE_SIZE,
+        },
+    },
+    "loggers": {
+        "access": {
+            "handlers": ["access"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "query_budget": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -106,6 +169,23 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashers
+# 第一個雜湊器用於新密碼；BoundedPBKDF2PasswordHasher 與 Django 預設的 pbkdf2_sha256 相容
+PASSWORD_HASHERS = [
+    "apps.users.hashers.BoundedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+# 密碼雜湊執行池（每個行程）：同時雜湊數量、排隊數量、排隊等待秒數（逾時回傳 503）
+# WORKERS + MAX_PENDING 為登入 / 註冊最多佔用的請求執行緒數，需小於 gunicorn 的 GUNICORN_THREADS；
+# 等待名額期間也佔用請求執行緒，因此預設不等待
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "4"))
+PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS", "0"))
+
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "static_collect/")
@@ -130,3 +210,10 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # DRF Standardized Errors
 DRF_STANDARDIZED_ERRORS = {"ENABLE_IN_DEBUG_FOR_UNHANDLED_EXCEPTIONS": True}
 
+
+# 商品名稱自動完成索引（行程內）整批重建間隔（秒）
+# 商品異動與批次匯入以快取中的共用版本通知其他 worker 重建（需共用快取；行程內快取時其他 worker 依此間隔重建）
+PRODUCT_AUTOCOMPLETE_REFRESH_SECONDS = int(os.getenv("PRODUCT_AUTOCOMPLETE_REFRESH_SECONDS", "300"))
+
+# 簽章交換序號主金鑰（各店家金鑰由此衍生，未設定時使用 SECRET_KEY）
+EXCHANGE_CODE_SIGNING_KEY = os.getenv("EXCHANGE_CODE_SIGNING_KEY", SECRET_KEY)
@@ -0,0 +1,24 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv(".env")
+
+# 快取設定
+# 預設為行程內快取（LocMemCache），多個 worker 部署時請改用共用快取（例如 Redis / Memcached），
+# 否則核銷後其他 worker 的快取要等到過期才會更新
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache")
+CACHE_LOCATION = os.getenv("CACHE_LOCATION", "")
+
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": CACHE_LOCATION,
+    }
+}
+
+# 交換序號查詢快取有效時間（秒）
+# 行程內快取（LocMemCache）無法讓其他 worker 的快取失效，有效時間以 EXCHANGE_LOOKUP_LOCAL_CACHE_SECONDS 為上限
+# （核銷後其他 worker 最多延遲此秒數才顯示已核銷，0 表示停用快取）
+EXCHANGE_LOOKUP_CACHE_SECONDS = int(os.getenv("EXCHANGE_LOOKUP_CACHE_SECONDS", "600"))
+EXCHANGE_LOOKUP_LOCAL_CACHE_SECONDS = int(os.getenv("EXCHANGE_LOOKUP_LOCAL_CACHE_SECONDS", "2"))
@@ -10,10 +10,19 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
+# 連線池（每個 worker 行程各自一個，請求結束時連線歸還到連線池而不關閉）
+# 總連線數約為 worker 數 × DB_POOL_MAX_SIZE，需小於 PostgreSQL 的 max_connections
+DB_POOL_ENABLED = os.getenv("DB_POOL_ENABLED", "true").lower() == "true"
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "5"))
+DB_POOL_MAX_LIFETIME_SECONDS = float(os.getenv("DB_POOL_MAX_LIFETIME_SECONDS", "1800"))
+DB_POOL_MAX_IDLE_SECONDS = float(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300"))
+# 閒置超過此秒數的連線在取出時先執行健康檢查（0 表示每次都檢查）
+DB_POOL_CHECK_AFTER_SECONDS = float(os.getenv("DB_POOL_CHECK_AFTER_SECONDS", "30"))
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "core.db.backends.postgresql" if DB_POOL_ENABLED else "django.db.backends.postgresql",
         "NAME": DB_NAME,
         "USER": DB_USER,
         "PASSWORD": DB_PASSWORD,
@@ -22,6 +31,52 @@ DATABASES = {
         "OPTIONS": {
             "connect_timeout": 10,
         },
+        "POOL": {
+            "MAX_SIZE": DB_POOL_MAX_SIZE,
+            "TIMEOUT": DB_POOL_TIMEOUT_SECONDS,
+            "MAX_LIFETIME": DB_POOL_MAX_LIFETIME_SECONDS,
+            "MAX_IDLE": DB_POOL_MAX_IDLE_SECONDS,
+            "CHECK_AFTER": DB_POOL_CHECK_AFTER_SECONDS,
+        },
     }
 }
 
+
+# 唯讀副本（以逗號分隔的 host 或 host:port，其餘連線設定與主資料庫相同）
+# 安全方法（GET / HEAD / OPTIONS）的讀取使用副本，寫入與交易中的查詢使用主資料庫
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()]
+# 使用者寫入後固定讀取主資料庫的秒數（多個 worker 部署時需使用共用快取）
+DB_REPLICA_PIN_SECONDS = int(os.getenv("DB_REPLICA_PIN_SECONDS", "5"))
+
+DATABASE_REPLICAS = []
+for _index, _replica_host in enumerate(DB_REPLICA_HOSTS, start=1):
+    _host, _separator, _port = _replica_host.partition(":")
+    DATABASES[f"replica_{_index}"] = {
+        **DATABASES["default"],
+        "HOST": _host,
+        "PORT": _port or DB_PORT,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{_index}")
+
+
+# 水平分片（以逗號分隔的 host、host:port 或 host:port/資料庫名稱，留空表示不分片）
+# 錢包、交易紀錄與兌換紀錄依 user_id 分配到各分片，使用者與商品等其餘資料留在主資料庫
+# 分片數量變更時需搬移資料並重新執行 configure_shard_sequences
+DB_SHARD_HOSTS = [host.strip() for host in os.getenv("DB_SHARD_HOSTS", "").split(",") if host.strip()]
+
+DATABASE_SHARDS = []
+for _index, _shard in enumerate(DB_SHARD_HOSTS):
+    _address, _separator, _name = _shard.partition("/")
+    _host, _separator, _port = _address.partition(":")
+    _name = _name or DB_NAME
+    DATABASES[f"shard_{_index}"] = {
+        **DATABASES["default"],
+        "NAME": _name,
+        "HOST": _host,
+        "PORT": _port or DB_PORT,
+        "TEST": {"NAME": f"test_{_name}_shard_{_index}"},
+    }
+    DATABASE_SHARDS.append(f"shard_{_index}")
+
+DATABASE_ROUTERS = ["core.db.routers.ShardRouter", "core.db.routers.PrimaryReplicaRouter"]
@@ -4,7 +4,7 @@ REST_FRAMEWORK = {
         "django_filters.rest_framework.DjangoFilterBackend",
     ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
@@ -36,8 +36,34 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
     "USER_ID_FIELD": "id",
     "USER_ID_CLAIM": "user_id",
+    # 使用 RevocableRefreshToken 的黑名單（未安裝 rest_framework_simplejwt.token_blacklist）
+    "TOKEN_REFRESH_SERIALIZER": "apps.users.serializers.CustomTokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "apps.users.serializers.CustomTokenVerifySerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "apps.users.serializers.CustomTokenBlacklistSerializer",
 }
 
+# Refresh Token 黑名單的 Bloom filter（行程內）
+# 容量為預期的未到期撤銷 token 數量，超過時自動以兩倍容量重建
+JWT_BLACKLIST_BLOOM_CAPACITY = int(os.getenv("JWT_BLACKLIST_BLOOM_CAPACITY", "100000"))
+JWT_BLACKLIST_BLOOM_ERROR_RATE = float(os.getenv("JWT_BLACKLIST_BLOOM_ERROR_RATE", "0.001"))
+# 同步其他 worker 撤銷紀錄的間隔（秒）
+JWT_BLACKLIST_SYNC_SECONDS = int(os.getenv("JWT_BLACKLIST_SYNC_SECONDS", "5"))
+
+# JWT 簽章演算法：HS256（預設，使用 SIMPLE_JWT 的 SIGNING_KEY）、RS256、EdDSA
+# 非對稱簽章的金鑰與輪替方式請參考 apps/users/token_backend.py
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR", "keys/jwt")
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID", "")
+# 切換為非對稱簽章期間，是否仍接受舊的 HS256 token（不帶 kid）
+JWT_ACCEPT_LEGACY_HS256 = os.getenv("JWT_ACCEPT_LEGACY_HS256", "false").lower() == "true"
+# JWKS 端點的 Cache-Control max-age（秒）
+JWT_JWKS_MAX_AGE_SECONDS = int(os.getenv("JWT_JWKS_MAX_AGE_SECONDS", "300"))
+
+# JWT 認證的使用者快取（行程內）
+# 使用者異動後其他 worker 最多延遲 TTL 秒才會生效
+JWT_USER_CACHE_TTL_SECONDS = int(os.getenv("JWT_USER_CACHE_TTL_SECONDS", "60"))
+JWT_USER_CACHE_MAX_SIZE = int(os.getenv("JWT_USER_CACHE_MAX_SIZE", "10000"))
+
 # Spectacular Settings (Swagger)
 SPECTACULAR_SETTINGS = {
     "TITLE": "點數兌換贈品系統 API",
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from core.views import DatabasePoolStatsView, metrics_view
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularRedocView,
@@ -20,6 +21,9 @@ urlpatterns = [
     path("api/", include("apps.points.urls")),
     path("api/", include("apps.orders.urls")),
     path("api/", include("apps.payments.urls")),
+    # 系統狀態
+    path("api/system/db-pool/", DatabasePoolStatsView.as_view(), name="db-pool-stats"),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 # Serve media files in development
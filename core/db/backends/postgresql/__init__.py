@@ -0,0 +1 @@
+# PostgreSQL backend with a per-process connection pool
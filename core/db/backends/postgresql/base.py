@@ -0,0 +1,121 @@
+"""
+使用連線池的 PostgreSQL backend
+
+ENGINE 設為 "core.db.backends.postgresql" 並以 DATABASES[alias]["POOL"] 設定連線池：
+
+    "POOL": {
+        "MAX_SIZE": 10,            # 每個行程的連線數上限
+        "TIMEOUT": 5,              # 連線數已達上限時等待秒數，逾時拋出 OperationalError
+        "MAX_LIFETIME": 1800,      # 連線最長存活秒數
+        "MAX_IDLE": 300,           # 閒置連線保留秒數
+        "CHECK_AFTER": 30,         # 閒置超過此秒數的連線在取出時先執行 SELECT 1
+    }
+
+Django 的用法不變（CONN_MAX_AGE 維持 0）：請求結束時 Django 關閉連線，
+實際上是歸還到連線池，下一個請求直接沿用，不需重新建立 TCP 連線與認證。
+一個 DatabaseWrapper 在 connect 到 close 之間固定使用同一條連線，
+transaction.atomic 與 select_for_update 的行為與不使用連線池時相同；
+歸還時若仍在交易中會先回滾並恢復 autocommit，無法回滾的連線直接關閉。
+"""
+
+import psycopg2
+from psycopg2 import extensions
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgreSQLDatabaseWrapper
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.utils.asyncio import async_unsafe
+from core.db.backends.postgresql.creation import DatabaseCreation
+from core.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+POOL_DEFAULTS = {
+    "MAX_SIZE": 10,
+    "TIMEOUT": 5,
+    "MAX_LIFETIME": 1800,
+    "MAX_IDLE": 300,
+    "CHECK_AFTER": 30,
+}
+
+
+class PoolTimeoutError(psycopg2.OperationalError):
+    """連線池逾時（Django 會轉為 django.db.OperationalError）"""
+
+
+def _check_connection(connection):
+    """健康檢查：連線未關閉且可執行查詢（非 autocommit 的連線檢查後回滾，不留下開啟的交易）"""
+    if connection.closed:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    return True
+
+
+def _reset_connection(connection):
+    """
+    歸還前重設：回滾未結束的交易並恢復 autocommit，狀態不明的連線不再使用
+
+    以 set_autocommit(False) 歸還的連線若不恢復，下次取出時健康檢查的 SELECT 1 會開啟交易，
+    Django 接著設定 autocommit 時會失敗（set_session cannot be used inside a transaction）。
+    """
+    if connection.closed:
+        return False
+    status = connection.get_transaction_status()
+    if status in (extensions.TRANSACTION_STATUS_INTRANS, extensions.TRANSACTION_STATUS_INERROR):
+        connection.rollback()
+    elif status != extensions.TRANSACTION_STATUS_IDLE:
+        return False
+    if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+        return False
+    if not connection.autocommit:
+        connection.autocommit = True
+    return True
+
+
+class DatabaseWrapper(PostgreSQLDatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    _pool = None
+
+    def _get_pool(self, conn_params):
+        options = {**POOL_DEFAULTS, **self.settings_dict.get("POOL", {})}
+        key = tuple(sorted((name, repr(value)) for name, value in conn_params.items()))
+        return get_pool(
+            self.alias,
+            key,
+            lambda: ConnectionPool(
+                connect=lambda: psycopg2.connect(**conn_params),
+                close=lambda connection: connection.close(),
+                check=_check_connection,
+                reset=_reset_connection,
+                max_size=options["MAX_SIZE"],
+                timeout=options["TIMEOUT"],
+                max_lifetime=options["MAX_LIFETIME"],
+                max_idle=options["MAX_IDLE"],
+                check_after=options["CHECK_AFTER"],
+            ),
+        )
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        """從連線池取出連線"""
+        pool = self._get_pool(conn_params)
+        parent = super()
+        try:
+            connection, reused = pool.checkout(connect=lambda: parent.get_new_connection(conn_params))
+        except PoolTimeout as e:
+            raise PoolTimeoutError(str(e)) from e
+        self._pool = pool
+
+        if reused:
+            # 新建連線時由父類別設定；沿用的連線需在 set_autocommit 前補上
+            isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+            self.isolation_level = (
+                IsolationLevel.READ_COMMITTED if isolation_level is None else IsolationLevel(isolation_level)
+            )
+        return connection
+
+    def _close(self):
+        """將連線歸還到連線池（不關閉）"""
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._pool.checkin(self.connection)
@@ -0,0 +1,18 @@
+from django.db.backends.postgresql.creation import DatabaseCreation as PostgreSQLDatabaseCreation
+from core.db.pool import close_pools
+
+
+class DatabaseCreation(PostgreSQLDatabaseCreation):
+    """
+    測試資料庫建立 / 刪除
+
+    刪除或複製資料庫時不能有其他連線，先關閉連線池中的閒置連線。
+    """
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+    def _clone_test_db(self, suffix, verbosity, keepdb=False):
+        close_pools()
+        super()._clone_test_db(suffix, verbosity, keepdb)
@@ -0,0 +1,81 @@
+"""
+每個請求的資料庫查詢統計
+
+連線建立時（connection_created）在連線掛上 execute wrapper，
+track_queries() 期間執行的查詢次數與耗時累加到目前 context 的 QueryStats。
+
+以 contextvars 保存：async view 以 sync_to_async 執行的查詢也會計入同一個請求；
+run_on_shards 的執行緒不會複製 context，分片平行查詢不計入。
+巢狀的 track_queries()（例如存取日誌與 Server-Timing 中間件）各自統計，內層的查詢同時計入外層。
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+class QueryStats:
+    """查詢次數與總耗時（秒）；parent 為外層的統計"""
+
+    __slots__ = ("count", "duration", "parent")
+
+    def __init__(self, parent=None):
+        self.count = 0
+        self.duration = 0.0
+        self.parent = parent
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    """execute wrapper：累加查詢次數與耗時"""
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats = stats.parent
+
+
+def install(sender=None, connection=None, **kwargs):
+    """
+    在連線掛上查詢統計的 execute wrapper（重複呼叫不會重複掛上）
+
+    放在最外層（第一個），避免 connection.execute_wrapper() 結束時 pop() 移除的是這個 wrapper。
+    """
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _count_query)
+
+
+connection_created.connect(install)
+
+
+@contextmanager
+def track_queries():
+    """
+    統計區塊內的查詢
+
+    Yields:
+        QueryStats: 區塊結束後為區塊內的查詢次數與耗時
+    """
+    for connection in connections.all(initialized_only=True):
+        install(connection=connection)
+
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
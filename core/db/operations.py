@@ -0,0 +1,67 @@
+"""
+分片用的 migration operations
+
+分片上的使用者、商品資料表維持為空（見 core.db.sharding），分片模型指向它們的外鍵
+在分片上不能有資料庫外鍵約束；default（包含未啟用分片時）保留約束。
+"""
+
+from django.conf import settings
+from django.db.migrations.operations import AlterField
+from django.db.migrations.operations.base import Operation
+
+
+class DropForeignKeyConstraintOnShards(Operation):
+    """
+    僅在分片資料庫移除模型外鍵的資料庫約束
+
+    不改變 migration state（模型定義保留 db_constraint=True），
+    於 DATABASE_SHARDS 中的資料庫依序以 db_constraint=False 的欄位執行 AlterField。
+    同一個模型的外鍵需在同一個 operation 列出（SQLite 重建資料表時以 state 中的欄位定義建立約束）。
+    """
+
+    reversible = True
+
+    def __init__(self, model_name, fields):
+        self.model_name = model_name
+        self.fields = tuple(fields)
+
+    def deconstruct(self):
+        return self.__class__.__name__, [], {"model_name": self.model_name, "fields": self.fields}
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def _alter_fields(self, app_label, state):
+        """
+        Returns:
+            list[(AlterField, ProjectState, ProjectState)]: 每個外鍵的 AlterField 與其前後的 state
+        """
+        steps = []
+        for name in self.fields:
+            field = state.models[app_label, self.model_name.lower()].fields[name].clone()
+            field.db_constraint = False
+            operation = AlterField(self.model_name, name, field)
+            unconstrained = state.clone()
+            operation.state_forwards(app_label, unconstrained)
+            steps.append((operation, state, unconstrained))
+            state = unconstrained
+        return steps
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.alias not in settings.DATABASE_SHARDS:
+            return
+        for operation, before, after in self._alter_fields(app_label, from_state):
+            operation.database_forwards(app_label, schema_editor, before, after)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.alias not in settings.DATABASE_SHARDS:
+            return
+        for operation, before, after in reversed(self._alter_fields(app_label, to_state)):
+            operation.database_forwards(app_label, schema_editor, after, before)
+
+    def describe(self):
+        return f"在分片上移除 {self.model_name} 的 {', '.join(self.fields)} 資料庫外鍵約束"
+
+    @property
+    def migration_name_fragment(self):
+        return f"shard_{self.model_name.lower()}_without_constraint"
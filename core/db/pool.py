@@ -0,0 +1,346 @@
+"""
+行程內的資料庫連線池
+
+每個行程（gunicorn worker）對每個資料庫維護一個有上限的連線池，執行緒安全：
+
+- 取出（checkout）：優先使用最近歸還的閒置連線；超過最長存活時間或閒置過久的連線直接關閉，
+  閒置超過 check_after 秒的連線先做健康檢查，失敗則關閉並改用下一條
+- 沒有閒置連線且未達上限時建立新連線；已達上限時等待，逾時拋出 PoolTimeout
+- 歸還（checkin）：重設連線狀態（例如回滾未結束的交易），無法重設的連線直接關閉，
+  同時關閉閒置超過 max_idle 秒的連線
+
+fork 後的子行程不會沿用父行程的連線（連線池記錄建立時的 pid）。
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from utils.metrics import REGISTRY, Counter, Gauge
+
+
+class PoolTimeout(Exception):
+    """等待可用連線逾時"""
+
+
+class PooledConnection:
+    """連線池中的連線與其時間資訊"""
+
+    __slots__ = ("connection", "created_at", "returned_at", "generation")
+
+    def __init__(self, connection, now, generation):
+        self.connection = connection
+        self.created_at = now
+        self.returned_at = now
+        self.generation = generation
+
+
+class ConnectionPool:
+    """
+    有上限的連線池
+
+    Args:
+        connect: 建立新連線的函式
+        close: 關閉連線的函式
+        check: 健康檢查函式，回傳 False 表示連線不可用
+        reset: 歸還時重設連線狀態的函式，回傳 False 表示連線不可再使用
+        max_size: 連線數上限（使用中 + 閒置）
+        timeout: 連線數已達上限時等待的秒數
+        max_lifetime: 連線最長存活秒數（0 表示不限制）
+        max_idle: 閒置連線保留秒數（0 表示不限制）
+        check_after: 閒置超過此秒數的連線在取出時先做健康檢查（0 表示每次都檢查）
+    """
+
+    def __init__(self, connect, close, check, reset, max_size=10, timeout=5.0,
+                 max_lifetime=1800.0, max_idle=300.0, check_after=30.0, timer=time.monotonic):
+        self._connect = connect
+        self._close = close
+        self._check = check
+        self._reset = reset
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self._timer = timer
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._in_use = {}
+        self._pending = 0
+        self._waiting = 0
+        self._generation = 0
+        self._pid = os.getpid()
+        self._counters = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "reused": 0,
+            "health_check_failures": 0,
+            "timeouts": 0,
+            "waits": 0,
+        }
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    @property
+    def size(self):
+        return len(self._idle) + len(self._in_use) + self._pending
+
+    def _after_fork(self):
+        """fork 後捨棄父行程的連線（不關閉，避免影響父行程的連線）"""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle.clear()
+            self._in_use.clear()
+            self._pending = 0
+
+    def _expired(self, item, now):
+        return item.generation != self._generation or (
+            bool(self.max_lifetime) and now - item.created_at >= self.max_lifetime
+        )
+
+    def _discard(self, connection):
+        try:
+            self._close(connection)
+        except Exception:
+            pass
+        with self._condition:
+            self._counters["closed"] += 1
+
+    def _usable(self, item):
+        """閒置連線是否可以沿用（過期或健康檢查失敗時回傳 False）"""
+        now = self._timer()
+        if self._expired(item, now):
+            return False
+        if now - item.returned_at < self.check_after:
+            return True
+        try:
+            healthy = self._check(item.connection)
+        except Exception:
+            healthy = False
+        if not healthy:
+            with self._condition:
+                self._counters["health_check_failures"] += 1
+        return healthy
+
+    def _wait_available(self, deadline):
+        """
+        等待有閒置連線或可建立新連線（需持有 self._condition）
+
+        Returns:
+            bool: 是否有等待
+        """
+        waited = False
+        while not self._idle and self.size >= self.max_size:
+            remaining = deadline - self._timer()
+            if remaining <= 0:
+                self._counters["timeouts"] += 1
+                raise PoolTimeout(
+                    f"資料庫連線池已滿（{self.max_size} 條），等待 {self.timeout} 秒後仍無可用連線"
+                )
+            if not waited:
+                waited = True
+                self._counters["waits"] += 1
+            self._waiting += 1
+            try:
+                self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+        return waited
+
+    def checkout(self, connect=None):
+        """
+        取出一條連線
+
+        Args:
+            connect: 需要建立新連線時使用的函式（預設為建立連線池時指定的 connect）
+
+        Returns:
+            (connection, reused): reused 表示是否為沿用的連線
+
+        Raises:
+            PoolTimeout: 連線數已達上限且等待逾時
+        """
+        started = self._timer()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            with self._condition:
+                self._after_fork()
+                waited = self._wait_available(deadline) or waited
+                item = self._idle.pop() if self._idle else None
+                generation = self._generation
+                # 先保留名額，建立連線與健康檢查時不持有鎖
+                self._pending += 1
+
+            reused = item is not None
+            try:
+                if item is None:
+                    item = PooledConnection((connect or self._connect)(), self._timer(), generation)
+                    with self._condition:
+                        self._counters["created"] += 1
+                elif not self._usable(item):
+                    self._discard(item.connection)
+                    item = None
+            except BaseException:
+                with self._condition:
+                    self._pending -= 1
+                    self._condition.notify()
+                raise
+
+            with self._condition:
+                self._pending -= 1
+                if item is None:
+                    self._condition.notify()
+                    continue
+                self._in_use[id(item.connection)] = item
+                self._counters["checkouts"] += 1
+                if reused:
+                    self._counters["reused"] += 1
+                if waited:
+                    wait_seconds = self._timer() - started
+                    self._wait_seconds_total += wait_seconds
+                    self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+            return item.connection, reused
+
+    def checkin(self, connection):
+        """歸還連線（無法重設、已過期的連線直接關閉），並關閉閒置過久的連線"""
+        with self._condition:
+            self._after_fork()
+            item = self._in_use.pop(id(connection), None)
+        if item is None:
+            self._discard(connection)
+            return
+
+        now = self._timer()
+        try:
+            reusable = not self._expired(item, now) and self._reset(connection)
+        except Exception:
+            reusable = False
+
+        stale = []
+        with self._condition:
+            if reusable:
+                item.returned_at = now
+                self._idle.append(item)
+            if self.max_idle:
+                while self._idle and now - self._idle[0].returned_at >= self.max_idle:
+                    stale.append(self._idle.popleft().connection)
+            self._condition.notify()
+
+        if not reusable:
+            self._discard(connection)
+        for stale_connection in stale:
+            self._discard(stale_connection)
+
+    def close_all(self):
+        """關閉所有閒置連線，使用中的連線在歸還時關閉"""
+        with self._condition:
+            self._generation += 1
+            idle = [item.connection for item in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+        for connection in idle:
+            self._discard(connection)
+
+    def stats(self):
+        """連線池統計"""
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "waiting": self._waiting,
+                **self._counters,
+                "wait_seconds_total": round(self._wait_seconds_total, 6),
+                "wait_seconds_max": round(self._wait_seconds_max, 6),
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, key, factory):
+    """
+    取得（或建立）連線池
+
+    Args:
+        alias: 資料庫別名（統計用）
+        key: 連線參數的識別值，參數不同（例如測試資料庫）時使用不同的連線池
+        factory: 建立 ConnectionPool 的函式
+    """
+    with _pools_lock:
+        pool = _pools.get((alias, key))
+        if pool is None:
+            pool = _pools[(alias, key)] = factory()
+        return pool
+
+
+def pool_stats():
+    """
+    所有連線池的統計（本行程）
+
+    Returns:
+        dict: {資料庫別名: 統計}，同一別名有多個連線池時合計
+    """
+    with _pools_lock:
+        pools = list(_pools.items())
+
+    stats = {}
+    for (alias, _key), pool in pools:
+        pool_stat = pool.stats()
+        if alias not in stats:
+            stats[alias] = pool_stat
+            continue
+        merged = stats[alias]
+        for name, value in pool_stat.items():
+            if name == "wait_seconds_max":
+                merged[name] = max(merged[name], value)
+            else:
+                merged[name] += value
+    return stats
+
+
+def close_pools():
+    """關閉所有連線池的閒置連線（例如刪除測試資料庫前）"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
+
+pool_connections = Gauge(
+    "db_pool_connections",
+    "連線池的連線數（size / idle / in_use / waiting / max_size）",
+    labels=("alias", "state"),
+)
+pool_events = Counter(
+    "db_pool_events_total",
+    "連線池累計次數（created / closed / checkouts / reused / health_check_failures / timeouts / waits）",
+    labels=("alias", "event"),
+)
+pool_wait_seconds = Counter(
+    "db_pool_wait_seconds_total",
+    "等待可用連線的累計秒數",
+    labels=("alias",),
+)
+
+POOL_STATES = ("max_size", "size", "idle", "in_use", "waiting")
+
+
+def collect_pool_metrics():
+    """由 pool_stats() 更新連線池指標（收集指標前呼叫）"""
+    for alias, stats in pool_stats().items():
+        for name, value in stats.items():
+            if name in POOL_STATES:
+                pool_connections.set(value, alias=alias, state=name)
+            elif name == "wait_seconds_total":
+                pool_wait_seconds.set_total(value, alias=alias)
+            elif name != "wait_seconds_max":
+                pool_events.set_total(value, alias=alias, event=name)
+
+
+REGISTRY.register_collector(collect_pool_metrics)
@@ -0,0 +1,135 @@
+"""
+讀寫分離的資料庫路由
+
+- 寫入一律使用主資料庫（default）
+- 讀取：ReplicaRoutingMiddleware 對安全方法（GET / HEAD / OPTIONS）的請求選定一個唯讀副本，
+  該請求的查詢使用此副本；交易中（transaction.atomic）的讀取仍使用主資料庫，
+  確保 select_for_update 與交易內讀取到的是最新資料
+- 讀取自己的寫入：使用者成功送出寫入請求後 DB_REPLICA_PIN_SECONDS 秒內，
+  其讀取請求仍使用主資料庫（避免副本延遲造成例如 MeView 顯示舊的點數餘額）
+
+未設定 DB_REPLICA_HOSTS 時所有查詢都使用主資料庫。
+
+啟用分片時 ShardRouter 需排在 PrimaryReplicaRouter 之前（見 core.db.sharding）。
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections
+from core.db.sharding import is_sharded_model, shard_for_user
+
+# 目前請求選定的唯讀副本（None 表示使用主資料庫）
+_replica_alias: ContextVar[Optional[str]] = ContextVar("replica_alias", default=None)
+
+PIN_CACHE_KEY_PREFIX = "db_primary_pin"
+
+
+def choose_replica():
+    """隨機選擇一個唯讀副本（未設定副本時回傳 None）"""
+    replicas = settings.DATABASE_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+def current_replica():
+    """目前請求選定的唯讀副本"""
+    return _replica_alias.get()
+
+
+@contextmanager
+def read_from(alias):
+    """在區塊中將讀取導向指定的唯讀副本（None 表示主資料庫）"""
+    token = _replica_alias.set(alias)
+    try:
+        yield
+    finally:
+        _replica_alias.reset(token)
+
+
+def _pin_key(user_id):
+    return f"{PIN_CACHE_KEY_PREFIX}:{user_id}"
+
+
+def pin_to_primary(user_id):
+    """寫入後將使用者的讀取固定在主資料庫 DB_REPLICA_PIN_SECONDS 秒"""
+    if settings.DATABASE_REPLICAS and settings.DB_REPLICA_PIN_SECONDS > 0:
+        cache.set(_pin_key(user_id), True, settings.DB_REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id):
+    """使用者是否在寫入後的固定期間內"""
+    return bool(cache.get(_pin_key(user_id)))
+
+
+class PrimaryReplicaRouter:
+    """主資料庫 / 唯讀副本路由"""
+
+    def db_for_read(self, model, **hints):
+        alias = _replica_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # 副本由資料庫複寫同步，不執行 migration
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ShardRouter:
+    """
+    分片路由
+
+    - 分片模型：依 hints 中的 instance 決定分片（同模型或其他分片模型取 SHARD_KEY，使用者取 pk），
+      沒有 instance 時不決定（查詢需以 for_user() / on_shard() 指定分片）
+    - 非分片模型：由分片上的資料取得關聯（例如 exchange.product）時使用 default，
+      其餘交由後續的 router 決定
+    - migration：每個分片都建立完整的 schema，RunPython / RunSQL 僅在 default 執行
+    """
+
+    def _db_for_instance(self, model, instance):
+        if is_sharded_model(model):
+            if is_sharded_model(type(instance)):
+                user_id = getattr(instance, instance.SHARD_KEY)
+            elif isinstance(instance, get_user_model()):
+                user_id = instance.pk
+            else:
+                return None
+            return shard_for_user(user_id) if user_id is not None else None
+
+        if instance._state.db in settings.DATABASE_SHARDS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if not settings.DATABASE_SHARDS or instance is None:
+            return None
+        return self._db_for_instance(model, instance)
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if settings.DATABASE_SHARDS and (is_sharded_model(type(obj1)) or is_sharded_model(type(obj2))):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_SHARDS and model_name is None:
+            return False
+        return None
@@ -0,0 +1,222 @@
+"""
+依使用者 ID 水平分片（錢包、交易紀錄、兌換紀錄）
+
+- 分片資料：設定 SHARD_KEY 的模型（UserPoints、PointTransaction、PointExchange），
+  依 SHARD_KEY（user_id）以 jump consistent hash 分配到 DATABASE_SHARDS 其中之一
+- 中央資料庫（default）：使用者、商品（含庫存）、兌換統計計數器等其餘資料
+- 查詢：會員查詢自己的資料時以 for_user() 固定在所屬分片；
+  未固定分片的查詢（ADMIN / STORE 列表）以 fan_out() 查詢所有分片後依排序合併
+- ID：各分片的序列需以 configure_shard_sequences 指令設定為互不重複（起始值錯開、遞增值為分片數）
+
+每個分片都建立完整的 schema，分片上的使用者、商品資料表維持為空，
+因此分片查詢的 select_related 會改為 prefetch_related（由中央資料庫取得關聯資料），
+分片模型指向它們的外鍵也只在分片上移除資料庫約束（core.db.operations，default 保留約束）。
+
+未設定 DB_SHARD_HOSTS 時所有資料都在 default，行為與未分片相同。
+"""
+
+import functools
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, models
+
+
+def sharding_enabled():
+    """是否啟用分片"""
+    return bool(settings.DATABASE_SHARDS)
+
+
+def shard_aliases():
+    """所有分片的資料庫 alias（未啟用分片時為 default）"""
+    return list(settings.DATABASE_SHARDS) or [DEFAULT_DB_ALIAS]
+
+
+def jump_hash(key, buckets):
+    """
+    Jump consistent hash（Lamping & Veach）
+
+    分片數由 N 增加為 N + 1 時，只有約 1 / (N + 1) 的 key 會移到新的分片，其餘維持不變。
+    """
+    key &= 0xFFFFFFFFFFFFFFFF
+    bucket, candidate = -1, 0
+    while candidate < buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_for_user(user_id):
+    """使用者資料所在的分片"""
+    shards = settings.DATABASE_SHARDS
+    if not shards:
+        return DEFAULT_DB_ALIAS
+    return shards[jump_hash(int(user_id), len(shards))]
+
+
+def is_sharded_model(model):
+    """模型是否依 SHARD_KEY 分片"""
+    return getattr(model, "SHARD_KEY", None) is not None
+
+
+def run_on_shards(func, aliases):
+    """
+    於每個分片執行 func(alias)，回傳依 aliases 順序的結果
+
+    多個分片時以執行緒平行查詢，每個執行緒結束前關閉自己的連線（啟用連線池時歸還到連線池）。
+    """
+    aliases = list(aliases)
+    if len(aliases) <= 1:
+        return [func(alias) for alias in aliases]
+
+    def call(alias):
+        try:
+            return func(alias)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=len(aliases)) as executor:
+        return list(executor.map(call, aliases))
+
+
+def _related_paths(tree, prefix=""):
+    """將 select_related 的巢狀 dict 展開為 a、a__b 形式的路徑"""
+    paths = []
+    for name, children in tree.items():
+        path = f"{prefix}{name}"
+        paths.append(path)
+        paths.extend(_related_paths(children, f"{path}__"))
+    return paths
+
+
+class ShardedQuerySet(models.QuerySet):
+    """分片模型的 QuerySet"""
+
+    @property
+    def is_pinned(self):
+        """是否已指定資料庫（for_user / on_shard / using）"""
+        return self._db is not None
+
+    def on_shard(self, alias):
+        """
+        在指定的分片查詢
+
+        分片上沒有使用者與商品資料，select_related 改為 prefetch_related（關聯資料由 default 取得），
+        並取消 only() / defer()（裁剪欄位時的關聯路徑需要 JOIN）。
+        未啟用分片時不做任何變更。
+        """
+        if not sharding_enabled():
+            return self
+
+        queryset = self.using(alias)
+        select_related = queryset.query.select_related
+        if isinstance(select_related, dict) and alias != DEFAULT_DB_ALIAS:
+            queryset = queryset.select_related(None).prefetch_related(*_related_paths(select_related))
+            queryset.query.clear_deferred_loading()
+        return queryset
+
+    def for_user(self, user_id):
+        """在使用者所屬的分片查詢"""
+        return self.on_shard(shard_for_user(user_id))
+
+    def fan_out(self, aliases=None):
+        """在所有分片查詢並合併結果"""
+        aliases = shard_aliases() if aliases is None else aliases
+        return FanOutQuerySet([self.on_shard(alias) for alias in aliases])
+
+
+ShardedManager = models.Manager.from_queryset(ShardedQuerySet)
+
+
+class FanOutQuerySet:
+    """
+    多個分片的合併查詢結果
+
+    提供分頁器與 DRF 需要的 count()、切片、迭代與 get()：
+    - count()：各分片筆數相加
+    - 切片 [start:stop]：每個分片取前 stop 筆，依排序以 heapq.merge 合併後再切片
+      （越後面的頁數每個分片要讀取的筆數越多）
+    - get() / aget()：依序在各分片查詢，回傳第一筆符合的資料
+    """
+
+    ordered = True
+
+    def __init__(self, querysets):
+        self.querysets = list(querysets)
+        self.model = self.querysets[0].model
+        self._result_cache = None
+
+        ordering = self.querysets[0].query.order_by or self.model._meta.ordering
+        self._ordering = [
+            (name.lstrip("-").split("__"), name.startswith("-")) for name in ordering if name != "?"
+        ]
+
+    @staticmethod
+    def _value(instance, path):
+        for name in path:
+            instance = getattr(instance, name)
+        return instance
+
+    def _compare(self, left, right):
+        for path, descending in self._ordering:
+            left_value, right_value = self._value(left, path), self._value(right, path)
+            if left_value == right_value:
+                continue
+            result = -1 if left_value < right_value else 1
+            return -result if descending else result
+        return 0
+
+    def _merge(self, results):
+        if len(results) == 1:
+            return iter(results[0])
+        return heapq.merge(*results, key=functools.cmp_to_key(self._compare))
+
+    def _run(self, func):
+        return run_on_shards(
+            lambda index: func(self.querysets[index]), range(len(self.querysets))
+        )
+
+    def count(self):
+        if self._result_cache is not None:
+            return len(self._result_cache)
+        return sum(self._run(lambda queryset: queryset.count()))
+
+    def __len__(self):
+        return len(self._fetch_all())
+
+    def __iter__(self):
+        return iter(self._fetch_all())
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self[key:key + 1][0]
+
+        if self._result_cache is not None or key.stop is None:
+            return self._fetch_all()[key]
+
+        results = self._run(lambda queryset: list(queryset[:key.stop]))
+        return list(islice(self._merge(results), key.start, key.stop, key.step))
+
+    def _fetch_all(self):
+        if self._result_cache is None:
+            self._result_cache = list(self._merge(self._run(list)))
+        return self._result_cache
+
+    def get(self, *args, **kwargs):
+        for queryset in self.querysets:
+            try:
+                return queryset.get(*args, **kwargs)
+            except self.model.DoesNotExist:
+                continue
+        raise self.model.DoesNotExist(f"{self.model._meta.object_name} matching query does not exist.")
+
+    async def aget(self, *args, **kwargs):
+        for queryset in self.querysets:
+            try:
+                return await queryset.aget(*args, **kwargs)
+            except self.model.DoesNotExist:
+                continue
+        raise self.model.DoesNotExist(f"{self.model._meta.object_name} matching query does not exist.")
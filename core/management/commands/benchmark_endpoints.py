@@ -0,0 +1,441 @@
+"""
+API 端點查詢次數與延遲回歸基準測試的 Django 管理指令
+
+使用方式：
+    python manage.py benchmark_endpoints
+    python manage.py benchmark_endpoints --transactions 1000000 --exchanges 100000 --products 10000
+    python manage.py benchmark_endpoints --save-baseline
+    python manage.py benchmark_endpoints --keepdb --iterations 500
+
+與 manage.py test 相同建立獨立的測試資料庫（含分片，唯讀副本以主資料庫代替），不會影響開發資料。
+建立大量資料後以完整的中間件堆疊對各端點發送請求，量測：
+- 每個請求的查詢次數（所有資料庫連線合計，JWT 使用者快取命中後的穩定狀態；
+  分片平行查詢在其他執行緒執行，不計入，見 core.db.instrumentation）
+- 延遲 p50 / p95（毫秒）
+- 回應大小（bytes）
+
+結果與基準檔案（--baseline）比較，以下情況視為回歸，指令以錯誤結束：
+- 查詢次數比基準多（資料量增加時查詢次數不應增加，用於發現 N+1 查詢；分片數需與基準相同）
+- p95 超過基準的 --latency-tolerance 比例（資料庫與資料量都與基準相同時才比較，資料量相差 1% 以內視為相同）
+- 回應大小超過基準的 --bytes-tolerance 比例
+--save-baseline 將本次結果寫入基準檔案；--keepdb 保留測試資料庫，下次執行時沿用已建立的資料。
+"""
+
+import json
+import os
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.authentication import user_cache
+from apps.users.models import RoleChoices, UserPoints
+from apps.products.models import Product
+from apps.points.models import (
+    ExchangeStatusChoices,
+    PointExchange,
+    PointTransaction,
+    TransactionTypeChoices,
+)
+from core.db.instrumentation import track_queries
+from core.db.sharding import shard_aliases, shard_for_user, sharding_enabled
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+USERNAME_PREFIX = "bench_ep"
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, "benchmarks", "endpoints_baseline.json")
+
+# (名稱, 角色, HTTP 方法, 路徑樣板, 請求內容)
+ENDPOINTS = [
+    ("products.list", "member", "get", "/api/products/?page=1", None),
+    ("products.retrieve", "member", "get", "/api/products/{product_id}/", None),
+    ("transactions.list.member", "member", "get", "/api/points/transactions/?page=1", None),
+    ("transactions.list.admin", "admin", "get", "/api/points/transactions/?page=1", None),
+    ("exchanges.list.member", "member", "get", "/api/points/exchanges/?page=1", None),
+    ("exchanges.list.store", "store", "get", "/api/points/exchanges/?page=1", None),
+    ("exchanges.list.admin", "admin", "get", "/api/points/exchanges/?page=1", None),
+    ("exchanges.retrieve", "member", "get", "/api/points/exchanges/{exchange_id}/", None),
+    ("exchange.create", "member", "post", "/api/points/exchange/", {"product_id": "{product_id}"}),
+    ("deposit.create", "member", "post", "/api/points/deposit/", {"amount": 100}),
+    ("users.me", "member", "get", "/api/users/me/", None),
+]
+
+
+def percentile(values, percent):
+    """計算百分位數（毫秒）"""
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[percent - 1] * 1000
+
+
+def similar_volumes(volumes, other, tolerance=0.01):
+    """資料量是否相近（--keepdb 沿用的資料包含先前量測時寫入的紀錄）"""
+    if not other or set(volumes) != set(other):
+        return False
+    return all(abs(volumes[key] - other[key]) <= other[key] * tolerance for key in volumes)
+
+
+def compare_results(results, baseline, latency_tolerance=0.25, bytes_tolerance=0.1):
+    """
+    與基準比較
+
+    Args:
+        results: 本次結果（{"database", "shards", "volumes", "endpoints": {名稱: {"queries", "p50_ms", "p95_ms", "bytes"}}}）
+        baseline: 基準（格式同 results）
+        latency_tolerance: p95 可超過基準的比例
+        bytes_tolerance: 回應大小可超過基準的比例
+
+    Returns:
+        tuple: (回歸清單, 提示清單)，皆為 (端點名稱, 說明)
+    """
+    regressions, notes = [], []
+    # 分片時會員查詢需另外由主資料庫取得關聯資料，查詢次數與未分片時不同
+    compare_queries = results["shards"] == baseline.get("shards")
+    compare_latency = (
+        compare_queries
+        and results["database"] == baseline.get("database")
+        and similar_volumes(results["volumes"], baseline.get("volumes"))
+    )
+    if not compare_queries:
+        notes.append(("*", "分片數與基準不同，只比較回應大小"))
+    elif not compare_latency:
+        notes.append(("*", "資料庫或資料量與基準不同，只比較查詢次數與回應大小"))
+
+    for name, current in results["endpoints"].items():
+        expected = baseline.get("endpoints", {}).get(name)
+        if expected is None:
+            notes.append((name, "基準中沒有此端點"))
+            continue
+
+        if not compare_queries:
+            pass
+        elif current["queries"] > expected["queries"]:
+            regressions.append((name, f"查詢次數 {expected['queries']} → {current['queries']}"))
+        elif current["queries"] < expected["queries"]:
+            notes.append((name, f"查詢次數減少 {expected['queries']} → {current['queries']}，可更新基準"))
+
+        if current["bytes"] > expected["bytes"] * (1 + bytes_tolerance):
+            regressions.append((name, f"回應大小 {expected['bytes']} → {current['bytes']} bytes"))
+
+        if compare_latency and current["p95_ms"] > expected["p95_ms"] * (1 + latency_tolerance):
+            regressions.append((name, f"p95 {expected['p95_ms']:.2f} → {current['p95_ms']:.2f} ms"))
+
+    return regressions, notes
+
+
+class Command(BaseCommand):
+    help = "以大量資料量測各 API 端點的查詢次數、延遲與回應大小，並與基準比較"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--transactions", type=int, default=1000000, help="交易紀錄筆數（預設 1000000）")
+        parser.add_argument("--exchanges", type=int, default=100000, help="兌換紀錄筆數（預設 100000）")
+        parser.add_argument("--products", type=int, default=10000, help="商品數量（預設 10000）")
+        parser.add_argument("--stores", type=int, default=100, help="店家數量（預設 100）")
+        parser.add_argument("--members", type=int, default=10000, help="會員數量（預設 10000）")
+        parser.add_argument("--iterations", type=int, default=200, help="每個端點的請求數（預設 200）")
+        parser.add_argument("--warmup", type=int, default=10, help="每個端點量測前的暖身請求數（預設 10）")
+        parser.add_argument("--seed", type=int, default=0, help="建立資料的亂數種子（預設 0）")
+        parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基準檔案路徑")
+        parser.add_argument("--save-baseline", action="store_true", help="將本次結果寫入基準檔案")
+        parser.add_argument(
+            "--latency-tolerance", type=float, default=0.25, help="p95 可超過基準的比例（預設 0.25）"
+        )
+        parser.add_argument(
+            "--bytes-tolerance", type=float, default=0.1, help="回應大小可超過基準的比例（預設 0.1）"
+        )
+        parser.add_argument("--keepdb", action="store_true", help="保留測試資料庫並沿用已建立的資料")
+
+    def handle(self, *args, **options):
+        """建立測試資料庫、執行量測並與基準比較"""
+        verbosity = options["verbosity"]
+        old_config = setup_databases(
+            verbosity, interactive=False, keepdb=options["keepdb"], serialized_aliases=set()
+        )
+        try:
+            results = self.run_benchmark(options)
+        finally:
+            connections.close_all()
+            teardown_databases(old_config, verbosity, keepdb=options["keepdb"])
+
+        self._report(results)
+        self._check_baseline(results, options)
+
+    def run_benchmark(self, options):
+        """建立資料（已存在時沿用）並量測所有端點"""
+        if User.objects.filter(username=f"{USERNAME_PREFIX}_admin").exists():
+            self.stdout.write(self.style.WARNING("沿用測試資料庫中已建立的資料"))
+        else:
+            self.stdout.write(self.style.SUCCESS("建立測試資料..."))
+            started = time.perf_counter()
+            self._seed(options)
+            self.stdout.write(f"  完成（{time.perf_counter() - started:.1f} 秒）")
+
+        context = self._context()
+        results = {
+            "database": connections["default"].vendor,
+            "shards": len(settings.DATABASE_SHARDS),
+            "volumes": self._volumes(),
+            "endpoints": {},
+        }
+
+        self.stdout.write(self.style.SUCCESS(f"\n每個端點量測 {options['iterations']} 個請求..."))
+        # 存取日誌以背景執行緒輸出，量測時停用避免大量輸出
+        with override_settings(DEBUG=False, ACCESS_LOG_ENABLED=False):
+            for name, role, method, path, payload in ENDPOINTS:
+                results["endpoints"][name] = self._measure(
+                    context["clients"][role],
+                    method,
+                    path.format(**context),
+                    self._format_payload(payload, context),
+                    options,
+                )
+                self.stdout.write(f"  {name}")
+        return results
+
+    def _seed(self, options):
+        """建立店家、會員、商品、錢包、交易紀錄與兌換紀錄"""
+        rng = random.Random(options["seed"])
+
+        User.objects.create_user(
+            username=f"{USERNAME_PREFIX}_admin",
+            email=f"{USERNAME_PREFIX}_admin@example.com",
+            password=None,
+            role=RoleChoices.ADMIN,
+        )
+        stores = self._bulk_create(
+            User,
+            (
+                User(username=f"{USERNAME_PREFIX}_store_{index}", email=f"{USERNAME_PREFIX}_store_{index}@example.com",
+                     role=RoleChoices.STORE, password="!")
+                for index in range(options["stores"])
+            ),
+        )
+        members = self._bulk_create(
+            User,
+            (
+                User(username=f"{USERNAME_PREFIX}_member_{index}", email=f"{USERNAME_PREFIX}_member_{index}@example.com",
+                     role=RoleChoices.MEMBER, password="!")
+                for index in range(options["members"])
+            ),
+        )
+        # 第一個商品供兌換端點使用，庫存足夠所有量測請求
+        products = self._bulk_create(
+            Product,
+            (
+                Product(
+                    store=stores[index % len(stores)],
+                    name=f"基準商品 {index}",
+                    memo=f"基準測試商品 {index}",
+                    required_points=1 if index == 0 else rng.randint(10, 1000),
+                    stock=1000000 if index == 0 else rng.randint(0, 500),
+                )
+                for index in range(options["products"])
+            ),
+        )
+
+        # 第一個會員為量測用的會員，餘額足夠所有兌換請求
+        self._bulk_create_sharded(
+            UserPoints,
+            (
+                UserPoints(user_id=member.id, balance=1000000000 if index == 0 else rng.randint(0, 100000))
+                for index, member in enumerate(members)
+            ),
+        )
+
+        # bulk_create 會以 auto_now_add 覆寫 created_at，建立期間暫時停用以分散建立時間
+        now = timezone.now()
+        for model in (PointTransaction, PointExchange):
+            model._meta.get_field("created_at").auto_now_add = False
+        try:
+            self._bulk_create_sharded(
+                PointTransaction,
+                (
+                    PointTransaction(
+                        user_id=members[index % len(members)].id,
+                        amount=rng.choice((100, 500, -100, -300)),
+                        tx_type=rng.choice(TransactionTypeChoices.values),
+                        balance_after=rng.randint(0, 100000),
+                        memo="基準測試",
+                        created_at=now - timedelta(seconds=options["transactions"] - index),
+                    )
+                    for index in range(options["transactions"])
+                ),
+            )
+            self._bulk_create_sharded(
+                PointExchange,
+                (
+                    PointExchange(
+                        user_id=members[index % len(members)].id,
+                        product_id=rng.choice(products).id,
+                        exchange_code=f"BE{index:012d}",
+                        quantity=1,
+                        points_spent=100,
+                        status=rng.choice(ExchangeStatusChoices.values),
+                        created_at=now - timedelta(seconds=options["exchanges"] - index),
+                    )
+                    for index in range(options["exchanges"])
+                ),
+            )
+        finally:
+            for model in (PointTransaction, PointExchange):
+                model._meta.get_field("created_at").auto_now_add = True
+
+        self._prepare_databases()
+
+    @staticmethod
+    def _bulk_create(model, objects):
+        """分批 bulk_create，回傳建立的物件"""
+        created, batch = [], []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= BATCH_SIZE:
+                created += model.objects.bulk_create(batch)
+                batch = []
+        created += model.objects.bulk_create(batch)
+        return created
+
+    @staticmethod
+    def _bulk_create_sharded(model, objects):
+        """依 user_id 分配到所屬分片後分批 bulk_create"""
+        batches = {}
+        for obj in objects:
+            alias = shard_for_user(obj.user_id)
+            batch = batches.setdefault(alias, [])
+            batch.append(obj)
+            if len(batch) >= BATCH_SIZE:
+                model.objects.using(alias).bulk_create(batch)
+                batches[alias] = []
+        for alias, batch in batches.items():
+            model.objects.using(alias).bulk_create(batch)
+
+    def _prepare_databases(self):
+        """設定分片序列並更新統計資訊（PostgreSQL）"""
+        if connections["default"].vendor != "postgresql":
+            return
+        if sharding_enabled():
+            call_command("configure_shard_sequences", stdout=self.stdout)
+        for alias in {"default", *shard_aliases()}:
+            with connections[alias].cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+    def _volumes(self):
+        """目前的資料量"""
+        return {
+            "products": Product.objects.count(),
+            "transactions": PointTransaction.objects.fan_out().count(),
+            "exchanges": PointExchange.objects.fan_out().count(),
+        }
+
+    def _context(self):
+        """量測用的使用者、client 與路徑參數"""
+        admin = User.objects.get(username=f"{USERNAME_PREFIX}_admin")
+        store = User.objects.get(username=f"{USERNAME_PREFIX}_store_0")
+        member = User.objects.get(username=f"{USERNAME_PREFIX}_member_0")
+        product = Product.objects.filter(store=store).order_by("id").first()
+        exchange = PointExchange.objects.for_user(member.id).filter(user=member).order_by("id").first()
+        if product is None or exchange is None:
+            raise CommandError("測試資料不足：需要至少一個商品與一筆兌換紀錄")
+
+        clients = {}
+        for role, user in (("admin", admin), ("store", store), ("member", member)):
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+            clients[role] = client
+        user_cache.clear()
+        return {"clients": clients, "product_id": product.id, "exchange_id": exchange.id}
+
+    @staticmethod
+    def _format_payload(payload, context):
+        if payload is None:
+            return None
+        return {
+            key: int(value.format(**context)) if isinstance(value, str) else value
+            for key, value in payload.items()
+        }
+
+    def _measure(self, client, method, path, payload, options):
+        """
+        對端點發送請求並量測
+
+        暖身請求不計入（填入 JWT 使用者快取等），查詢次數取量測請求中的最大值。
+        """
+        request = getattr(client, method)
+        kwargs = {"format": "json"} if payload is not None else {}
+
+        def call():
+            response = request(path, payload, **kwargs) if payload is not None else request(path)
+            if response.status_code >= 400:
+                raise CommandError(f"{method.upper()} {path} 失敗：{response.status_code} {response.content[:200]!r}")
+            return response
+
+        for _ in range(options["warmup"]):
+            call()
+
+        timings, queries = [], 0
+        for _ in range(options["iterations"]):
+            with track_queries() as stats:
+                started = time.perf_counter()
+                response = call()
+                timings.append(time.perf_counter() - started)
+            queries = max(queries, stats.count)
+
+        return {
+            "queries": queries,
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "bytes": len(response.content),
+        }
+
+    def _report(self, results):
+        volumes = results["volumes"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n結果（{results['database']}，商品 {volumes['products']}、"
+                f"交易紀錄 {volumes['transactions']}、兌換紀錄 {volumes['exchanges']}）："
+            )
+        )
+        self.stdout.write(f"  {'端點':<28}{'查詢':>6}{'p50 (ms)':>12}{'p95 (ms)':>12}{'bytes':>10}")
+        for name, result in results["endpoints"].items():
+            self.stdout.write(
+                f"  {name:<28}{result['queries']:>6}{result['p50_ms']:>12.2f}"
+                f"{result['p95_ms']:>12.2f}{result['bytes']:>10}"
+            )
+
+    def _check_baseline(self, results, options):
+        """與基準比較，或寫入基準"""
+        path = options["baseline"]
+        if options["save_baseline"]:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w") as baseline_file:
+                json.dump(results, baseline_file, ensure_ascii=False, indent=2)
+                baseline_file.write("\n")
+            self.stdout.write(self.style.SUCCESS(f"\n已寫入基準：{path}"))
+            return
+
+        if not os.path.exists(path):
+            self.stdout.write(self.style.WARNING(f"\n找不到基準檔案 {path}，以 --save-baseline 建立"))
+            return
+
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions, notes = compare_results(
+            results, baseline, options["latency_tolerance"], options["bytes_tolerance"]
+        )
+        for name, message in notes:
+            self.stdout.write(self.style.WARNING(f"  {name}：{message}"))
+        if regressions:
+            for name, message in regressions:
+                self.stdout.write(self.style.ERROR(f"  ✗ {name}：{message}"))
+            raise CommandError(f"{len(regressions)} 項回歸（基準：{path}）")
+        self.stdout.write(self.style.SUCCESS(f"\n與基準相比沒有回歸（{path}）"))
@@ -0,0 +1,107 @@
+"""
+比較完整與精簡中間件堆疊的每個請求開銷的 Django 管理指令
+
+使用方式：
+    python manage.py benchmark_middleware
+    python manage.py benchmark_middleware --requests 50000
+
+以同一個不查詢資料庫的 API view 測量兩種堆疊處理一個請求的時間：
+- 完整堆疊：session、CSRF、session 認證與 messages 使用 Django 原本的中間件
+- 精簡堆疊：目前的 MIDDLEWARE（API 請求略過上述中間件）
+差異即為 API 請求省下的中間件開銷；view、URL 解析與其餘中間件的時間兩者相同。
+"""
+
+import time
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from django.urls import path
+from django.utils.module_loading import import_string
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from config.middlewares import SkipApiPathMixin
+
+
+class BenchmarkView(APIView):
+    """不查詢資料庫的 API view"""
+
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        return Response({"ok": True})
+
+
+class BenchmarkUrlconf:
+    """測量用的 URLconf（request.urlconf），不影響專案的路由"""
+
+    urlpatterns = [path("api/benchmark/", BenchmarkView.as_view())]
+
+
+def full_middleware():
+    """將精簡版中間件換回 Django 原本中間件的 MIDDLEWARE"""
+    middleware = []
+    for middleware_path in settings.MIDDLEWARE:
+        middleware_class = import_string(middleware_path)
+        if issubclass(middleware_class, SkipApiPathMixin):
+            base = middleware_class.__bases__[-1]
+            middleware_path = f"{base.__module__}.{base.__qualname__}"
+        middleware.append(middleware_path)
+    return middleware
+
+
+class Command(BaseCommand):
+    help = "比較完整與精簡中間件堆疊處理 API 請求的開銷"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=20000,
+            help="每種堆疊的請求數量（預設：20000）",
+        )
+
+    def _measure(self, middleware, count):
+        """以指定的中間件堆疊處理 count 個請求，回傳每個請求的平均微秒數"""
+        with override_settings(MIDDLEWARE=middleware, DEBUG=False):
+            handler = BaseHandler()
+            handler.load_middleware()
+            factory = RequestFactory()
+
+            def call():
+                request = factory.get("/api/benchmark/")
+                request.urlconf = BenchmarkUrlconf
+                response = handler.get_response(request)
+                if response.status_code != 200:
+                    raise CommandError(f"測量用的請求失敗：{response.status_code}")
+
+            for _ in range(min(count, 500)):
+                call()
+
+            start = time.perf_counter()
+            for _ in range(count):
+                call()
+            return (time.perf_counter() - start) / count * 1_000_000
+
+    def handle(self, *args, **options):
+        """執行測量"""
+        count = options["requests"]
+        stacks = [
+            ("完整堆疊", full_middleware()),
+            ("精簡堆疊", list(settings.MIDDLEWARE)),
+        ]
+
+        self.stdout.write(self.style.SUCCESS(f"每種堆疊處理 {count} 個 API 請求..."))
+        results = {}
+        for name, middleware in stacks:
+            results[name] = self._measure(middleware, count)
+            self.stdout.write(f"  {name}：{results[name]:.1f} µs / 請求")
+
+        saved = results["完整堆疊"] - results["精簡堆疊"]
+        ratio = saved / results["完整堆疊"] * 100
+        self.stdout.write(
+            self.style.SUCCESS(f"\n每個 API 請求省下 {saved:.1f} µs（{ratio:.1f}%）")
+        )
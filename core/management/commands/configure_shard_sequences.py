@@ -0,0 +1,73 @@
+"""
+設定分片 ID 序列的 Django 管理指令
+
+使用方式：
+    python manage.py configure_shard_sequences
+    python manage.py configure_shard_sequences --dry-run
+
+分片模型的資料分散在多個資料庫，ID 需在所有分片中唯一（依 ID 查詢時會在各分片查詢）。
+此指令將每個分片的 ID 序列設定為：
+- 起始值：所有分片目前最大 ID + 1 + 分片序號（錯開）
+- 遞增值：分片數量
+之後各分片產生的 ID 互不重複。首次啟用分片、或分片數量變更並搬移資料後需執行一次（僅支援 PostgreSQL）。
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max
+from core.db.sharding import is_sharded_model, shard_aliases, sharding_enabled
+
+
+class Command(BaseCommand):
+    help = "設定各分片的 ID 序列，使分片模型的 ID 在所有分片中唯一"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="僅列出將執行的設定，不修改序列",
+        )
+
+    def handle(self, *args, **options):
+        """執行序列設定"""
+        if not sharding_enabled():
+            raise CommandError("未設定 DB_SHARD_HOSTS，不需要設定分片序列")
+
+        aliases = shard_aliases()
+        for alias in aliases:
+            if connections[alias].vendor != "postgresql":
+                raise CommandError(f"{alias} 不是 PostgreSQL，無法設定序列")
+
+        dry_run = options["dry_run"]
+        self.stdout.write(self.style.SUCCESS(f"開始設定 {len(aliases)} 個分片的 ID 序列..."))
+
+        for model in apps.get_models():
+            if not is_sharded_model(model):
+                continue
+
+            table = model._meta.db_table
+            column = model._meta.pk.column
+            max_id = max(
+                model._base_manager.using(alias).aggregate(max_id=Max("pk"))["max_id"] or 0
+                for alias in aliases
+            )
+
+            self.stdout.write(f"\n{table}（目前最大 ID：{max_id}）")
+            for index, alias in enumerate(aliases):
+                start = max_id + 1 + index
+                self.stdout.write(f"  {alias}：起始 {start}，遞增 {len(aliases)}")
+                if dry_run:
+                    continue
+
+                with connections[alias].cursor() as cursor:
+                    cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [table, column])
+                    sequence = cursor.fetchone()[0]
+                    cursor.execute(
+                        f"ALTER SEQUENCE {sequence} INCREMENT BY {len(aliases)} RESTART WITH {start}"
+                    )
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING("\n--dry-run：未修改序列"))
+        else:
+            self.stdout.write(self.style.SUCCESS("\n完成！各分片的 ID 序列已錯開"))
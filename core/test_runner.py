@@ -0,0 +1,31 @@
+"""
+測試執行器
+
+測試期間不輸出存取日誌（每個請求一行 JSON 會混在測試結果中），
+需要檢查存取日誌的測試以 assertLogs("access") 擷取。
+"""
+
+import logging
+
+from django.test.runner import DiscoverRunner
+
+# 測試期間不輸出的 logger
+SILENCED_LOGGERS = ("access",)
+
+
+class TestRunner(DiscoverRunner):
+    """不輸出存取日誌的 DiscoverRunner"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # 以 NullHandler 取代輸出的 handler（不停用 logger，assertLogs 仍可擷取）
+        self._silenced_handlers = {}
+        for name in SILENCED_LOGGERS:
+            logger = logging.getLogger(name)
+            self._silenced_handlers[name] = logger.handlers
+            logger.handlers = [logging.NullHandler()]
+
+    def teardown_test_environment(self, **kwargs):
+        for name, handlers in self._silenced_handlers.items():
+            logging.getLogger(name).handlers = handlers
+        super().teardown_test_environment(**kwargs)
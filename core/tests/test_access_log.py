@@ -0,0 +1,122 @@
+import io
+import json
+import logging
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices
+from utils.log_handlers import BackgroundStreamHandler, JsonFormatter
+from utils.metrics import Histogram, request_latency
+
+User = get_user_model()
+
+
+class AccessLogMiddlewareTestCase(APITestCase):
+    """
+    存取日誌中間件測試
+
+    測試存取日誌的欄位、2xx 抽樣與路由延遲直方圖
+    """
+
+    def setUp(self):
+        request_latency.reset()
+        self.member = User.objects.create_user(
+            username="member_access_log",
+            email="member_access_log@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+        token = RefreshToken.for_user(self.member).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_access_log_fields(self):
+        """測試紀錄路由樣板、狀態碼、處理時間、查詢次數與使用者身分"""
+        with self.assertLogs("access", level="INFO") as logs:
+            response = self.client.get("/api/users/me/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        fields = logs.records[0].fields
+        self.assertEqual(fields["method"], "GET")
+        self.assertEqual(fields["route"], "api/users/me/")
+        self.assertEqual(fields["status"], 200)
+        self.assertEqual(fields["role"], RoleChoices.MEMBER)
+        self.assertGreater(fields["db_queries"], 0)
+        self.assertGreater(fields["duration_ms"], 0)
+
+    @override_settings(ACCESS_LOG_SAMPLE_RATE_2XX=0)
+    def test_sampling_and_histogram(self):
+        """測試 2xx 依抽樣比例略過、其餘狀態碼照常記錄，直方圖計入所有請求"""
+        with self.assertNoLogs("access", level="INFO"):
+            self.client.get("/api/users/me/")
+
+        self.client.credentials()
+        with self.assertLogs("access", level="INFO") as logs:
+            self.client.get("/api/users/me/")
+            self.client.get("/api/not-exists/")
+
+        self.assertEqual([record.fields["status"] for record in logs.records], [401, 404])
+        self.assertEqual(logs.records[0].fields["role"], "anonymous")
+        self.assertEqual(logs.records[1].fields["route"], "<unmatched>")
+
+        snapshot = request_latency.snapshot()
+        self.assertEqual(snapshot[("GET", "api/users/me/")]["count"], 2)
+        self.assertEqual(snapshot[("GET", "<unmatched>")]["count"], 1)
+
+
+class AccessLogHandlerTestCase(SimpleTestCase):
+    """背景執行緒 handler 與直方圖測試"""
+
+    def _logger(self, handler):
+        logger = logging.getLogger("access.test")
+        logger.propagate = False
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        return logger
+
+    def test_background_handler_writes_json(self):
+        """測試背景執行緒輸出 JSON，停止時寫出剩餘紀錄"""
+        stream = io.StringIO()
+        handler = BackgroundStreamHandler(stream=stream)
+        handler.setFormatter(JsonFormatter())
+        logger = self._logger(handler)
+
+        for index in range(3):
+            logger.warning("entry %s", index, extra={"fields": {"route": "api/test/"}})
+        handler.stop()
+
+        entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([entry["message"] for entry in entries], ["entry 0", "entry 1", "entry 2"])
+        self.assertEqual(entries[0]["route"], "api/test/")
+        self.assertEqual(handler.dropped, 0)
+
+    def test_full_queue_drops(self):
+        """測試 queue 已滿時丟棄紀錄而不阻塞"""
+        handler = BackgroundStreamHandler(stream=io.StringIO(), maxsize=1)
+        logger = self._logger(handler)
+        handler._ensure_listener()
+        handler._listener.stop()
+
+        for index in range(5):
+            logger.warning("entry %s", index)
+
+        self.assertEqual(handler.dropped, 4)
+        handler._listener = None
+
+    def test_histogram_quantile(self):
+        """測試直方圖的區間計數與分位數估計"""
+        histogram = Histogram(
+            "test_seconds", "測試", labels=("route",), buckets=(0.1, 0.2, 0.4), registry=None
+        )
+        for value in (0.05, 0.05, 0.15, 0.3, 1.0):
+            histogram.observe(value, route="a")
+
+        series = histogram.snapshot()[("a",)]
+        self.assertEqual(series["counts"], [2, 1, 1, 1])
+        self.assertEqual(series["count"], 5)
+        self.assertAlmostEqual(series["sum"], 1.55)
+        self.assertAlmostEqual(histogram.quantile(0.5, route="a"), 0.15)
+        self.assertEqual(histogram.quantile(0.99, route="a"), 0.4)
+        self.assertIsNone(histogram.quantile(0.5, route="b"))
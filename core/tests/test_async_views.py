@@ -0,0 +1,130 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices
+from apps.users.views import MeView
+from apps.products.models import Product
+from apps.products.views import ProductViewSet
+from apps.points.models import PointExchange
+from apps.points.views import PointExchangeViewSet
+
+User = get_user_model()
+
+
+@override_settings(ASYNC_VIEWS_ENABLED=True)
+class AsyncViewsTestCase(APITestCase):
+    """
+    ASGI 模式 async view 測試
+
+    測試 async 版本的商品列表 / 詳情、MeView 與交換序號查詢的回應與同步版本相同，
+    以及未提供 async 版本的 handler（寫入）仍以同步流程執行
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.store = User.objects.create_user(
+            username="store_async",
+            email="store_async@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+        self.member = User.objects.create_user(
+            username="member_async",
+            email="member_async@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+        self.products = [
+            Product.objects.create(
+                store=self.store, name=f"非同步商品 {index}", required_points=100, stock=10
+            )
+            for index in range(3)
+        ]
+        self.exchange = PointExchange.objects.create(
+            user=self.member,
+            product=self.products[0],
+            exchange_code="EXASYNC0001",
+            quantity=1,
+            points_spent=100,
+        )
+        self.factory = AsyncRequestFactory()
+
+    def _headers(self, user):
+        return {"Authorization": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+    async def _call(self, view, path, data=None, user=None, method="get"):
+        headers = self._headers(user) if user else {}
+        request = getattr(self.factory, method)(path, data, headers=headers)
+        response = await view(request, **getattr(request, "view_kwargs", {}))
+        return response.render() if hasattr(response, "render") else response
+
+    async def test_product_list_and_retrieve(self):
+        """測試商品列表（含分頁）與詳情"""
+        list_view = ProductViewSet.as_view({"get": "list", "post": "create"})
+        detail_view = ProductViewSet.as_view({"get": "retrieve"})
+
+        response = await self._call(list_view, "/api/products/", {"page": 1, "size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["page"]["totalResources"], 3)
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]],
+            [self.products[2].id, self.products[1].id],
+        )
+
+        request = self.factory.get(f"/api/products/{self.products[0].id}/")
+        response = await detail_view(request, pk=self.products[0].id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "非同步商品 0")
+
+        request = self.factory.get("/api/products/0/")
+        response = await detail_view(request, pk=0)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_sync_handler_fallback(self):
+        """測試沒有 async 版本的 handler（建立商品）仍以同步流程執行，權限檢查照常"""
+        view = ProductViewSet.as_view({"get": "list", "post": "create"})
+        data = {"name": "新商品", "required_points": 10, "stock": 1}
+
+        request = self.factory.post("/api/products/", data, content_type="application/json")
+        response = await view(request)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        request = self.factory.post(
+            "/api/products/", data, content_type="application/json", headers=self._headers(self.store)
+        )
+        response = await view(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(await Product.objects.filter(name="新商品").aexists())
+
+    async def test_me(self):
+        """測試 MeView 回傳用戶資料與點數餘額"""
+        response = await self._call(MeView.as_view(), "/api/users/me/", user=self.member)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["username"], "member_async")
+        self.assertEqual(response.data["balance"], 0)
+
+        response = await self._call(MeView.as_view(), "/api/users/me/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_lookup_by_code(self):
+        """測試交換序號查詢（未命中快取與命中快取）與權限檢查"""
+        view = PointExchangeViewSet.as_view({"get": "lookup_by_code"})
+        path = "/api/points/exchanges/lookup-by-code/"
+
+        for _ in range(2):
+            response = await self._call(view, path, {"code": "EXASYNC0001"}, user=self.store)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["id"], self.exchange.id)
+
+        other = await User.objects.acreate(
+            username="store_async_other", email="store_async_other@test.com", role=RoleChoices.STORE
+        )
+        response = await self._call(view, path, {"code": "EXASYNC0001"}, user=other)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = await self._call(view, path, {"code": "EXNOTFOUND"}, user=self.store)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
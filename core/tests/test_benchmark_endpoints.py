@@ -0,0 +1,79 @@
+import copy
+from io import StringIO
+
+from django.core.cache import cache
+from django.test import TestCase
+from core.management.commands.benchmark_endpoints import ENDPOINTS, Command, compare_results
+
+
+class BenchmarkEndpointsTestCase(TestCase):
+    """
+    端點基準測試指令測試
+
+    以少量資料執行量測，並測試與基準比較時的回歸判斷
+    """
+
+    options = {
+        "transactions": 300,
+        "exchanges": 60,
+        "products": 20,
+        "stores": 2,
+        "members": 10,
+        "iterations": 3,
+        "warmup": 1,
+        "seed": 0,
+    }
+
+    def setUp(self):
+        cache.clear()
+
+    def test_run_benchmark(self):
+        """測試每個端點都有查詢次數、延遲與回應大小，且與自己比較沒有回歸"""
+        results = Command(stdout=StringIO()).run_benchmark(self.options)
+
+        self.assertEqual(set(results["endpoints"]), {endpoint[0] for endpoint in ENDPOINTS})
+        self.assertEqual(results["volumes"], {"products": 20, "transactions": 300, "exchanges": 60})
+        for name, result in results["endpoints"].items():
+            with self.subTest(endpoint=name):
+                self.assertGreater(result["queries"], 0)
+                self.assertGreater(result["bytes"], 0)
+                self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+
+        self.assertEqual(compare_results(results, results), ([], []))
+
+    def test_compare_results(self):
+        """測試查詢次數增加與回應大小超過容許比例視為回歸；資料量不同時不比較延遲"""
+        baseline = {
+            "database": "postgresql",
+            "shards": 0,
+            "volumes": {"products": 10000, "transactions": 1000000, "exchanges": 100000},
+            "endpoints": {
+                "products.list": {"queries": 2, "p50_ms": 4.0, "p95_ms": 6.0, "bytes": 2000},
+                "users.me": {"queries": 1, "p50_ms": 2.0, "p95_ms": 3.0, "bytes": 200},
+            },
+        }
+        results = copy.deepcopy(baseline)
+        results["volumes"]["exchanges"] += 50
+        results["endpoints"]["products.list"].update(queries=3, p95_ms=9.0)
+        results["endpoints"]["users.me"].update(p95_ms=10.0, bytes=260)
+
+        regressions, notes = compare_results(results, baseline)
+        self.assertEqual(
+            regressions,
+            [
+                ("products.list", "查詢次數 2 → 3"),
+                ("products.list", "p95 6.00 → 9.00 ms"),
+                ("users.me", "回應大小 200 → 260 bytes"),
+                ("users.me", "p95 3.00 → 10.00 ms"),
+            ],
+        )
+        self.assertEqual(notes, [])
+
+        results["volumes"]["exchanges"] = 10
+        regressions, notes = compare_results(results, baseline)
+        self.assertEqual([name for name, _ in regressions], ["products.list", "users.me"])
+        self.assertEqual(notes[0][0], "*")
+
+        results["shards"] = 2
+        regressions, notes = compare_results(results, baseline)
+        self.assertEqual(regressions, [("users.me", "回應大小 200 → 260 bytes")])
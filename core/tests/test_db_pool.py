@@ -0,0 +1,249 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from psycopg2 import ProgrammingError, extensions
+from apps.users.models import RoleChoices
+from core.db.backends.postgresql.base import _check_connection, _reset_connection
+from core.db.pool import ConnectionPool, PoolTimeout
+
+User = get_user_model()
+
+
+class FakeConnection:
+    """記錄狀態的測試用連線"""
+
+    def __init__(self):
+        self.closed = False
+        self.healthy = True
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakePsycopgConnection:
+    """模擬 psycopg2 連線的交易狀態：非 autocommit 時查詢會開啟交易，交易中不可切換 autocommit"""
+
+    def __init__(self):
+        self.closed = False
+        self._autocommit = True
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    @property
+    def autocommit(self):
+        return self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        if self.status != extensions.TRANSACTION_STATUS_IDLE:
+            raise ProgrammingError("set_session cannot be used inside a transaction")
+        self._autocommit = value
+
+    def get_transaction_status(self):
+        return self.status
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def execute(self, sql):
+                if not connection.autocommit:
+                    connection.status = extensions.TRANSACTION_STATUS_INTRANS
+
+        return Cursor()
+
+    def rollback(self):
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    """
+    連線池測試
+
+    測試沿用連線、上限與逾時、健康檢查、最長存活時間、閒置回收與歸還時重設
+    """
+
+    def setUp(self):
+        self.timer = FakeTimer()
+        self.connections = []
+
+    def _pool(self, **kwargs):
+        def connect():
+            connection = FakeConnection()
+            self.connections.append(connection)
+            return connection
+
+        def reset(connection):
+            connection.in_transaction = False
+            return not connection.closed
+
+        options = {"max_size": 2, "timeout": 0, "max_lifetime": 100, "max_idle": 50, "check_after": 10}
+        options.update(kwargs)
+        return ConnectionPool(
+            connect=connect,
+            close=FakeConnection.close,
+            check=lambda connection: connection.healthy,
+            reset=reset,
+            timer=self.timer,
+            **options,
+        )
+
+    def test_reuse_and_limit(self):
+        """測試歸還的連線會被沿用，達上限時逾時"""
+        pool = self._pool()
+
+        first, reused = pool.checkout()
+        self.assertFalse(reused)
+        pool.checkin(first)
+        again, reused = pool.checkout()
+        self.assertIs(again, first)
+        self.assertTrue(reused)
+
+        pool.checkout()
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+        stats = pool.stats()
+        self.assertEqual((stats["created"], stats["in_use"], stats["timeouts"]), (2, 2, 1))
+
+    def test_waiting_checkout_gets_returned_connection(self):
+        """測試連線池已滿時等待其他執行緒歸還"""
+        pool = self._pool(max_size=1, timeout=5)
+        pool._timer = time.monotonic
+        connection, _reused = pool.checkout()
+        result = {}
+
+        thread = threading.Thread(target=lambda: result.setdefault("connection", pool.checkout()[0]))
+        thread.start()
+        pool.checkin(connection)
+        thread.join(5)
+
+        self.assertIs(result["connection"], connection)
+        self.assertEqual(pool.stats()["created"], 1)
+
+    def test_health_check_and_lifetime(self):
+        """測試閒置過久時健康檢查失敗的連線與超過存活時間的連線會被關閉"""
+        pool = self._pool()
+        connection, _reused = pool.checkout()
+        pool.checkin(connection)
+
+        connection.healthy = False
+        self.timer.now = 20
+        replacement, reused = pool.checkout()
+        self.assertFalse(reused)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()["health_check_failures"], 1)
+
+        self.timer.now = 200
+        pool.checkin(replacement)
+        self.assertTrue(replacement.closed)
+
+    def test_idle_reaping_and_close_all(self):
+        """測試閒置過久的連線在歸還時被回收，close_all 關閉閒置連線並讓使用中的連線歸還時關閉"""
+        pool = self._pool()
+        first, _reused = pool.checkout()
+        second, _reused = pool.checkout()
+        pool.checkin(first)
+
+        self.timer.now = 60
+        pool.checkin(second)
+        self.assertTrue(first.closed)
+        self.assertFalse(second.closed)
+
+        third, _reused = pool.checkout()
+        pool.close_all()
+        pool.checkin(third)
+        self.assertTrue(third.closed)
+        self.assertEqual(pool.stats()["size"], 0)
+
+
+class PostgreSQLConnectionResetTestCase(SimpleTestCase):
+    """PostgreSQL backend 的歸還重設與健康檢查測試"""
+
+    def test_connection_returned_without_autocommit(self):
+        """測試以 autocommit=False 歸還的連線在下次取出（含健康檢查）後可再設定 autocommit"""
+        timer = FakeTimer()
+        pool = ConnectionPool(
+            connect=FakePsycopgConnection,
+            close=FakePsycopgConnection.close,
+            check=_check_connection,
+            reset=_reset_connection,
+            max_size=1,
+            timeout=0,
+            max_lifetime=100,
+            max_idle=50,
+            check_after=10,
+            timer=timer,
+        )
+        connection, _reused = pool.checkout()
+        connection.autocommit = False
+        pool.checkin(connection)
+        self.assertTrue(connection.autocommit)
+
+        timer.now = 20
+        again, reused = pool.checkout()
+        self.assertIs(again, connection)
+        self.assertTrue(reused)
+        again.autocommit = True
+        self.assertEqual(again.get_transaction_status(), extensions.TRANSACTION_STATUS_IDLE)
+
+    def test_health_check_leaves_no_transaction(self):
+        """測試非 autocommit 的連線在健康檢查後不留下開啟的交易"""
+        connection = FakePsycopgConnection()
+        connection.autocommit = False
+
+        self.assertTrue(_check_connection(connection))
+        self.assertEqual(connection.get_transaction_status(), extensions.TRANSACTION_STATUS_IDLE)
+        connection.autocommit = True
+
+    def test_reset_rolls_back_open_transaction(self):
+        """測試歸還時回滾交易並恢復 autocommit"""
+        connection = FakePsycopgConnection()
+        connection.autocommit = False
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+        self.assertTrue(_reset_connection(connection))
+        self.assertTrue(connection.autocommit)
+        self.assertEqual(connection.get_transaction_status(), extensions.TRANSACTION_STATUS_IDLE)
+
+
+class DatabasePoolStatsTestCase(APITestCase):
+    """測試連線池統計 API 僅限管理者"""
+
+    def test_admin_only(self):
+        member = User.objects.create_user(
+            username="member_pool", email="member_pool@test.com", password="testpass123", role=RoleChoices.MEMBER
+        )
+        admin = User.objects.create_user(
+            username="admin_pool", email="admin_pool@test.com", password="testpass123", role=RoleChoices.ADMIN
+        )
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(member).access_token}")
+        self.assertEqual(self.client.get("/api/system/db-pool/").status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(admin).access_token}")
+        response = self.client.get("/api/system/db-pool/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("pools", response.data)
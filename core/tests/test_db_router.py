@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices
+from config.middlewares import ReplicaRoutingMiddleware
+from core.db.routers import PrimaryReplicaRouter, current_replica, read_from
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], DB_REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTestCase(TransactionTestCase):
+    """
+    讀寫分離路由測試
+
+    測試安全方法使用副本、寫入與交易使用主資料庫，以及寫入後固定讀取主資料庫
+    （使用 TransactionTestCase：TestCase 會將每個測試包在交易中，讀取一律使用主資料庫）
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.member = User.objects.create_user(
+            username="member_replica",
+            email="member_replica@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        self.token = str(RefreshToken.for_user(self.member).access_token)
+
+    def _route(self, method, status_code=200, authenticated=True):
+        """以中間件處理請求，回傳請求中選定的副本"""
+        seen = {}
+
+        def get_response(request):
+            seen["alias"] = current_replica()
+            return HttpResponse(status=status_code)
+
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {self.token}"} if authenticated else {}
+        request = getattr(self.factory, method)("/api/users/me/", **headers)
+        ReplicaRoutingMiddleware(get_response)(request)
+        return seen["alias"]
+
+    def test_router(self):
+        """測試讀取依選定的副本、交易中與寫入使用主資料庫"""
+        self.assertEqual(self.router.db_for_read(User), DEFAULT_DB_ALIAS)
+        with read_from("replica_1"):
+            self.assertEqual(self.router.db_for_read(User), "replica_1")
+            self.assertEqual(self.router.db_for_write(User), DEFAULT_DB_ALIAS)
+            with transaction.atomic():
+                self.assertEqual(self.router.db_for_read(User), DEFAULT_DB_ALIAS)
+        self.assertFalse(self.router.allow_migrate("replica_1", "users"))
+
+    def test_safe_methods_use_replica(self):
+        """測試 GET 使用副本、POST 使用主資料庫"""
+        self.assertEqual(self._route("get", authenticated=False), "replica_1")
+        self.assertEqual(self._route("get"), "replica_1")
+        self.assertIsNone(self._route("post", status_code=400))
+
+    def test_pinned_to_primary_after_write(self):
+        """測試寫入成功後同一使用者的讀取使用主資料庫，失敗的寫入不影響"""
+        self._route("post", status_code=400)
+        self.assertEqual(self._route("get"), "replica_1")
+
+        self._route("post", status_code=201)
+        self.assertIsNone(self._route("get"))
+        self.assertEqual(self._route("get", authenticated=False), "replica_1")
@@ -0,0 +1,172 @@
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.authentication import user_cache, user_cache_requests
+from apps.users.models import RoleChoices, UserPoints
+from apps.products.models import Product
+from apps.points.metrics import deposit_requests, exchange_requests, lock_wait
+from utils.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+User = get_user_model()
+
+
+class MetricsEndpointTestCase(APITestCase):
+    """
+    /metrics 測試
+
+    測試兌換、儲值與 JWT 使用者快取的指標，以及 Prometheus 文字格式輸出與存取權杖
+    """
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.member = User.objects.create_user(
+            username="member_metrics",
+            email="member_metrics@test.com",
+            password="testpass123",
+            role=RoleChoices.MEMBER,
+        )
+        self.store = User.objects.create_user(
+            username="store_metrics",
+            email="store_metrics@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+        UserPoints.objects.filter(user=self.member).update(balance=150)
+        self.product = Product.objects.create(
+            store=self.store, name="指標商品", required_points=100, stock=1
+        )
+        token = RefreshToken.for_user(self.member).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    @staticmethod
+    def _count(counter, **labels):
+        return counter.series().get(tuple(str(labels[name]) for name in counter.labels), 0)
+
+    def test_exchange_and_deposit_metrics(self):
+        """測試兌換與儲值依結果累計，並記錄鎖定時間"""
+        before = {
+            result: self._count(exchange_requests, result=result)
+            for result in ("success", "out_of_stock", "invalid")
+        }
+        wallet_locks = lock_wait.series().get(("exchange", "wallet"), {"count": 0})["count"]
+        deposits = self._count(deposit_requests, result="success")
+
+        url = "/api/points/exchange/"
+        self.client.post(url, {"product_id": self.product.id}, format="json")
+        self.client.post(url, {"product_id": self.product.id}, format="json")
+        self.client.post(url, {"product_id": 0}, format="json")
+        self.client.post(url, {}, format="json")
+        self.client.post("/api/points/deposit/", {"amount": 100}, format="json")
+
+        self.assertEqual(self._count(exchange_requests, result="success"), before["success"] + 1)
+        self.assertEqual(
+            self._count(exchange_requests, result="out_of_stock"), before["out_of_stock"] + 1
+        )
+        self.assertEqual(self._count(exchange_requests, result="invalid"), before["invalid"] + 2)
+        self.assertEqual(
+            lock_wait.series()[("exchange", "wallet")]["count"], wallet_locks + 1
+        )
+        self.assertEqual(self._count(deposit_requests, result="success"), deposits + 1)
+
+        with override_settings(DEBUG=True):
+            response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn("# TYPE points_exchange_requests_total counter", body)
+        self.assertIn('points_exchange_requests_total{result="out_of_stock"}', body)
+        self.assertIn('points_exchange_duration_seconds_bucket{result="success",le="+Inf"}', body)
+        self.assertIn('points_lock_wait_seconds_count{operation="exchange",resource="product"}', body)
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+
+    def test_user_cache_metrics(self):
+        """測試 JWT 使用者快取命中與未命中"""
+        hits = self._count(user_cache_requests, result="hit")
+        misses = self._count(user_cache_requests, result="miss")
+
+        self.client.get("/api/users/me/")
+        self.client.get("/api/users/me/")
+
+        self.assertEqual(self._count(user_cache_requests, result="miss"), misses + 1)
+        self.assertEqual(self._count(user_cache_requests, result="hit"), hits + 1)
+
+    @override_settings(METRICS_AUTH_TOKEN="metrics-secret")
+    def test_metrics_token(self):
+        """測試設定存取權杖時需帶正確的權杖"""
+        self.client.credentials()
+        self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer metrics-secret")
+        self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_AUTH_TOKEN="")
+    def test_metrics_without_token_only_in_debug(self):
+        """測試未設定存取權杖時僅 DEBUG 可存取"""
+        self.client.credentials()
+        with override_settings(DEBUG=False):
+            self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_403_FORBIDDEN)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_200_OK)
+
+
+class MultiprocessMetricsTestCase(SimpleTestCase):
+    """多行程指標合併測試（以另一個行程的指標檔案模擬其他 worker）"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.registry = MetricsRegistry()
+        self.counter = Counter("test_requests_total", "測試", labels=("result",), registry=self.registry)
+        self.gauge = Gauge("test_connections", "測試", registry=self.registry)
+        self.histogram = Histogram("test_seconds", "測試", buckets=(0.1, 1.0), registry=self.registry)
+
+    def _write_other_process(self, pid):
+        data = {
+            "pid": pid,
+            "metrics": {
+                "test_requests_total": {
+                    "kind": "counter", "description": "測試", "labels": ["result"], "buckets": None,
+                    "series": [[["success"], 3]],
+                },
+                "test_connections": {
+                    "kind": "gauge", "description": "測試", "labels": [], "buckets": None,
+                    "series": [[[], 7]],
+                },
+                "test_seconds": {
+                    "kind": "histogram", "description": "測試", "labels": [], "buckets": [0.1, 1.0],
+                    "series": [[[], {"counts": [1, 0, 1], "count": 2, "sum": 5.05}]],
+                },
+            },
+        }
+        with open(os.path.join(self.directory.name, f"metrics_{pid}.json"), "w") as metrics_file:
+            json.dump(data, metrics_file)
+
+    def test_merge_processes(self):
+        """測試 Counter 與 Histogram 相加（包含已結束的行程），Gauge 只保留執行中的行程"""
+        self.counter.inc(result="success")
+        self.gauge.set(2)
+        self.histogram.observe(0.5)
+
+        with override_settings(METRICS_DIR=self.directory.name):
+            self._write_other_process(os.getppid())
+            self._write_other_process(2 ** 22 + 1)
+            body = self.registry.render()
+
+        pid = os.getpid()
+        self.assertIn('test_requests_total{result="success"} 7', body)
+        self.assertIn(f'test_connections{{pid="{pid}"}} 2', body)
+        self.assertIn(f'test_connections{{pid="{os.getppid()}"}} 7', body)
+        self.assertNotIn(f'pid="{2 ** 22 + 1}"', body)
+        self.assertIn('test_seconds_bucket{le="0.1"} 2', body)
+        self.assertIn('test_seconds_bucket{le="1.0"} 3', body)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 5', body)
+        self.assertIn("test_seconds_count 5", body)
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, f"metrics_{pid}.json")))
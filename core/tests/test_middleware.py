@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.test import Client
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.users.models import RoleChoices
+
+User = get_user_model()
+
+
+class LeanApiMiddlewareTestCase(APITestCase):
+    """
+    API 精簡中間件測試
+
+    測試 API 請求略過 session、CSRF、session 認證與 messages 中間件，
+    後台（/admin/）維持完整流程（session 登入與 CSRF 檢查）
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="admin_middleware",
+            email="admin_middleware@test.com",
+            password="testpass123",
+            role=RoleChoices.ADMIN,
+        )
+
+    def test_api_request_skips_session_stack(self):
+        """測試 API 請求沒有 session 與 CSRF cookie，JWT 認證照常"""
+        response = self.client.get("/api/products/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        self.assertNotIn("csrftoken", response.cookies)
+        self.assertNotIn("sessionid", response.cookies)
+
+        response = self.client.post(
+            "/api/auth/token/",
+            {"username": "admin_middleware", "password": "testpass123"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("sessionid", response.cookies)
+
+    def test_admin_keeps_session_and_csrf(self):
+        """測試後台仍檢查 CSRF，並以 session 登入"""
+        client = Client(enforce_csrf_checks=True)
+        data = {"username": "admin_middleware", "password": "testpass123"}
+
+        response = client.post("/admin/login/", data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = client.get("/admin/login/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data["csrfmiddlewaretoken"] = response.cookies["csrftoken"].value
+
+        response = client.post("/admin/login/", data)
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertIn("sessionid", response.cookies)
+        self.assertEqual(client.get("/admin/").status_code, status.HTTP_200_OK)
@@ -0,0 +1,142 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.authentication import user_cache
+from apps.users.models import RoleChoices
+from apps.products.models import Product
+from apps.points.models import PointExchange
+from apps.points.views import PointExchangeViewSet
+from config.middlewares import QueryBudgetExceeded
+
+User = get_user_model()
+
+
+class ServerTimingTestCase(APITestCase):
+    """
+    Server-Timing 與查詢預算測試
+
+    測試 Server-Timing 標頭的各階段耗時，以及各 view 宣告的查詢預算
+    （QUERY_BUDGET_STRICT=True 時超過預算拋出例外，發現 N+1 查詢）
+    """
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.store = User.objects.create_user(
+            username="store_timing",
+            email="store_timing@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+        self.admin = User.objects.create_user(
+            username="admin_timing",
+            email="admin_timing@test.com",
+            password="testpass123",
+            role=RoleChoices.ADMIN,
+        )
+        self.members = [
+            User.objects.create_user(
+                username=f"member_timing_{index}",
+                email=f"member_timing_{index}@test.com",
+                password="testpass123",
+                role=RoleChoices.MEMBER,
+            )
+            for index in range(3)
+        ]
+        self.products = [
+            Product.objects.create(store=self.store, name=f"計時商品 {index}", required_points=10, stock=10)
+            for index in range(3)
+        ]
+        self.exchanges = [
+            PointExchange.objects.create(
+                user=self.members[index % 3],
+                product=self.products[index % 3],
+                exchange_code=f"EXTIMING{index:04d}",
+                quantity=1,
+                points_spent=10,
+            )
+            for index in range(12)
+        ]
+
+    def _authenticate(self, user):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    @staticmethod
+    def _timings(response):
+        entries = {}
+        for entry in response["Server-Timing"].split(", "):
+            name, *params = entry.split(";")
+            entries[name] = dict(param.split("=", 1) for param in params)
+        return entries
+
+    @override_settings(SERVER_TIMING_ENABLED=True)
+    def test_server_timing_header(self):
+        """測試回傳資料庫、認證、serializer、render 與總耗時"""
+        self._authenticate(self.store)
+
+        response = self.client.get("/api/points/exchanges/?page=1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timings = self._timings(response)
+        self.assertEqual(set(timings), {"db", "auth", "serialize", "render", "total"})
+        self.assertEqual(timings["db"]["desc"], '"3 queries"')
+        self.assertGreaterEqual(float(timings["total"]["dur"]), float(timings["render"]["dur"]))
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_server_timing_disabled(self):
+        """測試停用時僅 ADMIN 的請求回傳標頭"""
+        response = self.client.get("/api/products/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Server-Timing", response)
+
+        self._authenticate(self.store)
+        response = self.client.get("/api/products/")
+        self.assertNotIn("Server-Timing", response)
+
+        self._authenticate(self.admin)
+        response = self.client.get("/api/products/")
+        self.assertIn("Server-Timing", response)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_views_within_query_budget(self):
+        """測試各角色的查詢都在 view 宣告的預算內（筆數增加時查詢次數不變）"""
+        exchange = self.exchanges[0]
+        urls = [
+            "/api/points/exchanges/",
+            "/api/points/exchanges/?page=1&size=5",
+            "/api/points/exchanges/?page=1&sideload=true",
+            f"/api/points/exchanges/{exchange.id}/",
+            f"/api/points/exchanges/{exchange.id}/signed-code/",
+            "/api/points/exchanges/stats/",
+            f"/api/points/exchanges/lookup-by-code/?code={exchange.exchange_code}",
+            "/api/products/?page=1",
+            f"/api/products/{self.products[0].id}/",
+        ]
+        for user in (exchange.user, self.store, self.admin):
+            user_cache.clear()
+            self._authenticate(user)
+            for url in urls:
+                with self.subTest(role=user.role, url=url):
+                    response = self.client.get(url)
+                    self.assertLess(response.status_code, 500)
+
+    def test_query_budget_exceeded(self):
+        """測試超過預算時寫入警告日誌，嚴格模式下拋出例外"""
+        self._authenticate(self.admin)
+
+        with mock.patch.object(PointExchangeViewSet, "query_budget", {"list": 1}):
+            with self.assertLogs("query_budget", level="WARNING") as logs:
+                response = self.client.get("/api/points/exchanges/?page=1")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(logs.records[0].fields["query_budget"], 1)
+            self.assertEqual(logs.records[0].fields["db_queries"], 3)
+
+            with override_settings(QUERY_BUDGET_STRICT=True):
+                with self.assertRaises(QueryBudgetExceeded):
+                    self.client.get("/api/points/exchanges/?page=1")
@@ -0,0 +1,274 @@
+from collections import Counter
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.request import Request
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.users.models import RoleChoices, UserPoints
+from apps.products.models import Product
+from apps.points.models import PointExchange, PointTransaction, TransactionTypeChoices
+from core.db.routers import ShardRouter
+from apps.points.views import PointExchangeViewSet
+from core.db.sharding import FanOutQuerySet, jump_hash, shard_for_user
+from utils.filters import ShardedSearchFilter
+
+User = get_user_model()
+
+SHARDS = ["shard_0", "shard_1", "shard_2"]
+
+
+class ShardingTestCase(SimpleTestCase):
+    """
+    分片路由測試
+
+    測試 jump consistent hash 的分配、分片路由與分片查詢的 select_related 轉換
+    （僅檢查路由結果，不連線分片資料庫）
+    """
+
+    def test_jump_hash_distribution(self):
+        """測試分片結果穩定且平均，分片數增加時只有部分 key 移到新分片"""
+        keys = range(1, 10001)
+        before = [jump_hash(key, 4) for key in keys]
+        after = [jump_hash(key, 5) for key in keys]
+
+        self.assertEqual(before, [jump_hash(key, 4) for key in keys])
+        self.assertEqual(set(before), {0, 1, 2, 3})
+        self.assertLess(max(Counter(before).values()) - min(Counter(before).values()), 500)
+
+        moved = [(old, new) for old, new in zip(before, after) if old != new]
+        self.assertTrue(all(new == 4 for old, new in moved))
+        self.assertAlmostEqual(len(moved) / len(keys), 1 / 5, delta=0.03)
+
+    @override_settings(DATABASE_SHARDS=[])
+    def test_shard_for_user_without_shards(self):
+        """測試未啟用分片時使用 default"""
+        self.assertEqual(shard_for_user(42), DEFAULT_DB_ALIAS)
+
+    @override_settings(DATABASE_SHARDS=SHARDS)
+    def test_router(self):
+        """測試分片模型依 user_id 路由，由分片資料取得的商品與使用者使用 default"""
+        router = ShardRouter()
+        user = User(pk=42, username="member_shard")
+        shard = shard_for_user(42)
+        exchange = PointExchange(user=user, product=Product(pk=1, store_id=7))
+
+        self.assertIn(shard, SHARDS)
+        self.assertEqual(exchange._state.db, shard)
+        self.assertEqual(router.db_for_write(PointExchange, instance=exchange), shard)
+        self.assertEqual(router.db_for_read(UserPoints, instance=user), shard)
+        self.assertEqual(router.db_for_read(PointTransaction, instance=exchange), shard)
+        self.assertEqual(router.db_for_read(Product, instance=exchange), DEFAULT_DB_ALIAS)
+        self.assertIsNone(router.db_for_read(PointExchange))
+        self.assertIsNone(router.db_for_read(Product, instance=Product(pk=1)))
+        self.assertTrue(router.allow_relation(exchange, user))
+        self.assertIsNone(router.allow_migrate(shard, "points", model_name="pointexchange"))
+        self.assertFalse(router.allow_migrate(shard, "points"))
+
+    @override_settings(DATABASE_SHARDS=SHARDS)
+    def test_on_shard_prefetches_catalog(self):
+        """測試分片查詢將 select_related 改為 prefetch_related"""
+        queryset = PointExchange.objects.select_related("user", "product__store").for_user(42)
+
+        self.assertEqual(queryset.db, shard_for_user(42))
+        self.assertTrue(queryset.is_pinned)
+        self.assertFalse(queryset.query.select_related)
+        self.assertEqual(
+            set(queryset._prefetch_related_lookups), {"user", "product", "product__store"}
+        )
+        self.assertEqual(len(PointExchange.objects.all().fan_out().querysets), len(SHARDS))
+
+
+@override_settings(DATABASE_SHARDS=[])
+class FanOutQuerySetTestCase(TransactionTestCase):
+    """
+    分片合併查詢測試
+
+    以 default 上依 user 切分的兩個查詢模擬兩個分片，測試合併結果與單一查詢相同
+    """
+
+    def setUp(self):
+        self.members = [
+            User.objects.create_user(
+                username=f"member_fan_out_{index}",
+                email=f"member_fan_out_{index}@test.com",
+                password="testpass123",
+                role=RoleChoices.MEMBER,
+            )
+            for index in range(2)
+        ]
+        for index in range(7):
+            PointTransaction.objects.create(
+                user=self.members[index % 2],
+                amount=(index * 37) % 11 + 1,
+                tx_type=TransactionTypeChoices.DEPOSIT,
+                balance_after=0,
+            )
+
+        self.expected = list(PointTransaction.objects.order_by("-amount", "id"))
+        self.fan_out = FanOutQuerySet(
+            PointTransaction.objects.filter(user=member).order_by("-amount", "id")
+            for member in self.members
+        )
+
+    def test_merge(self):
+        """測試筆數、切片、迭代與 get"""
+        self.assertEqual(self.fan_out.count(), 7)
+        self.assertEqual(self.fan_out[0:3], self.expected[0:3])
+        self.assertEqual(self.fan_out[3:6], self.expected[3:6])
+        self.assertEqual(self.fan_out[6], self.expected[6])
+        self.assertEqual(list(self.fan_out), self.expected)
+        self.assertEqual(self.fan_out.get(pk=self.expected[4].pk), self.expected[4])
+        with self.assertRaises(PointTransaction.DoesNotExist):
+            self.fan_out.get(pk=0)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class ShardedSearchFilterTestCase(TestCase):
+    """
+    分片模型搜尋測試
+
+    啟用分片時關聯欄位（user__username、product__name）先在主資料庫解析為 id，
+    分片上的查詢不 JOIN 使用者與商品（以 default 執行解析後的查詢驗證結果）
+    """
+
+    def setUp(self):
+        store = User.objects.create_user(
+            username="store_search",
+            email="store_search@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+        self.members = [
+            User.objects.create_user(
+                username=f"member_search_{name}",
+                email=f"member_search_{name}@test.com",
+                password="testpass123",
+                role=RoleChoices.MEMBER,
+            )
+            for name in ("alice", "bob")
+        ]
+        self.products = [
+            Product.objects.create(store=store, name=name, required_points=10, stock=10)
+            for name in ("咖啡兌換券", "蛋糕兌換券")
+        ]
+        self.exchanges = [
+            PointExchange.objects.create(
+                user=member,
+                product=product,
+                exchange_code=f"EXSEARCH{index}",
+                quantity=1,
+                points_spent=10,
+            )
+            for index, (member, product) in enumerate(
+                [(member, product) for member in self.members for product in self.products]
+            )
+        ]
+
+    def _search(self, term):
+        request = Request(APIRequestFactory().get("/api/points/exchanges/", {"search": term}))
+        return ShardedSearchFilter().filter_queryset(
+            request, PointExchange.objects.all(), PointExchangeViewSet()
+        )
+
+    def test_search_related_fields_without_join(self):
+        """測試關聯欄位以 <外鍵>_id__in 篩選，結果與未分片時相同"""
+        for term in ("alice", "咖啡", "bob 蛋糕", "EXSEARCH3", "不存在"):
+            with self.subTest(term=term):
+                expected = set(self._search(term))
+                with override_settings(DATABASE_SHARDS=SHARDS):
+                    queryset = self._search(term)
+                    self.assertNotIn("JOIN", str(queryset.query))
+                    self.assertEqual(set(queryset.using(DEFAULT_DB_ALIAS)), expected)
+
+        self.assertEqual(expected, set())
+        self.assertEqual(set(self._search("bob 蛋糕")), {self.exchanges[3]})
+
+
+@skipUnless(len(settings.DATABASE_SHARDS) >= 2, "需要至少兩個分片（設定 DB_SHARD_HOSTS）")
+class CrossShardExchangeTestCase(APITransactionTestCase):
+    """
+    跨分片儲值與兌換測試（需要設定 DB_SHARD_HOSTS 的兩個以上分片）
+
+    測試錢包、交易與兌換紀錄寫入會員所屬的分片、庫存留在 default，
+    以及分片提交後 default 提交失敗時的補償（退回點數、刪除兌換紀錄、交易紀錄標記為失敗）
+    """
+
+    databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_SHARDS}
+
+    def setUp(self):
+        self.store = User.objects.create_user(
+            username="store_cross_shard",
+            email="store_cross_shard@test.com",
+            password="testpass123",
+            role=RoleChoices.STORE,
+        )
+        self.product = Product.objects.create(
+            store=self.store, name="跨分片商品", required_points=30, stock=5
+        )
+
+        # 建立分屬兩個分片的會員
+        self.members = {}
+        index = 0
+        while len(self.members) < 2:
+            member = User.objects.create_user(
+                username=f"member_cross_shard_{index}",
+                email=f"member_cross_shard_{index}@test.com",
+                password="testpass123",
+                role=RoleChoices.MEMBER,
+            )
+            self.members.setdefault(shard_for_user(member.id), member)
+            index += 1
+
+    def _post(self, member, url, data):
+        token = RefreshToken.for_user(member).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return self.client.post(url, data, format="json")
+
+    def _balance(self, member):
+        return UserPoints.objects.for_user(member.id).get(user_id=member.id).balance
+
+    def test_deposit_and_exchange_on_member_shard(self):
+        """測試儲值與兌換寫入會員所屬的分片，庫存由 default 扣除"""
+        for shard, member in self.members.items():
+            with self.subTest(shard=shard):
+                response = self._post(member, "/api/points/deposit/", {"amount": 100})
+                self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+                response = self._post(
+                    member, "/api/points/exchange/", {"product_id": self.product.id, "quantity": 2}
+                )
+                self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+                self.assertEqual(self._balance(member), 40)
+                for alias in settings.DATABASE_SHARDS:
+                    expected = 1 if alias == shard else 0
+                    exchanges = PointExchange.objects.on_shard(alias).filter(user_id=member.id)
+                    self.assertEqual(exchanges.count(), expected)
+                    transactions = PointTransaction.objects.on_shard(alias).filter(user_id=member.id)
+                    self.assertEqual(transactions.count(), 2 * expected)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+
+    def test_default_commit_failure_compensates_shard(self):
+        """測試分片已提交、default 提交失敗時退回點數、刪除兌換紀錄並將交易紀錄標記為失敗"""
+        shard, member = next(iter(self.members.items()))
+        self._post(member, "/api/points/deposit/", {"amount": 100})
+
+        commit_error = DatabaseError("default commit failed")
+        with mock.patch.object(connections[DEFAULT_DB_ALIAS], "commit", side_effect=commit_error):
+            with self.assertRaises(DatabaseError):
+                self._post(member, "/api/points/exchange/", {"product_id": self.product.id})
+
+        self.assertEqual(self._balance(member), 100)
+        self.assertFalse(PointExchange.objects.on_shard(shard).filter(user_id=member.id).exists())
+        redemption = PointTransaction.objects.on_shard(shard).get(
+            user_id=member.id, tx_type=TransactionTypeChoices.REDEMPTION
+        )
+        self.assertFalse(redemption.is_success)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 5)
@@ -0,0 +1,52 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from drf_spectacular.utils import extend_schema
+from rest_framework.response import Response
+from core.db.pool import pool_stats
+from core.permissions import IsAdmin
+from utils.metrics import REGISTRY
+from utils.views import APIView
+
+
+@extend_schema(
+    tags=["系統"],
+    summary="資料庫連線池統計",
+    description="回傳處理此請求的 worker 行程中各資料庫連線池的統計（每個 worker 各自獨立）",
+)
+class DatabasePoolStatsView(APIView):
+    """
+    資料庫連線池統計 View
+
+    僅限管理者。統計為處理此請求的行程的數值：
+    size / idle / in_use / waiting 為目前狀態，其餘為累計次數與等待秒數。
+    """
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response({"pid": os.getpid(), "pools": pool_stats()})
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus 指標（text/plain; version=0.0.4）
+
+    設定 METRICS_DIR 時合併所有 worker 行程的指標。
+    需帶 Authorization: Bearer <METRICS_AUTH_TOKEN>，否則回傳 401；
+    未設定 METRICS_AUTH_TOKEN 時僅 DEBUG 可存取，否則回傳 403（避免正式環境未設定權杖時對外公開）。
+    """
+    token = settings.METRICS_AUTH_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse("METRICS_AUTH_TOKEN 未設定", status=403, content_type="text/plain; charset=utf-8")
+    else:
+        authorization = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+            return HttpResponse(status=401)
+
+    return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
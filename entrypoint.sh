@@ -45,17 +45,35 @@ python manage.py collectstatic --noinput || true
 echo "建立預設測試帳號..."
 python manage.py seed_data || true
 
+# 清除上次執行留下的指標檔案（各 worker 行程的指標檔案，/metrics 合併輸出）
+# 只刪除指標檔案（metrics_*.json 與寫入中的暫存檔），不刪除目錄本身，避免 METRICS_DIR 設錯時刪除其他資料
+if [ -n "$METRICS_DIR" ]; then
+    mkdir -p "$METRICS_DIR"
+    find "$METRICS_DIR" -maxdepth 1 -type f \( -name 'metrics_*.json' -o -name '.metrics_*' \) -delete
+fi
+
 # 啟動服務
 echo "啟動 Django 服務..."
 if [ "$DEBUG" = "true" ]; then
     echo "開發模式：使用 runserver"
     python manage.py runserver 0.0.0.0:8000
+elif [ "$SERVER_MODE" = "asgi" ]; then
+    # 讀取 API 使用 async view，等待資料庫與慢速連線時不佔用 worker，每個行程可同時處理大量連線
+    echo "生產模式（ASGI）：使用 uvicorn"
+    uvicorn config.asgi:application \
+        --host 0.0.0.0 \
+        --port 8000 \
+        --workers ${UVICORN_WORKERS:-4} \
+        --timeout-keep-alive 5
 else
+    # 存取日誌由 AccessLogMiddleware 以背景執行緒輸出（JSON），不使用 gunicorn 的同步 access log
+    # gthread：每個 worker 以多個執行緒處理請求，密碼雜湊執行池才能限制登入尖峰佔用的執行緒
     echo "生產模式：使用 gunicorn"
     gunicorn config.wsgi:application \
         --bind 0.0.0.0:8000 \
-        --workers 4 \
+        --workers ${GUNICORN_WORKERS:-4} \
+        --worker-class gthread \
+        --threads ${GUNICORN_THREADS:-8} \
         --timeout 120 \
-        --access-logfile - \
         --error-logfile -
 fi
@@ -0,0 +1,48 @@
+"""
+行程內的 Bloom filter
+
+判斷「一定不存在」或「可能存在」：不存在的判斷一定正確，可能存在時需再向資料庫確認。
+不支援刪除，移除項目需重建。
+"""
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    以 bytearray 儲存位元的 Bloom filter
+
+    依預期項目數（capacity）與誤判率（error_rate）計算位元數與雜湊次數，
+    雜湊使用 blake2b 產生兩個 64 位元值後以 double hashing 取得 k 個位置。
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.num_bits = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        if isinstance(key, str):
+            key = key.encode("utf-8")
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        """加入項目"""
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def is_full(self):
+        """項目數超過預期容量（誤判率開始上升）"""
+        return self.count > self.capacity
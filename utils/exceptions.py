@@ -30,3 +30,9 @@ class PaymentFailedException(APIException):
     default_code = "payment_failed"
 
 
+class PasswordHashingBusyException(APIException):
+    """密碼雜湊忙碌異常（登入 / 註冊請求過多）"""
+    status_code = 503
+    default_detail = _("目前登入人數過多，請稍後再試")
+    default_code = "password_hashing_busy"
+    wait = 1
@@ -0,0 +1,54 @@
+import operator
+from functools import reduce
+
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.filters import SearchFilter
+from core.db.sharding import is_sharded_model, sharding_enabled
+
+
+class ShardedSearchFilter(SearchFilter):
+    """
+    分片模型的搜尋（?search=）
+
+    啟用分片時分片上沒有使用者與商品資料，關聯欄位（例如 user__username、product__name）
+    無法在分片上 JOIN：改為先在主資料庫查出符合的關聯物件 id，
+    再以 <關聯>_id__in 篩選分片上的資料。未啟用分片或非分片模型時與 SearchFilter 相同。
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not sharding_enabled() or not is_sharded_model(queryset.model):
+            return super().filter_queryset(request, queryset, view)
+
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        orm_lookups = [
+            self.construct_search(str(search_field), queryset)
+            for search_field in search_fields
+        ]
+        conditions = (
+            reduce(operator.or_, (self.build_condition(queryset.model, lookup, term) for lookup in orm_lookups))
+            for term in search_terms
+        )
+        return queryset.filter(reduce(operator.and_, conditions))
+
+    def build_condition(self, model, orm_lookup, term):
+        """
+        單一欄位的搜尋條件
+
+        關聯欄位（外鍵）在主資料庫查出符合的 id 後以 <外鍵>_id__in 篩選，其餘欄位與 SearchFilter 相同
+        """
+        name, _, remote_lookup = orm_lookup.partition(LOOKUP_SEP)
+        field = model._meta.get_field(name)
+        if not field.is_relation:
+            return models.Q(**{orm_lookup: term})
+
+        related_ids = list(
+            field.related_model._default_manager.filter(**{remote_lookup: term}).values_list(
+                "pk", flat=True
+            )
+        )
+        return models.Q(**{f"{field.attname}__in": related_ids})
@@ -0,0 +1,103 @@
+"""
+非阻塞的 logging handler 與 JSON formatter
+
+BackgroundStreamHandler 只將 log record 放入有上限的 queue，
+由背景執行緒（QueueListener）格式化並寫入 stream，請求執行緒不會等待 I/O：
+- queue 已滿時丟棄該筆紀錄並累計 dropped，不阻塞請求
+- 背景執行緒在每個行程第一次寫入時啟動（gunicorn fork 後的 worker 各自啟動），行程結束時排空 queue
+
+JsonFormatter 將紀錄輸出為一行 JSON，extra={"fields": {...}} 的欄位會併入輸出。
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+class BackgroundStreamHandler(QueueHandler):
+    """
+    以背景執行緒寫入 stream 的 logging handler
+
+    Args:
+        stream: 輸出目標（預設為 sys.stdout；dictConfig 可用 "ext://sys.stderr"）
+        maxsize: queue 上限，超過時丟棄新的紀錄
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(None)
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def setFormatter(self, fmt):
+        # 格式化在背景執行緒進行
+        self.target.setFormatter(fmt)
+
+    def _ensure_listener(self):
+        """此行程尚未啟動背景執行緒時建立 queue 並啟動"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.maxsize)
+            self._listener = QueueListener(self.queue, self.target)
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self.stop)
+
+    def prepare(self, record):
+        """複製紀錄；例外堆疊先在原執行緒轉為文字"""
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+    def stop(self):
+        """停止背景執行緒並寫出 queue 中剩餘的紀錄"""
+        listener, self._listener = self._listener, None
+        if listener is not None and self._pid == os.getpid():
+            listener.stop()
+        self._pid = None
+
+    def close(self):
+        self.stop()
+        self.target.close()
+        super().close()
+
+
+class JsonFormatter(logging.Formatter):
+    """輸出一行 JSON 的 formatter"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
@@ -0,0 +1,375 @@
+"""
+行程內指標與 Prometheus 文字格式輸出
+
+- Counter：累計次數（依標籤分組）
+- Gauge：目前數值（例如連線池使用中的連線數）
+- Histogram：觀測值落在各個區間的次數、總次數與總和（例如延遲）
+
+指標皆執行緒安全，建立時註冊到 REGISTRY，由 /metrics 輸出。
+
+多個 worker 行程（gunicorn）：設定 METRICS_DIR 時，每個行程由背景執行緒每 METRICS_FLUSH_SECONDS 秒
+將自己的指標寫入 METRICS_DIR/metrics_<pid>.json（寫入暫存檔後 rename，讀取端不會讀到一半的檔案），
+/metrics 讀取所有行程的檔案後合併：
+- Counter、Histogram：所有行程（包含已結束的行程）相加，worker 重啟後累計值不會倒退
+- Gauge：只輸出仍在執行的行程，並加上 pid 標籤
+服務啟動前需刪除 METRICS_DIR 中上次執行留下的指標檔案（entrypoint.sh）。未設定時只輸出處理請求的行程的指標。
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+# 延遲（秒）的區間上限
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsRegistry:
+    """指標註冊表：收集、寫入行程檔案與合併輸出"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def register(self, metric):
+        """註冊指標（同名指標以新的取代）"""
+        with self._lock:
+            self._metrics[metric.name] = metric
+
+    def register_collector(self, collector):
+        """註冊於收集前呼叫的函式（例如由連線池統計更新 Gauge）"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def touch(self):
+        """指標更新時呼叫：設定 METRICS_DIR 時確保此行程已啟動寫入檔案的背景執行緒"""
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+            if settings.METRICS_DIR:
+                threading.Thread(target=self._flush_forever, name="metrics-flush", daemon=True).start()
+                atexit.register(self.flush)
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_SECONDS)
+            try:
+                self.flush()
+            except OSError:
+                # 目錄暫時無法寫入時於下次重試
+                continue
+
+    def snapshot(self):
+        """
+        此行程的指標
+
+        Returns:
+            dict: {指標名稱: {"kind", "description", "labels", "buckets", "series": {標籤值 tuple: 值}}}
+        """
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics.values())
+        for collector in collectors:
+            collector()
+
+        return {
+            metric.name: {
+                "kind": metric.kind,
+                "description": metric.description,
+                "labels": metric.labels,
+                "buckets": getattr(metric, "buckets", None),
+                "series": metric.series(),
+            }
+            for metric in metrics
+        }
+
+    def flush(self):
+        """將此行程的指標寫入 METRICS_DIR/metrics_<pid>.json"""
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+
+        data = {
+            name: {**entry, "series": [[list(key), value] for key, value in entry["series"].items()]}
+            for name, entry in self.snapshot().items()
+        }
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".metrics_")
+        with os.fdopen(fd, "w") as temp_file:
+            json.dump({"pid": os.getpid(), "metrics": data}, temp_file)
+        os.replace(temp_path, os.path.join(directory, f"metrics_{os.getpid()}.json"))
+
+    def collect(self):
+        """
+        所有行程合併後的指標（未設定 METRICS_DIR 時為此行程的指標）
+
+        Returns:
+            dict: 格式與 snapshot() 相同；多行程時 Gauge 的標籤加上 pid
+        """
+        directory = settings.METRICS_DIR
+        if not directory:
+            return self.snapshot()
+
+        self.flush()
+        merged = {}
+        for file_name in sorted(os.listdir(directory)):
+            if not (file_name.startswith("metrics_") and file_name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(directory, file_name)) as metrics_file:
+                    data = json.load(metrics_file)
+            except (OSError, ValueError):
+                continue
+
+            alive = _process_alive(data["pid"])
+            for name, entry in data["metrics"].items():
+                if entry["kind"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, {**entry, "series": {}})
+                if entry["kind"] == "gauge":
+                    target["labels"] = (*entry["labels"], "pid")
+                for key, value in entry["series"]:
+                    key = tuple(key)
+                    if entry["kind"] == "gauge":
+                        target["series"][(*key, str(data["pid"]))] = value
+                    elif entry["kind"] == "histogram":
+                        target["series"][key] = _merge_histogram(target["series"].get(key), value)
+                    else:
+                        target["series"][key] = target["series"].get(key, 0) + value
+        return merged
+
+    def render(self):
+        """Prometheus 文字格式（text/plain; version=0.0.4）"""
+        lines = []
+        for name, entry in sorted(self.collect().items()):
+            lines.append(f"# HELP {name} {entry['description']}")
+            lines.append(f"# TYPE {name} {entry['kind']}")
+            labels = entry["labels"]
+            for key, value in sorted(entry["series"].items()):
+                pairs = list(zip(labels, key))
+                if entry["kind"] != "histogram":
+                    lines.append(f"{name}{_format_labels(pairs)} {_format_value(value)}")
+                    continue
+
+                cumulative = 0
+                bounds = [*entry["buckets"], float("inf")]
+                for bound, count in zip(bounds, value["counts"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels([*pairs, ('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(pairs)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(pairs)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _process_alive(pid):
+    """行程是否仍在執行"""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge_histogram(total, value):
+    if total is None:
+        return {"counts": list(value["counts"]), "count": value["count"], "sum": value["sum"]}
+    total["counts"] = [left + right for left, right in zip(total["counts"], value["counts"])]
+    total["count"] += value["count"]
+    total["sum"] += value["sum"]
+    return total
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Metric:
+    """
+    指標基底類別
+
+    Args:
+        name: 指標名稱
+        description: 說明
+        labels: 標籤名稱
+        registry: 註冊的註冊表（None 表示不註冊）
+    """
+
+    kind = None
+
+    def __init__(self, name, description, labels=(), registry=REGISTRY):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.registry = registry
+        self._series = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels):
+        if self.registry is not None:
+            self.registry.touch()
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def series(self):
+        """目前的數值：{標籤值 tuple: 值}"""
+        with self._lock:
+            return dict(self._series)
+
+    def reset(self):
+        """清除所有數值"""
+        with self._lock:
+            self._series.clear()
+
+
+class Counter(Metric):
+    """累計次數"""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        """增加 amount"""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """以外部維護的累計值更新（例如連線池的累計次數）"""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+
+class Gauge(Metric):
+    """目前數值"""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        """設定數值"""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+
+class Histogram(Metric):
+    """
+    依標籤分組的直方圖
+
+    Args:
+        buckets: 由小到大的區間上限（另有一個 +Inf 區間）
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, description, labels=(), buckets=DEFAULT_LATENCY_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(buckets)
+        super().__init__(name, description, labels, registry)
+
+    def observe(self, value, **labels):
+        """記錄一個觀測值"""
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "counts": [0] * (len(self.buckets) + 1),
+                    "count": 0,
+                    "sum": 0.0,
+                }
+            series["counts"][index] += 1
+            series["count"] += 1
+            series["sum"] += value
+
+    def series(self):
+        with self._lock:
+            return {
+                key: {"counts": list(series["counts"]), "count": series["count"], "sum": series["sum"]}
+                for key, series in self._series.items()
+            }
+
+    def snapshot(self):
+        """
+        目前的統計
+
+        Returns:
+            dict: {標籤值 tuple: {"counts": 各區間次數（非累計）, "count": 總次數, "sum": 總和}}
+        """
+        return self.series()
+
+    def merge(self, series):
+        """合併相同區間的 series()（例如其他行程的統計）"""
+        with self._lock:
+            for key, value in series.items():
+                self._series[tuple(key)] = _merge_histogram(self._series.get(tuple(key)), value)
+
+    def quantile(self, q, **labels):
+        """
+        由區間次數估計分位數（區間內線性內插）
+
+        Returns:
+            float | None: 沒有觀測值時回傳 None；落在 +Inf 區間時回傳最大的區間上限
+        """
+        key = tuple(str(labels[name]) for name in self.labels)
+        series = self.series().get(key)
+        if series is None:
+            return None
+
+        rank = q * series["count"]
+        cumulative = 0
+        for index, count in enumerate(series["counts"]):
+            if count and cumulative + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+
+# 請求處理時間（秒），依 method 與路由樣板分組
+request_latency = Histogram(
+    "http_request_duration_seconds",
+    "請求處理時間（秒）",
+    labels=("method", "route"),
+)
+
+# 分頁查詢總筆數（COUNT）的時間（秒），依模型分組
+pagination_count_duration = Histogram(
+    "pagination_count_duration_seconds",
+    "分頁查詢總筆數的時間（秒）",
+    labels=("model",),
+)
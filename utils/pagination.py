@@ -1,10 +1,33 @@
 # -*- coding: utf-8 -*-
+import time
 from collections import OrderedDict
 
+from django.core.paginator import InvalidPage, Paginator
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from drf_spectacular.utils import inline_serializer
 from rest_framework import serializers
+from utils.metrics import pagination_count_duration
+
+
+def _model_name(object_list):
+    model = getattr(object_list, "model", None)
+    return model.__name__ if model is not None else "-"
+
+
+class TimedPaginator(Paginator):
+    """記錄總筆數查詢時間（pagination_count_duration_seconds）的 Paginator"""
+
+    @cached_property
+    def count(self):
+        start = time.perf_counter()
+        count = super().count
+        pagination_count_duration.observe(
+            time.perf_counter() - start, model=_model_name(self.object_list)
+        )
+        return count
 
 
 class DemoPageNumberPagination(PageNumberPagination):
@@ -17,12 +40,38 @@ class DemoPageNumberPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "size"
     max_page_size = 1000
+    django_paginator_class = TimedPaginator
 
     def paginate_queryset(self, queryset, request, view=None):
         if "page" not in request.query_params:
             return None
         return super().paginate_queryset(queryset, request, view=None)
 
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset 的 async 版本（ASGI 模式的 async view 使用）
+
+        以 acount() 取得總筆數、以 async 迭代取得該頁資料，分頁規則與錯誤訊息與同步版本相同。
+        """
+        if "page" not in request.query_params:
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        paginator = self.django_paginator_class(queryset, page_size)
+        start = time.perf_counter()
+        paginator.count = await queryset.acount()
+        pagination_count_duration.observe(time.perf_counter() - start, model=_model_name(queryset))
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        self.page.object_list = [item async for item in self.page.object_list]
+        return list(self.page)
+
     def get_paginated_response(self, data):
         """
         格式修正為模仿Rapid7官方分頁回應
@@ -0,0 +1,22 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class CSVTextParser(BaseParser):
+    """
+    CSV 請求內容解析器
+
+    將 Content-Type: text/csv 的請求內容解碼為字串，交由 View 自行解析。
+    無法以指定編碼解碼時回傳 400（ParseError）。
+    """
+
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            return stream.read().decode(encoding)
+        except UnicodeDecodeError:
+            raise ParseError(f"CSV 內容無法以 {encoding} 解碼")
@@ -0,0 +1,73 @@
+"""
+請求各階段的耗時（Server-Timing）
+
+ServerTimingMiddleware 於請求開始時以 track_request() 建立 RequestTimings（contextvars），
+各階段以 timed() 累加耗時：
+- auth：JWT 認證（CachedJWTAuthentication）
+- serialize：serializer 的驗證與輸出（utils.views 的 GenericAPIView 與編譯後的 serializer）
+- render：回應的 render（JSON 編碼）
+資料庫查詢次數與耗時由 core.db.instrumentation.track_queries() 統計。
+
+各階段可能重疊：serializer 輸出時才執行的查詢（lazy queryset）同時計入 serialize 與 db。
+不在請求中（沒有 RequestTimings）時 timed() 不做任何事。
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from core.db.instrumentation import track_queries
+
+
+class RequestTimings:
+    """請求的資料庫統計與各階段耗時（秒）"""
+
+    __slots__ = ("queries", "phases")
+
+    def __init__(self, queries):
+        self.queries = queries
+        self.phases = {}
+
+    def add(self, phase, duration):
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """目前請求的 RequestTimings（不在請求中時為 None）"""
+    return _current_timings.get()
+
+
+@contextmanager
+def timed(phase):
+    """將區塊的耗時累加到目前請求的 phase 階段"""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+
+
+@contextmanager
+def track_request():
+    """
+    統計區塊（請求）內的查詢與各階段耗時
+
+    Yields:
+        RequestTimings
+    """
+    with track_queries() as queries:
+        timings = RequestTimings(queries)
+        token = _current_timings.set(timings)
+        try:
+            yield timings
+        finally:
+            _current_timings.reset(token)
@@ -0,0 +1,16 @@
+from .field_paths import SourcePath, resolve_source, collect_queryset_paths
+from .sparse_fields import parse_field_tree, prune_fields
+from .compiled import CompiledSerializer, compile_serializer
+from .timing import TimedSerializerMixin, time_serializer
+
+__all__ = [
+    "SourcePath",
+    "resolve_source",
+    "collect_queryset_paths",
+    "parse_field_tree",
+    "prune_fields",
+    "CompiledSerializer",
+    "compile_serializer",
+    "TimedSerializerMixin",
+    "time_serializer",
+]
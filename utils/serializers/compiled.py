@@ -0,0 +1,153 @@
+from rest_framework import serializers
+from rest_framework.relations import PKOnlyObject, PrimaryKeyRelatedField
+
+from utils.request_timing import timed
+from utils.serializers.field_paths import resolve_source, is_pk_only_field
+
+# 與 DRF to_representation 結果完全相同的快速轉換
+FAST_CONVERTERS = {
+    serializers.IntegerField: int,
+    serializers.CharField: str,
+    serializers.EmailField: str,
+    serializers.BooleanField: bool,
+}
+
+# to_representation 不依賴 context（request 等）的欄位，可安全重複使用同一個欄位實例
+CONTEXT_FREE_FIELDS = (
+    serializers.ChoiceField,
+    serializers.DateTimeField,
+    serializers.DateField,
+    serializers.TimeField,
+    serializers.DecimalField,
+    serializers.FloatField,
+    serializers.UUIDField,
+    serializers.ReadOnlyField,
+)
+
+
+class CompiledSerializer:
+    """
+    編譯後的唯讀 serializer
+
+    以 values_list() 取出扁平的欄位值，再由預先建立的轉換函式逐列組成 dict，
+    略過 DRF 逐筆建立欄位與解析 source 路徑的成本。輸出與原 serializer 完全相同。
+    """
+
+    def __init__(self, lookups, getters):
+        self.lookups = lookups
+        self.getters = getters
+
+    def values_queryset(self, queryset):
+        """將 queryset 轉為僅取出所需欄位的 values_list"""
+        return queryset.values_list(*self.lookups)
+
+    def to_representation_row(self, row):
+        return {name: getter(row) for name, getter in self.getters}
+
+    def to_representation(self, rows):
+        getters = self.getters
+        with timed("serialize"):
+            return [{name: getter(row) for name, getter in getters} for row in rows]
+
+
+class _Builder:
+    """收集 values_list 欄位並建立逐列轉換函式"""
+
+    def __init__(self):
+        self.lookups = []
+
+    def add_lookup(self, lookup):
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return self.lookups.index(lookup)
+
+    def build_getters(self, serializer, model, prefix=""):
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            return None
+
+        getters = []
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            getter = self.build_getter(field, model, prefix)
+            if getter is None:
+                return None
+            getters.append((field.field_name, getter))
+        return getters
+
+    def build_getter(self, field, model, prefix):
+        if field.source == "*" or isinstance(field, serializers.ListSerializer):
+            return None
+
+        source_path = resolve_source(model, field.source_attrs)
+        if source_path is None:
+            return None
+        lookup = prefix + source_path.lookup
+
+        if isinstance(field, serializers.BaseSerializer):
+            if not source_path.model_field.is_relation:
+                return None
+            nested = self.build_getters(
+                field, source_path.model_field.related_model, prefix=f"{lookup}__"
+            )
+            if nested is None:
+                return None
+            pk_index = self.add_lookup(f"{lookup}__pk")
+
+            def get_nested(row):
+                if row[pk_index] is None:
+                    return None
+                return {name: getter(row) for name, getter in nested}
+
+            return get_nested
+
+        if source_path.model_field.is_relation:
+            if type(field) is not PrimaryKeyRelatedField or not is_pk_only_field(field):
+                return None
+            converter = self.pk_converter(field)
+        elif type(field) in FAST_CONVERTERS:
+            converter = FAST_CONVERTERS[type(field)]
+        elif type(field) in CONTEXT_FREE_FIELDS:
+            converter = field.to_representation
+        else:
+            return None
+
+        if source_path.display:
+            converter = self.display_converter(source_path.model_field, converter)
+
+        index = self.add_lookup(lookup)
+
+        def get_value(row):
+            value = row[index]
+            return None if value is None else converter(value)
+
+        return get_value
+
+    @staticmethod
+    def pk_converter(field):
+        if field.pk_field is None:
+            return lambda value: value
+        return lambda value: field.to_representation(PKOnlyObject(pk=value))
+
+    @staticmethod
+    def display_converter(model_field, converter):
+        # 與 Model.get_<field>_display 相同：找不到對應選項時顯示原始值
+        choices = dict(model_field.flatchoices)
+        return lambda value: converter(choices.get(value, value))
+
+
+def compile_serializer(serializer, model):
+    """
+    將 serializer（或其目前裁剪後的欄位）編譯為 CompiledSerializer
+
+    僅支援欄位皆能對應到 Model 欄位且不依賴 context 的 serializer，
+    其餘情況回傳 None，呼叫端應改用一般的 serializer。
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    builder = _Builder()
+    getters = builder.build_getters(serializer, model)
+    if getters is None:
+        return None
+    return CompiledSerializer(builder.lookups, getters)
@@ -0,0 +1,146 @@
+import re
+from dataclasses import dataclass, field as dataclass_field
+from typing import List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.fields import Field
+from rest_framework.relations import RelatedField
+
+DISPLAY_METHOD_PATTERN = re.compile(r"^get_(?P<name>\w+)_display$")
+
+
+@dataclass
+class SourcePath:
+    """
+    Serializer 欄位 source 對應的 ORM 路徑
+
+    - lookup: ORM 查詢路徑（如 "user__username"）
+    - relations: 經過的關聯路徑（如 ["user"]），用於 select_related
+    - model_field: 最後一段對應的 Model 欄位
+    - display: 是否為 get_<field>_display（需以 choices 轉換顯示名稱）
+    """
+
+    lookup: str
+    relations: List[str] = dataclass_field(default_factory=list)
+    model_field: Optional[object] = None
+    display: bool = False
+
+
+def resolve_source(model, source_attrs) -> Optional[SourcePath]:
+    """
+    將 serializer 欄位的 source_attrs 解析為 ORM 路徑
+
+    僅支援 Model 欄位、正向 ForeignKey/OneToOne 關聯與 get_<field>_display，
+    其餘（property、自訂方法等）無法判斷實際需要的欄位，回傳 None。
+    """
+    if not source_attrs:
+        return None
+
+    parts = []
+    relations = []
+    current_model = model
+
+    for index, attr in enumerate(source_attrs):
+        is_last = index == len(source_attrs) - 1
+
+        try:
+            model_field = current_model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            match = DISPLAY_METHOD_PATTERN.match(attr)
+            if not (is_last and match):
+                return None
+            try:
+                model_field = current_model._meta.get_field(match.group("name"))
+            except FieldDoesNotExist:
+                return None
+            if not model_field.choices:
+                return None
+            parts.append(model_field.name)
+            return SourcePath("__".join(parts), relations, model_field, display=True)
+
+        if model_field.is_relation and not (model_field.many_to_one or model_field.one_to_one):
+            return None
+
+        if model_field.is_relation and attr != model_field.name:
+            # 外鍵欄位名稱（如 product_id）：直接取外鍵值，不需要 JOIN
+            if not is_last:
+                return None
+            parts.append(model_field.name)
+            return SourcePath("__".join(parts), relations, model_field.target_field)
+
+        parts.append(model_field.name)
+
+        if is_last:
+            return SourcePath("__".join(parts), relations, model_field)
+
+        if not model_field.is_relation or not model_field.concrete:
+            return None
+
+        relations.append("__".join(parts))
+        current_model = model_field.related_model
+
+    return None
+
+
+def is_pk_only_field(field: Field) -> bool:
+    """是否為僅需外鍵值即可輸出的關聯欄位（如 PrimaryKeyRelatedField）"""
+    return isinstance(field, RelatedField) and field.use_pk_only_optimization()
+
+
+def collect_queryset_paths(serializer, model, prefix="") -> Optional[Tuple[List[str], List[str]]]:
+    """
+    從 serializer 目前的欄位推導查詢所需的欄位與關聯
+
+    Returns:
+        (only_paths, related_paths)：分別用於 .only() 與 .select_related()；
+        若有任何欄位無法解析，回傳 None（呼叫端應保留原查詢不做裁剪）。
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    only_paths = []
+    related_paths = []
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == "*":
+            return None
+
+        source_path = resolve_source(model, field.source_attrs)
+        if source_path is None:
+            return None
+
+        related_paths.extend(prefix + relation for relation in source_path.relations)
+        lookup = prefix + source_path.lookup
+
+        if isinstance(field, serializers.ListSerializer):
+            return None
+
+        if isinstance(field, serializers.BaseSerializer):
+            if not source_path.model_field.is_relation:
+                return None
+            nested = collect_queryset_paths(
+                field, source_path.model_field.related_model, prefix=f"{lookup}__"
+            )
+            if nested is None:
+                return None
+            related_paths.append(lookup)
+            only_paths.append(lookup)
+            only_paths.extend(nested[0])
+            related_paths.extend(nested[1])
+            continue
+
+        if source_path.model_field.is_relation and not is_pk_only_field(field):
+            # 非 pk-only 的關聯欄位會存取整個關聯物件
+            related_paths.append(lookup)
+
+        only_paths.append(lookup)
+
+    # select_related 的關聯本身也必須被載入，否則 Django 會拒絕同時 defer 與 traverse
+    for relation in related_paths:
+        if relation not in only_paths:
+            only_paths.append(relation)
+
+    return list(dict.fromkeys(only_paths)), list(dict.fromkeys(related_paths))
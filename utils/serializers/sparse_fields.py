@@ -0,0 +1,73 @@
+from rest_framework import serializers
+
+FIELDS_QUERY_PARAM = "fields"
+EXCLUDE_QUERY_PARAM = "exclude"
+
+
+def parse_field_tree(value):
+    """
+    解析 ?fields= / ?exclude= 參數為巢狀欄位樹
+
+    以逗號分隔欄位，並以 "." 表示巢狀欄位，例如：
+    "exchange_code,product.name" -> {"exchange_code": {}, "product": {"name": {}}}
+    空字典代表整個欄位。
+    """
+    tree = {}
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        node = tree
+        for part in item.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _get_fields(serializer):
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    return serializer.fields
+
+
+def _check_unknown(fields, tree, path):
+    unknown = [f"{path}{name}" for name in tree if name not in fields]
+    if unknown:
+        raise serializers.ValidationError(
+            {"fields": f"未知的欄位：{', '.join(sorted(unknown))}"}
+        )
+
+
+def prune_fields(serializer, include=None, exclude=None, path=""):
+    """
+    依欄位樹裁剪 serializer 的輸出欄位（原地修改）
+
+    - include：僅保留樹中的欄位，子樹非空時遞迴裁剪巢狀 serializer
+    - exclude：移除樹中的欄位，子樹非空時遞迴移除巢狀欄位
+    """
+    fields = _get_fields(serializer)
+
+    if include:
+        _check_unknown(fields, include, path)
+        for name in list(fields):
+            if name not in include:
+                del fields[name]
+            elif include[name]:
+                _prune_nested(fields[name], name, path, include=include[name])
+
+    if exclude:
+        _check_unknown(fields, exclude, path)
+        for name, subtree in exclude.items():
+            if name not in fields:
+                continue
+            if subtree:
+                _prune_nested(fields[name], name, path, exclude=subtree)
+            else:
+                del fields[name]
+
+    return serializer
+
+
+def _prune_nested(field, name, path, include=None, exclude=None):
+    if not isinstance(field, serializers.BaseSerializer):
+        raise serializers.ValidationError({"fields": f"欄位 {path}{name} 不支援巢狀選取"})
+    prune_fields(field, include=include, exclude=exclude, path=f"{path}{name}.")
@@ -0,0 +1,39 @@
+from utils.request_timing import current_timings, timed
+
+
+class TimedSerializerMixin:
+    """將 is_valid() 與 data 的耗時計入請求的 serialize 階段"""
+
+    def is_valid(self, *args, **kwargs):
+        with timed("serialize"):
+            return super().is_valid(*args, **kwargs)
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+# serializer class -> 加上 TimedSerializerMixin 的子類別
+_timed_classes = {}
+
+
+def time_serializer(serializer):
+    """
+    將 serializer 換成計時的子類別（不在請求中時不變更）
+
+    只換最外層的 serializer，巢狀 serializer 的耗時已包含在外層中，不重複計算。
+    """
+    serializer_class = type(serializer)
+    if current_timings() is None or issubclass(serializer_class, TimedSerializerMixin):
+        return serializer
+
+    timed_class = _timed_classes.get(serializer_class)
+    if timed_class is None:
+        timed_class = _timed_classes[serializer_class] = type(
+            serializer_class.__name__,
+            (TimedSerializerMixin, serializer_class),
+            {"__module__": serializer_class.__module__, "__qualname__": serializer_class.__qualname__},
+        )
+    serializer.__class__ = timed_class
+    return serializer
@@ -0,0 +1,70 @@
+"""
+行程內的 TTL 快取
+
+有容量上限（超過時淘汰最久未使用的項目）且每個項目有存活時間，執行緒安全。
+適合快取讀取頻繁、可容忍短暫延遲的資料（例如 JWT 認證的使用者）。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    有容量上限的 TTL + LRU 快取
+
+    invalidate / clear 會遞增 generation：從資料庫載入資料前先取得 generation，
+    寫入時若 generation 已改變（載入期間資料被異動）則不寫入，避免舊資料蓋過失效。
+    """
+
+    def __init__(self, maxsize, ttl, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, key, default=None):
+        """取得項目，不存在或已過期時回傳 default"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= self._timer():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, generation=None):
+        """
+        寫入項目
+
+        Args:
+            generation: 載入資料前取得的 generation，與目前不同時不寫入
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (value, self._timer() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        """使單一項目失效"""
+        with self._lock:
+            self.generation += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        """清空快取"""
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
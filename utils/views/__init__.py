@@ -1,5 +1,14 @@
-from .base import APIView, ViewSet, GenericAPIView, GenericViewSet, ModelViewSet
+from .async_dispatch import AsyncDispatchMixin
+from .base import APIView, ViewSet, GenericAPIView, GenericViewSet, ModelViewSet, ShardedViewSetMixin
 
-__all__ = ["APIView", "ViewSet", "GenericAPIView", "GenericViewSet", "ModelViewSet"]
+__all__ = [
+    "APIView",
+    "ViewSet",
+    "GenericAPIView",
+    "GenericViewSet",
+    "ModelViewSet",
+    "ShardedViewSetMixin",
+    "AsyncDispatchMixin",
+]
 
 
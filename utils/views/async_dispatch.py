@@ -0,0 +1,106 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.utils.decorators import classonlymethod
+from rest_framework.response import Response
+
+
+class AsyncDispatchMixin:
+    """
+    ASGI 模式的 async 讀取 handler
+
+    ASYNC_VIEWS_ENABLED=true（以 config.asgi 啟動時預設開啟）時，as_view() 回傳 async view：
+    - async_handlers 中列出的 handler（例如 {"list": "alist"}）改由對應的 async 方法處理，
+      認證、權限檢查等 DRF 前置流程以 sync_to_async 執行，查詢使用 async ORM，
+      等待資料庫時不佔用執行緒，一個行程可同時處理大量慢速連線
+    - 其餘 handler（寫入等）以 sync_to_async 在執行緒中執行原本的同步流程
+
+    未開啟時與一般 View 相同（WSGI 模式）。
+    """
+
+    # 同步 handler 名稱 -> async handler 名稱
+    async_handlers = {}
+
+    @classonlymethod
+    def as_view(cls, *args, **kwargs):
+        view = super().as_view(*args, **kwargs)
+        if not settings.ASYNC_VIEWS_ENABLED:
+            return view
+
+        async def async_view(request, *view_args, **view_kwargs):
+            return await view(request, *view_args, **view_kwargs)
+
+        # 保留 cls / initkwargs / actions / csrf_exempt 等屬性（router 與 API 文件會使用）
+        return functools.update_wrapper(async_view, view)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not settings.ASYNC_VIEWS_ENABLED:
+            return super().dispatch(request, *args, **kwargs)
+
+        handler = getattr(self, request.method.lower(), None)
+        async_handler = self.async_handlers.get(getattr(handler, "__name__", None))
+        if async_handler is None:
+            return sync_to_async(super().dispatch)(request, *args, **kwargs)
+        return self.adispatch(request, getattr(self, async_handler), *args, **kwargs)
+
+    async def adispatch(self, request, handler, *args, **kwargs):
+        """與 APIView.dispatch 相同的流程，handler 為 async 方法"""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        """get_object() 的 async 版本"""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        """
+        ModelViewSet.list() 的 async 版本
+
+        使用編譯後的 serializer 以 async 迭代取值；無法編譯時以 sync_to_async 執行原本的 list()。
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        compiled = self.get_compiled_serializer(queryset.model)
+        if compiled is None or self.is_sideload_requested():
+            return await sync_to_async(self.list)(request, *args, **kwargs)
+
+        rows = compiled.values_queryset(queryset)
+        page = await self.apaginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.to_representation(page))
+
+        return Response(compiled.to_representation([row async for row in rows]))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        """RetrieveModelMixin.retrieve() 的 async 版本"""
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    async def apaginate_queryset(self, queryset):
+        """paginate_queryset() 的 async 版本（分頁器需提供 apaginate_queryset）"""
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
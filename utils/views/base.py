@@ -1,3 +1,6 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.response import Response
 from rest_framework.views import APIView as DrfAPIView
 from rest_framework.generics import GenericAPIView as DrfGenericAPIView
 from rest_framework.viewsets import (
@@ -5,6 +8,32 @@ from rest_framework.viewsets import (
     ModelViewSet as DrfModelViewSet,
     GenericViewSet as DrfGenericViewSet,
 )
+from utils.serializers import (
+    collect_queryset_paths,
+    compile_serializer,
+    parse_field_tree,
+    prune_fields,
+    time_serializer,
+)
+from utils.serializers.sparse_fields import FIELDS_QUERY_PARAM, EXCLUDE_QUERY_PARAM
+from utils.filters import ShardedSearchFilter
+from utils.ttl_cache import TTLCache
+from core.db.sharding import sharding_enabled
+
+SIDELOAD_QUERY_PARAM = "sideload"
+
+# 編譯後 serializer 的快取上限（稀疏欄位的組合由請求決定，需限制數量）
+COMPILED_SERIALIZER_CACHE_SIZE = 256
+
+# (serializer class, model, 稀疏欄位) -> CompiledSerializer | None
+compiled_serializers = TTLCache(maxsize=COMPILED_SERIALIZER_CACHE_SIZE, ttl=float("inf"))
+
+_NOT_CACHED = object()
+
+
+def freeze_field_tree(tree):
+    """將欄位樹轉為與參數順序無關、可作為快取 key 的 tuple"""
+    return tuple((name, freeze_field_tree(children)) for name, children in sorted(tree.items()))
 
 
 class APIView(DrfAPIView):
@@ -19,6 +48,8 @@ class GenericAPIView(APIView, DrfGenericAPIView):
     """
     基礎 View 屬性，包含:
     - ordering_fields: "__all__"
+    - 稀疏欄位（僅限 GET）：?fields=a,b.c 僅輸出指定欄位，?exclude=a 排除指定欄位，
+      並依剩餘欄位同步裁剪查詢的 .only() 與 select_related，不查詢用不到的欄位與 JOIN
     """
 
     ordering_fields = "__all__"
@@ -27,6 +58,58 @@ class GenericAPIView(APIView, DrfGenericAPIView):
         super().initial(request, *args, **kwargs)
 
         self.extra_kwargs_on_save = {}
+        self.sparse_fields = self.get_sparse_fields()
+
+    def get_sparse_fields(self):
+        """
+        解析稀疏欄位參數
+
+        Returns:
+            (include, exclude) 欄位樹；非 GET 請求或未帶參數時回傳 None
+        """
+        if self.request.method not in SAFE_METHODS:
+            return None
+
+        include = parse_field_tree(self.request.query_params.get(FIELDS_QUERY_PARAM, ""))
+        exclude = parse_field_tree(self.request.query_params.get(EXCLUDE_QUERY_PARAM, ""))
+        if not include and not exclude:
+            return None
+        return include, exclude
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+
+        sparse_fields = getattr(self, "sparse_fields", None)
+        if sparse_fields:
+            include, exclude = sparse_fields
+            prune_fields(serializer, include=include, exclude=exclude)
+        if getattr(self, "swagger_fake_view", False):
+            # API 文件產生時不換成計時的子類別（避免同名的 serializer component）
+            return serializer
+        return time_serializer(serializer)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        if getattr(self, "sparse_fields", None):
+            queryset = self.prune_queryset(queryset)
+        return queryset
+
+    def prune_queryset(self, queryset):
+        """
+        依裁剪後的 serializer 欄位限制查詢欄位與 JOIN
+
+        無法解析的欄位（如 property、SerializerMethodField）會保留原查詢不做裁剪。
+        """
+        paths = collect_queryset_paths(self.get_serializer(), queryset.model)
+        if paths is None:
+            return queryset
+
+        only_paths, related_paths = paths
+        queryset = queryset.select_related(None)
+        if related_paths:
+            queryset = queryset.select_related(*related_paths)
+        return queryset.only(*only_paths)
 
 
 class GenericViewSet(GenericAPIView, DrfGenericViewSet):
@@ -34,6 +117,127 @@ class GenericViewSet(GenericAPIView, DrfGenericViewSet):
 
 
 class ModelViewSet(GenericViewSet, DrfModelViewSet):
+    """
+    基礎 ModelViewSet
+
+    list 預設使用編譯後的唯讀 serializer（utils.serializers.compiled）：
+    以 values_list() 取值並以預先編譯的函式組成回應，輸出與原 serializer 相同；
+    無法編譯的 serializer 自動退回一般序列化流程。設定 use_compiled_serializer = False 可停用。
+
+    側載（?sideload=true，需設定 sideload_serializer_class 與 sideload_includes）：
+    每筆資料僅以 id 參照關聯物件，關聯物件去重後統一放在回應最上層的 included。
+    """
+
+    use_compiled_serializer = True
+
+    # 側載時每筆資料使用的 serializer（關聯以 <name>_id 表示）
+    sideload_serializer_class = None
+    # included 的名稱 -> (資料中的 id 欄位, 關聯物件 serializer)
+    sideload_includes = {}
+
+    def get_compiled_serializer(self, model):
+        """取得（或編譯並快取）目前 serializer 的編譯版本，無法編譯時回傳 None"""
+        if not self.use_compiled_serializer:
+            return None
+
+        sparse_fields = getattr(self, "sparse_fields", None)
+        if sparse_fields:
+            sparse_fields = tuple(freeze_field_tree(tree) for tree in sparse_fields)
+        key = (self.get_serializer_class(), model, sparse_fields)
+
+        compiled = compiled_serializers.get(key, _NOT_CACHED)
+        if compiled is _NOT_CACHED:
+            compiled = compile_serializer(self.get_serializer(), model)
+            compiled_serializers.set(key, compiled)
+        return compiled
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if self.is_sideload_requested():
+            return self.sideload_list(queryset)
+
+        compiled = self.get_compiled_serializer(queryset.model)
+        if compiled is None:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+
+        rows = compiled.values_queryset(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.to_representation(page))
+
+        return Response(compiled.to_representation(rows))
+
+    def is_sideload_requested(self):
+        if self.sideload_serializer_class is None or self.action != "list":
+            return False
+        value = self.request.query_params.get(SIDELOAD_QUERY_PARAM, "")
+        return value.lower() in ("true", "1")
+
+    def get_serializer_class(self):
+        if self.is_sideload_requested():
+            return self.sideload_serializer_class
+        return super().get_serializer_class()
+
+    def sideload_list(self, queryset):
+        """
+        側載列表回應
+
+        {"results": [...], "included": {"products": {"<id>": {...}}, "users": {...}}}
+        分頁時 included 與 page 並列。每種關聯物件以一次 id__in 查詢取得。
+        """
+        compiled = self.get_compiled_serializer(queryset.model)
+        if compiled is not None:
+            queryset = compiled.values_queryset(queryset)
+
+        page = self.paginate_queryset(queryset)
+        objects = page if page is not None else queryset
+        if compiled is not None:
+            results = compiled.to_representation(objects)
+        else:
+            results = self.get_serializer(objects, many=True).data
+
+        included = self.get_sideload_included(results)
+
+        if page is not None:
+            response = self.get_paginated_response(results)
+            response.data["included"] = included
+            return response
+        return Response({"results": results, "included": included})
+
+    def get_sideload_included(self, results):
+        """依資料中參照的 id 取得並序列化關聯物件（每個物件僅輸出一次）"""
+        fields = self.get_serializer().fields
+        included = {}
+
+        for name, (id_field, serializer_class) in self.sideload_includes.items():
+            if id_field not in fields:
+                continue
+
+            ids = {row[id_field] for row in results if row[id_field] is not None}
+            if not ids:
+                included[name] = {}
+                continue
+
+            serializer = serializer_class(context=self.get_serializer_context())
+            model = serializer.Meta.model
+            objects = model._default_manager.filter(pk__in=ids).order_by("pk")
+
+            compiled = compile_serializer(serializer, model)
+            if compiled is not None:
+                data = compiled.to_representation(compiled.values_queryset(objects))
+            else:
+                data = serializer_class(objects, many=True, context=serializer.context).data
+
+            included[name] = {str(item["id"]): item for item in data}
+        return included
+
     def perform_create(self, serializer):
         return serializer.save(**self.extra_kwargs_on_save)
 
@@ -41,3 +245,34 @@ class ModelViewSet(GenericViewSet, DrfModelViewSet):
         return serializer.save(**self.extra_kwargs_on_save)
 
 
+class ShardedViewSetMixin:
+    """
+    分片模型的 ViewSet（模型使用 core.db.sharding.ShardedManager）
+
+    啟用分片時：
+    - get_queryset() 回傳未固定分片的查詢（未呼叫 for_user / on_shard）時，
+      filter_queryset() 改為 fan_out()：list 查詢所有分片後依排序合併，
+      retrieve / update 等單筆查詢依序在各分片查詢
+    - 不使用編譯後的 serializer 與稀疏欄位的查詢裁剪（兩者都以 JOIN 取得關聯資料，分片上沒有這些資料）
+    - search_fields 的搜尋（?search=）使用 ShardedSearchFilter：關聯欄位先在主資料庫解析為 id
+
+    未啟用分片時與一般 ViewSet 相同。
+    """
+
+    filter_backends = [*api_settings.DEFAULT_FILTER_BACKENDS, ShardedSearchFilter]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if sharding_enabled() and not queryset.is_pinned:
+            return queryset.fan_out()
+        return queryset
+
+    def prune_queryset(self, queryset):
+        if sharding_enabled():
+            return queryset
+        return super().prune_queryset(queryset)
+
+    def get_compiled_serializer(self, model):
+        if sharding_enabled():
+            return None
+        return super().get_compiled_serializer(model)